@@ -0,0 +1,74 @@
+"""Throughput of the scalar calculations versus the vectorized batch engine.
+
+Run with ``python benchmarks/bench_batch.py [rows]`` from the repository root.
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bmi_calculator import batch, calculations  # noqa: E402
+
+
+def make_roster(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    return {
+        "weight": np.round(rng.uniform(40, 160, rows), 1),
+        "height": np.round(rng.uniform(140, 210, rows), 1) / 100,
+        "age": rng.integers(18, 80, rows),
+        "gender": rng.choice(["Male", "Female", "Other"], rows),
+        "activity": rng.choice(calculations.ACTIVITY_LEVELS, rows),
+    }
+
+
+def score_scalar(roster):
+    rows = []
+    for weight, height, age, gender, activity in zip(
+        roster["weight"].tolist(), roster["height"].tolist(), roster["age"].tolist(),
+        roster["gender"].tolist(), roster["activity"].tolist(),
+    ):
+        bmi = calculations.calculate_bmi(weight, height)
+        category = calculations.get_bmi_category(bmi)
+        bmr = calculations.calculate_bmr(weight, height, age, gender)
+        daily_calories = calculations.calculate_calories(bmr, activity)
+        lower, upper = calculations.calculate_ideal_weight(height, gender)
+        rows.append((bmi, category[0], bmr, daily_calories, lower, upper))
+    return rows
+
+
+def score_batch(roster):
+    return batch.compute_metrics(
+        roster["weight"], roster["height"], roster["age"], roster["gender"], roster["activity"]
+    )
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main(rows=200_000):
+    roster = make_roster(rows)
+    scalar_rows, scalar_time = timed(score_scalar, roster)
+    metrics, batch_time = timed(score_batch, roster)
+
+    names = batch.category_names(metrics["category"]).tolist()
+    columns = zip(
+        metrics["bmi"].tolist(), names, metrics["bmr"].tolist(), metrics["daily_calories"].tolist(),
+        metrics["lower_weight"].tolist(), metrics["upper_weight"].tolist(),
+    )
+    assert list(columns) == scalar_rows, "batch results differ from the scalar functions"
+
+    print(f"rows:   {rows:,}")
+    print(f"scalar: {scalar_time:.3f}s ({rows / scalar_time:,.0f} rows/s)")
+    print(f"batch:  {batch_time:.3f}s ({rows / batch_time:,.0f} rows/s)")
+    print(f"speedup: {scalar_time / batch_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,60 @@
+"""Peak memory of the streaming cohort exports as the cohort grows.
+
+Run with ``python benchmarks/bench_cohort_export.py [rows]`` from the repository
+root. Each format is written to a temporary file in a fresh process, once for
+a tenth of the cohort and once for all of it; peak RSS should barely move.
+"""
+
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_batch import make_roster  # noqa: E402
+
+from bmi_calculator import batch, exports  # noqa: E402
+from bmi_calculator.models import REPORT_COLUMNS  # noqa: E402
+
+BATCH_ROWS = 50_000
+
+
+def iter_batches(rows):
+    for start in range(0, rows, BATCH_ROWS):
+        roster = make_roster(min(BATCH_ROWS, rows - start), seed=start)
+        yield batch.compute_batch(
+            roster["weight"], roster["height"], roster["age"], roster["gender"], roster["activity"]
+        )
+
+
+def export(fmt, rows):
+    """Write ``rows`` people as ``fmt``; print seconds, MB written and peak RSS in MB."""
+    with tempfile.TemporaryFile() as out:
+        start = time.perf_counter()
+        written = exports.write_export(out, exports.stream_export(fmt, iter_batches(rows), REPORT_COLUMNS))
+        elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{elapsed:.3f} {written / 1e6:.1f} {peak:.1f}")
+
+
+def main(rows=1_000_000):
+    formats = [fmt for fmt in exports.FORMATS if fmt != "parquet" or exports.parquet_available()]
+    for fmt in formats:
+        results = []
+        for size in (rows // 10, rows):
+            output = subprocess.run(
+                [sys.executable, __file__, "--export", fmt, str(size)], check=True, capture_output=True, text=True
+            ).stdout.split()
+            results.append((size, *map(float, output)))
+        line = "  ".join(f"{size:>9,} rows {secs:6.2f}s {mb:7.1f} MB peak {rss:6.1f} MB" for size, secs, mb, rss in results)
+        print(f"{fmt:<8} {line}")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--export"]:
+        export(sys.argv[2], int(sys.argv[3]))
+    else:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
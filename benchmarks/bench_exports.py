@@ -0,0 +1,53 @@
+"""Batch CSV/JSON exports from the structured buffers versus per-row writers.
+
+Run with ``python benchmarks/bench_exports.py [rows]`` from the repository root.
+Both paths must produce the same bytes.
+"""
+
+import csv
+import io
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_batch import make_roster, timed  # noqa: E402
+
+from bmi_calculator import batch, exports  # noqa: E402
+
+
+def per_row_csv(columns):
+    out = io.StringIO()
+    writer = csv.writer(out, lineterminator="\n")
+    writer.writerow(list(columns))
+    writer.writerows(zip(*(values.tolist() for values in columns.values())))
+    return out.getvalue().encode("utf-8")
+
+
+def per_row_jsonl(columns):
+    names = list(columns)
+    rows = zip(*(values.tolist() for values in columns.values()))
+    return "".join(json.dumps(dict(zip(names, row))) + "\n" for row in rows).encode("utf-8")
+
+
+def main(rows=200_000):
+    roster = make_roster(rows)
+    metrics = batch.compute_batch(
+        roster["weight"], roster["height"], roster["age"], roster["gender"], roster["activity"]
+    )
+    columns = exports.batch_export_columns(metrics)
+    decoded = {name: metrics.column(name) for name in columns}
+
+    for label, vectorized, per_row in (
+        ("csv", exports.batch_to_csv, per_row_csv),
+        ("jsonl", exports.batch_to_jsonl, per_row_jsonl),
+    ):
+        fast, fast_time = timed(vectorized, columns)
+        slow, slow_time = timed(per_row, decoded)
+        assert fast == slow, f"{label} export differs from the per-row writer"
+        print(f"{label:<6} columnar {fast_time:.3f}s  per-row {slow_time:.3f}s  ({len(fast) / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,36 @@
+"""Batch engine throughput for every registered BMR formula and category system.
+
+Run with ``python benchmarks/bench_formulas.py [rows]`` from the repository root.
+The CDC percentiles are skipped unless their table is installed (see
+:mod:`bmi_calculator.formulas`).
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_batch import make_roster, timed  # noqa: E402
+
+from bmi_calculator import batch, formulas  # noqa: E402
+
+
+def main(rows=1_000_000):
+    roster = make_roster(rows)
+    body_fat = np.random.default_rng(1).uniform(10, 40, rows)
+    inputs = (roster["weight"], roster["height"], roster["age"], roster["gender"], roster["activity"])
+    _, default_time = timed(batch.compute_batch, *inputs)
+    print(f"{'default':<34} {default_time:.3f}s")
+    for formula in formulas.BMR_FORMULAS.values():
+        for system in formulas.CATEGORY_SYSTEMS.values():
+            if not system.available():
+                print(f"{formula.name + ' / ' + system.name:<34} skipped (table not installed)")
+                continue
+            _, seconds = timed(batch.compute_batch, *inputs, formula.name, system.name, body_fat)
+            print(f"{formula.name + ' / ' + system.name:<34} {seconds:.3f}s  ({seconds / default_time:.2f}x)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
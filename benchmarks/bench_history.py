@@ -0,0 +1,107 @@
+"""Windowed per-user history queries against a large results table.
+
+Run with ``python benchmarks/bench_history.py [rows] [--db PATH]`` from the
+repository root (default: 10,000,000 rows). The database is filled once,
+100 results per user spread over two years, and reused by later runs with the
+same path and row count.
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bmi_calculator import calculations  # noqa: E402
+from bmi_calculator.history import HistoryStore  # noqa: E402
+
+ROWS_PER_USER = 100
+SPAN_SECONDS = 2 * 365 * 24 * 60 * 60
+WRITE_BATCH = 100_000
+NOW = 1_700_000_000.0
+
+
+def generate_rows(rows):
+    rng = random.Random(0)
+    categories = [name for name, _, _ in calculations.BMI_CATEGORIES]
+    for i in range(rows):
+        weight = rng.uniform(40, 160)
+        height = rng.randint(140, 210) / 100
+        bmi = round(weight / height ** 2, 2)
+        yield (
+            f"user{i // ROWS_PER_USER}",
+            NOW - SPAN_SECONDS + (i % ROWS_PER_USER) * SPAN_SECONDS / ROWS_PER_USER + rng.random(),
+            weight,
+            height,
+            rng.randint(18, 80),
+            rng.choice(("Male", "Female", "Other")),
+            rng.choice(calculations.ACTIVITY_LEVELS),
+            bmi,
+            rng.choice(categories),
+            rng.randint(1100, 2200),
+            rng.randint(1400, 4000),
+        )
+
+
+def fill(store, rows):
+    start = time.perf_counter()
+    batch = []
+    for row in generate_rows(rows):
+        batch.append(row)
+        if len(batch) == WRITE_BATCH:
+            store.write_many(batch)
+            batch = []
+    if batch:
+        store.write_many(batch)
+    seconds = time.perf_counter() - start
+    print(f"inserted {rows:,} rows in {seconds:.1f} s ({rows / seconds:,.0f} rows/s)")
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("rows", nargs="?", type=float, default=1e7)
+    parser.add_argument("--db", default=os.path.join(tempfile.gettempdir(), "bmi_history_bench.sqlite3"))
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args(argv)
+    rows = int(args.rows)
+
+    store = HistoryStore(args.db)
+    if store.count() != rows:
+        store.close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(args.db + suffix):
+                os.remove(args.db + suffix)
+        store = HistoryStore(args.db)
+        fill(store, rows)
+
+    users = max(1, rows // ROWS_PER_USER)
+    rng = random.Random(1)
+    for label, days in (("30 days", 30), ("1 year", 365), ("all", None)):
+        latencies = []
+        returned = 0
+        for _ in range(args.queries):
+            user = f"user{rng.randrange(users)}"
+            start = None if days is None else NOW - days * 24 * 60 * 60
+            t = time.perf_counter()
+            history = store.query(user, start=start)
+            latencies.append(time.perf_counter() - t)
+            returned += len(history["bmi"])
+        print(
+            f"window {label:<8} p50 {percentile(latencies, 0.5) * 1000:.3f} ms"
+            f"  p99 {percentile(latencies, 0.99) * 1000:.3f} ms"
+            f"  ({returned / args.queries:.0f} rows/query)"
+        )
+
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Guard the cold-start cost of the pure-Python core.
+
+Imports the core modules in fresh interpreters, reports the median import
+time, and exits non-zero when it exceeds the budget or
+when a heavy dependency gets pulled in.
+
+Run with ``python benchmarks/bench_import.py [budget_ms]`` from the repository root.
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CORE_MODULES = (
+    "bmi_calculator.calculations",
+    "bmi_calculator.tips",
+    "bmi_calculator.units",
+)
+HEAVY_MODULES = ("numpy", "plotly", "PIL", "streamlit", "streamlit_lottie", "requests")
+DEFAULT_BUDGET_MS = 30.0
+RUNS = 15
+
+
+def time_imports():
+    # Timed inside each fresh interpreter so process start-up is excluded
+    code = (
+        "import time\n"
+        "start = time.perf_counter()\n"
+        + "".join(f"import {name}\n" for name in CORE_MODULES)
+        + "print(time.perf_counter() - start)"
+    )
+    timings = []
+    for _ in range(RUNS):
+        out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True, capture_output=True, text=True)
+        timings.append(float(out.stdout))
+    return statistics.median(timings)
+
+
+def loaded_heavy_modules():
+    code = (
+        "import sys\n"
+        + "".join(f"import {name}\n" for name in CORE_MODULES)
+        + f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True, capture_output=True, text=True)
+    return [name for name in out.stdout.strip().split(",") if name]
+
+
+def main(budget_ms=DEFAULT_BUDGET_MS):
+    import_ms = time_imports() * 1000
+    heavy = loaded_heavy_modules()
+
+    print(f"core import: {import_ms:.1f} ms (budget {budget_ms:.0f} ms)")
+    if heavy:
+        print(f"FAIL: core pulled in heavy modules: {', '.join(heavy)}")
+        return 1
+    if import_ms > budget_ms:
+        print("FAIL: core import is over budget")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(float(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_BUDGET_MS))
@@ -0,0 +1,68 @@
+"""Time-to-result of the "Calculate Health Metrics" button under concurrency.
+
+Each simulated session is a headless ``AppTest`` run of main.py in its own
+process (compiling scripts from several threads of one interpreter is not
+safe for ``AppTest``): the page is loaded once, then the button is clicked
+repeatedly and every rerun is timed. The Lottie network fetch is mocked out,
+as in ``suite.py``, so the timings do not include the network.
+
+Run with ``python benchmarks/bench_latency.py [sessions] [clicks]`` from the
+repository root.
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from unittest import mock
+
+from streamlit.testing.v1 import AppTest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+APP_PATH = os.path.join(ROOT, "main.py")
+
+
+def run_session(clicks):
+    # No network: every Lottie fetch fails fast, like a cold offline cache
+    with mock.patch("bmi_calculator.lottie_cache.fetch_animation", return_value=None):
+        at = AppTest.from_file(APP_PATH, default_timeout=60)
+        at.run()
+        if at.exception:
+            raise RuntimeError(at.exception[0].value)
+        timings = []
+        for _ in range(clicks):
+            at.button[0].click()
+            start = time.perf_counter()
+            at.run()
+            timings.append(time.perf_counter() - start)
+            if at.exception:
+                raise RuntimeError(at.exception[0].value)
+    return timings
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+def main(sessions=4, clicks=10):
+    with tempfile.TemporaryDirectory() as scratch:
+        # The app tallies every click; the sessions inherit this and write
+        # to a scratch database instead of the real history
+        os.environ["BMI_HISTORY_DB"] = os.path.join(scratch, "history.sqlite3")
+        with ProcessPoolExecutor(max_workers=sessions) as pool:
+            results = list(pool.map(run_session, [clicks] * sessions))
+    timings = [t for session in results for t in session]
+    print(f"sessions: {sessions}, clicks per session: {clicks}")
+    print(f"p50: {percentile(timings, 50) * 1000:.1f} ms")
+    print(f"p99: {percentile(timings, 99) * 1000:.1f} ms")
+    print(f"mean: {statistics.mean(timings) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:3]]
+    main(*args)
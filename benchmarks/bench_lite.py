@@ -0,0 +1,143 @@
+"""Payload of a results render in full and lite mode.
+
+Starts the app with ``streamlit run`` on a free port and, for ``?lite=0`` and
+``?lite=1``, opens a real WebSocket session: it loads the page, clicks
+"Calculate" and adds up the ForwardMsg bytes the server sends, by element
+type. It also lists the frontend bundles only the full render makes the
+browser fetch (Streamlit's Plotly chart chunk and the Lottie component),
+raw and gzipped, since those dominate on a cold browser cache.
+
+The full render sends the Lottie animations from the local cache, or the
+small stand-ins bundled with ``bmi_calculator.lottie_cache`` on a machine
+that has never fetched them.
+
+Run with ``python benchmarks/bench_lite.py`` from the repository root.
+"""
+
+import asyncio
+import glob
+import gzip
+import os
+import subprocess
+import sys
+import tempfile
+from collections import Counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from load_test_workers import free_port_block  # noqa: E402
+
+from bmi_calculator.serve import wait_until_ready, worker_command, worker_env  # noqa: E402
+
+
+def element_name(msg):
+    kind = msg.WhichOneof("type")
+    if kind != "delta":
+        return kind
+    delta = msg.delta
+    if delta.WhichOneof("type") != "new_element":
+        return delta.WhichOneof("type")
+    element = delta.new_element
+    name = element.WhichOneof("type")
+    if name == "markdown" and "<style>" in element.markdown.body:
+        return "markdown (css)"
+    return name
+
+
+async def session(port, query_string, weight=95.0):
+    """Load the page, enter ``weight`` and click Calculate; return the bytes received by element."""
+    from streamlit.proto.BackMsg_pb2 import BackMsg
+    from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+    from websockets.asyncio.client import connect
+
+    sizes = Counter()
+
+    async def run(ws, back):
+        await ws.send(back.SerializeToString())
+        ids = {}
+        while True:
+            data = await ws.recv()
+            msg = ForwardMsg()
+            msg.ParseFromString(data)
+            name = element_name(msg)
+            sizes[name] += len(data)
+            if name in ("button", "number_input"):
+                widget = getattr(msg.delta.new_element, name)
+                ids.setdefault(name, widget.id)
+                if widget.id.endswith("weight_kg"):
+                    ids["weight"] = widget.id
+            elif name == "script_finished":
+                return ids
+
+    async with connect(f"ws://127.0.0.1:{port}/_stcore/stream", subprotocols=["streamlit"], max_size=None) as ws:
+        first = BackMsg()
+        first.rerun_script.query_string = query_string
+        ids = await run(ws, first)
+        click = BackMsg()
+        click.rerun_script.query_string = query_string
+        entered = click.rerun_script.widget_states.widgets.add()
+        entered.id = ids["weight"]
+        entered.double_value = weight
+        button = click.rerun_script.widget_states.widgets.add()
+        button.id = ids["button"]
+        button.trigger_value = True
+        await run(ws, click)
+    return sizes
+
+
+def frontend_bundles():
+    """(name, raw bytes, gzipped bytes) of the bundles only the full render loads."""
+    import streamlit
+    import streamlit_lottie
+
+    paths = {
+        "Plotly chart chunk": glob.glob(os.path.join(os.path.dirname(streamlit.__file__), "static", "static", "js", "PlotlyChart.*.js")),
+        "Lottie component": glob.glob(
+            os.path.join(os.path.dirname(streamlit_lottie.__file__), "frontend", "build", "static", "js", "*.js")
+        ),
+    }
+    bundles = []
+    for name, files in paths.items():
+        raw = zipped = 0
+        for path in files:
+            with open(path, "rb") as fh:
+                data = fh.read()
+            raw += len(data)
+            zipped += len(gzip.compress(data))
+        bundles.append((name, raw, zipped))
+    return bundles
+
+
+def main():
+    port = free_port_block(0)
+    with tempfile.TemporaryDirectory() as scratch:
+        env = worker_env()
+        env.pop("BMI_SHARED_CACHE", None)
+        env["BMI_HISTORY_DB"] = os.path.join(scratch, "history.sqlite3")
+        server = subprocess.Popen(worker_command("streamlit", port), cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            wait_until_ready("streamlit", [port], timeout=120)
+            results = {}
+            for mode, query_string in (("full", "lite=0"), ("lite", "lite=1")):
+                # The first session warms the caches and is not counted
+                asyncio.run(session(port, query_string))
+                results[mode] = asyncio.run(session(port, query_string))
+        finally:
+            server.terminate()
+            server.wait()
+
+    full, lite = results["full"], results["lite"]
+    print(f"{'element':<22} {'full bytes':>11} {'lite bytes':>11}")
+    for name in sorted(set(full) | set(lite), key=lambda name: -full.get(name, 0)):
+        print(f"{name:<22} {full.get(name, 0):>11,} {lite.get(name, 0):>11,}")
+    total_full, total_lite = sum(full.values()), sum(lite.values())
+    print(f"{'total':<22} {total_full:>11,} {total_lite:>11,}  "
+          f"saved {total_full - total_lite:,} bytes ({1 - total_lite / total_full:.0%})")
+    print("\nfrontend bundles not loaded in lite mode:")
+    for name, raw, zipped in frontend_bundles():
+        print(f"  {name:<20} {raw:>11,} bytes ({zipped:,} gzipped)")
+
+
+if __name__ == "__main__":
+    main()
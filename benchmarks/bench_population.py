@@ -0,0 +1,114 @@
+"""Population dashboard statistics from the pre-aggregated counts versus the raw results.
+
+Fills a fresh database with ``rows`` results through ``HistoryStore.write_many``
+(which also updates the counts) and times the same batches inserted without
+them, then times everything the dashboard shows read from the counts and
+recomputed from a scan of the results table, and checks both agree.
+
+Run with ``python benchmarks/bench_population.py [rows]`` from the repository
+root (default: 1,000,000 rows).
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_history import WRITE_BATCH, generate_rows  # noqa: E402
+
+from bmi_calculator import history, population  # noqa: E402
+from bmi_calculator.history import HistoryStore  # noqa: E402
+
+SCANNED = ("age", "gender", "activity", "bmi", "category", "daily_calories")
+
+
+def batches(rows):
+    batch = []
+    for row in generate_rows(rows):
+        batch.append(row)
+        if len(batch) == WRITE_BATCH:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def insert_only(path, all_batches):
+    conn = sqlite3.connect(path, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(history.SCHEMA)
+    start = time.perf_counter()
+    for batch in all_batches:
+        conn.execute("BEGIN")
+        conn.executemany(history._INSERT, batch)
+        conn.execute("COMMIT")
+    seconds = time.perf_counter() - start
+    conn.close()
+    return seconds
+
+
+def dashboard(pop):
+    """Everything the dashboard page shows, for every gender filter."""
+    return [
+        (pop.bmi_histogram(gender), pop.calorie_percentiles(gender=gender))
+        for gender in (None, "Male", "Female", "Other")
+    ] + [pop.category_shares(by) for by in population.CATEGORY_DIMENSIONS]
+
+
+def from_counts(store):
+    return dashboard(store.population())
+
+
+def from_scan(store):
+    with store.pool.connection() as conn:
+        rows = conn.execute(f"SELECT {', '.join(SCANNED)} FROM results").fetchall()
+    return dashboard(population.Population(population.bin_counts(dict(zip(SCANNED, zip(*rows))))))
+
+
+def timed(fn, *args, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main(rows=1_000_000):
+    all_batches = list(batches(rows))
+    with tempfile.TemporaryDirectory() as scratch:
+        plain = insert_only(os.path.join(scratch, "plain.sqlite3"), all_batches)
+
+        store = HistoryStore(os.path.join(scratch, "history.sqlite3"))
+        start = time.perf_counter()
+        for batch in all_batches:
+            store.write_many(batch)
+        counted = time.perf_counter() - start
+        with store.pool.connection() as conn:
+            bins = conn.execute("SELECT COUNT(*) FROM population_bins").fetchone()[0]
+
+        counts, count_time = timed(from_counts, store)
+        scanned, scan_time = timed(from_scan, store, repeat=1)
+        store.close()
+
+    for (histogram, percentiles), (scan_histogram, scan_percentiles) in zip(counts[:4], scanned[:4]):
+        assert all(np.array_equal(a, b) for a, b in zip(histogram, scan_histogram))
+        assert percentiles == scan_percentiles
+    for (keys, shares), (scan_keys, scan_shares) in zip(counts[4:], scanned[4:]):
+        assert keys == scan_keys and np.allclose(shares, scan_shares)
+
+    print(f"{rows:,} results in batches of {WRITE_BATCH:,}; the counts are {bins:,} rows")
+    print(f"insert only:            {plain:8.2f} s  ({rows / plain:,.0f} rows/s)")
+    print(f"insert and count:       {counted:8.2f} s  (+{counted / plain - 1:.0%})")
+    print(f"dashboard from counts:  {count_time * 1000:8.1f} ms")
+    print(f"dashboard from a scan:  {scan_time * 1000:8.1f} ms  ({scan_time / count_time:,.0f}x slower)")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,55 @@
+"""Daily weight trajectories for many people over a year.
+
+Run with ``python benchmarks/bench_simulation.py [people] [days]`` from the
+repository root. The closed form is checked against explicit daily steps
+before it is timed.
+"""
+
+import itertools
+import os
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bmi_calculator import batch, calculations, simulation  # noqa: E402
+
+
+def main(people=5_000, days=365):
+    rng = np.random.default_rng(0)
+    weight = rng.uniform(40, 160, people)
+    height = rng.integers(1400, 2101, people) / 10 / 100
+    age = rng.integers(18, 80, people)
+    gender = rng.choice(["Male", "Female", "Other"], people)
+    activity = rng.choice(calculations.ACTIVITY_LEVELS, people)
+    codes = batch.get_bmi_category(batch.calculate_bmi(weight, height))
+    change = batch.CATEGORY_CALORIE_CHANGES[codes]
+
+    def run():
+        trajectory = simulation.simulate(weight, height, age, gender, activity, change)
+        return trajectory.weights_at(np.arange(days + 1))
+
+    stepped = np.stack(list(itertools.islice(
+        simulation.simulate(weight, height, age, gender, activity, change).iter_days(), days + 1
+    )), axis=1)
+    assert np.allclose(run(), stepped, rtol=0, atol=1e-6)
+
+    closed = min(timeit.repeat(run, number=3, repeat=3)) / 3
+    print(f"closed form ({people:,} people x {days + 1} days): {closed * 1000:.1f} ms")
+    steps = min(timeit.repeat(lambda: list(itertools.islice(
+        simulation.simulate(weight, height, age, gender, activity, change).iter_days(), days + 1
+    )), number=1, repeat=3))
+    print(f"daily steps ({people:,} people x {days + 1} days): {steps * 1000:.1f} ms")
+    chart = min(timeit.repeat(
+        lambda: simulation.simulate(weight[:1], height[:1], age[:1], gender[:1], activity[:1], change[:1])
+        .weights_at(np.arange(13) * 7),
+        number=1000, repeat=3,
+    )) / 1000
+    print(f"one chart (13 weekly points): {chart * 1e6:.0f} us")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    main(*args)
@@ -0,0 +1,46 @@
+"""Ideal-weight lookups through the height tables versus the direct formulas.
+
+Run with ``python benchmarks/bench_tables.py [rows]`` from the repository root.
+"""
+
+import os
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bmi_calculator import batch, calculations, tables  # noqa: E402
+
+
+def main(rows=1_000_000):
+    rng = np.random.default_rng(0)
+    # Heights as the metric inputs produce them: 0.1 cm steps, divided by 100
+    heights = rng.integers(1400, 2101, rows) / 10 / 100
+    scalar_heights = heights[:10_000].tolist()
+
+    tables.get_tables()  # build outside the timed region
+    assert [tables.ideal_weight_range(h) for h in scalar_heights] == [
+        calculations.calculate_ideal_weight(h) for h in scalar_heights
+    ]
+
+    formula = min(timeit.repeat(lambda: [calculations.calculate_ideal_weight(h) for h in scalar_heights], number=5, repeat=3))
+    lookup = min(timeit.repeat(lambda: [tables.ideal_weight_range(h) for h in scalar_heights], number=5, repeat=3))
+    per_call = 1e9 / (5 * len(scalar_heights))
+    print(f"scalar formula: {formula * per_call:.0f} ns/call")
+    print(f"scalar lookup:  {lookup * per_call:.0f} ns/call")
+
+    formula = min(timeit.repeat(lambda: batch.calculate_ideal_weight(heights), number=3, repeat=3)) / 3
+    lookup = min(timeit.repeat(lambda: tables.ideal_weight_arrays(heights), number=3, repeat=3)) / 3
+    print(f"array formula ({rows:,} rows): {formula * 1000:.1f} ms")
+    print(f"array lookup  ({rows:,} rows): {lookup * 1000:.1f} ms")
+
+    build = min(timeit.repeat(
+        lambda: (tables._metric_table(), tables._imperial_table(), tables._mixed_table()), number=1, repeat=3
+    ))
+    print(f"table build: {build * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,112 @@
+"""Cost of the vectorized input validation next to scoring, with bad rows mixed in.
+
+A metric roster (kg, cm, as CSV strings) gets 1% corrupted rows: empty and
+non-numeric values, heights in metres, imperial rows, unknown labels and
+fractional ages. The
+vectorized checks must reject exactly the rows a per-row Python check
+rejects.
+
+Run with ``python benchmarks/bench_validation.py [rows] [chunk_size]`` from the repository root.
+"""
+
+import math
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_batch import make_roster, timed  # noqa: E402
+
+from bmi_calculator import batch, validation  # noqa: E402
+from bmi_calculator.calculations import ACTIVITY_LEVELS, GENDERS  # noqa: E402
+
+
+def make_bad_roster(rows, bad_fraction=0.01, seed=1):
+    roster = make_roster(rows)
+    columns = {
+        "weight": roster["weight"].astype(str),
+        "height": np.round(roster["height"] * 100, 1).astype(str),
+        "age": roster["age"].astype(str),
+        "gender": roster["gender"].astype(object),
+        "activity": roster["activity"].astype(object),
+    }
+    rng = np.random.default_rng(seed)
+    bad = rng.choice(rows, int(rows * bad_fraction), replace=False)
+    for i, kind in zip(bad.tolist(), rng.integers(0, 6, bad.size).tolist()):
+        if kind == 0:
+            columns["weight"][i] = ""
+        elif kind == 1:
+            columns["height"][i] = "n/a"
+        elif kind == 2:
+            columns["height"][i] = str(round(float(columns["height"][i]) / 100, 2))
+        elif kind == 3:
+            columns["weight"][i] = str(round(float(columns["weight"][i]) / 0.453592, 1))
+            columns["height"][i] = str(round(float(columns["height"][i]) / 2.54, 1))
+        elif kind == 4:
+            columns["gender"][i] = "unknown"
+        else:
+            columns["age"][i] += ".5"
+    return {name: values.tolist() for name, values in columns.items()}
+
+
+def _number(value):
+    try:
+        return float(value)
+    except ValueError:
+        return math.nan
+
+
+def validate_rows(columns):
+    """The same checks, one row at a time."""
+    low_weight, high_weight = validation.WEIGHT_RANGE_KG
+    low_height, high_height = validation.HEIGHT_RANGE_M
+    low_bmi, high_bmi = validation.BMI_RANGE
+    rejected = []
+    rows = zip(columns["weight"], columns["height"], columns["age"], columns["gender"], columns["activity"])
+    for i, (weight, height, age, gender, activity) in enumerate(rows):
+        weight, height, age = _number(weight), _number(height) / 100, _number(age)
+        ok = (low_weight <= weight <= high_weight and low_height <= height <= high_height
+              and validation.AGE_RANGE[0] <= age <= validation.AGE_RANGE[1] and age == int(age)
+              and gender in GENDERS and activity in ACTIVITY_LEVELS)
+        if not (ok and low_bmi <= weight / height ** 2 <= high_bmi):
+            rejected.append(i)
+    return rejected
+
+
+def validate_batch(columns):
+    return validation.validate(
+        columns["weight"], columns["height"], columns["age"], columns["gender"], columns["activity"]
+    )
+
+
+def main(rows=1_000_000, chunk_size=50_000):
+    columns = make_bad_roster(rows)
+    rejected, row_time = timed(validate_rows, columns)
+    chunks = [{name: values[start:start + chunk_size] for name, values in columns.items()}
+              for start in range(0, rows, chunk_size)]
+    checked, batch_time = timed(lambda: [validate_batch(chunk) for chunk in chunks])
+    errors = np.concatenate([chunk.errors for chunk in checked])
+    assert np.flatnonzero(errors).tolist() == rejected, "vectorized checks disagree with the per-row checks"
+
+    # The checks alone, on columns that are already arrays (kg and cm)
+    parsed = [{"weight": chunk.weight, "height": chunk.height * 100, "age": chunk.age,
+               "gender": chunk.gender, "activity": chunk.activity} for chunk in checked]
+    rechecked, check_time = timed(lambda: [validate_batch(chunk) for chunk in parsed])
+    assert all((a.errors != 0).tolist() == (b.errors != 0).tolist() for a, b in zip(checked, rechecked))
+    _, score_time = timed(lambda: [
+        batch.compute_batch(chunk.weight[ok], chunk.height[ok], chunk.age[ok], chunk.gender[ok], chunk.activity[ok])
+        for chunk, ok in ((chunk, chunk.errors == 0) for chunk in checked)
+    ])
+    print(f"{rows:,} rows in chunks of {chunk_size:,}, {len(rejected):,} rejected")
+    print(f"per-row parse and checks:     {row_time * 1000:8.1f} ms  ({rows / row_time:,.0f} rows/s)")
+    print(f"vectorized parse and checks:  {batch_time * 1000:8.1f} ms  ({rows / batch_time:,.0f} rows/s)")
+    print(f"vectorized checks alone:      {check_time * 1000:8.1f} ms  ({rows / check_time:,.0f} rows/s)")
+    print(f"scoring the valid rows:       {score_time * 1000:8.1f} ms  (the checks add {check_time / score_time:.0%})")
+    for message, count in validation.count_errors(errors).most_common():
+        print(f"  {count:7,} {message}")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
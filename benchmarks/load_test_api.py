@@ -0,0 +1,151 @@
+"""Load test for the HTTP scoring service on localhost.
+
+Starts ``python -m bmi_calculator.api`` on a free port (or targets
+``--url``), opens keep-alive connections and hammers the single or batch
+endpoint, then reports throughput and latency percentiles.
+
+Run with ``python benchmarks/load_test_api.py [--batch-size 1000]`` from the
+repository root.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bmi_calculator.calculations import ACTIVITY_LEVELS  # noqa: E402
+
+
+def make_record(rng):
+    return {
+        "weight": round(rng.uniform(45, 140), 1),
+        "height": round(rng.uniform(145, 205), 1),
+        "age": rng.randint(18, 80),
+        "gender": rng.choice(("Male", "Female", "Other")),
+        "activity": rng.choice(ACTIVITY_LEVELS),
+    }
+
+
+def build_request(host, batch_size, rng):
+    if batch_size > 1:
+        path, payload = "/v1/score/batch", {"records": [make_record(rng) for _ in range(batch_size)]}
+    else:
+        path, payload = "/v1/score", make_record(rng)
+    body = json.dumps(payload).encode()
+    head = (f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n")
+    return head.encode() + body
+
+
+async def read_response(reader):
+    status_line = await reader.readline()
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode().partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return int(status_line.split()[1])
+
+
+async def client(host, port, request, requests_per_client, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for _ in range(requests_per_client):
+            start = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            status = await read_response(reader)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+async def run_load(host, port, connections, requests_per_client, batch_size):
+    rng = random.Random(0)
+    requests = [build_request(host, batch_size, rng) for _ in range(connections)]
+    latencies, errors = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        client(host, port, request, requests_per_client, latencies, errors) for request in requests
+    ))
+    return time.perf_counter() - start, latencies, errors
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(host, port, timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            socket.create_connection((host, port), timeout=0.2).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"server on {host}:{port} did not start")
+
+
+def percentile(ordered, pct):
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+
+def report(elapsed, latencies, errors, batch_size):
+    latencies = sorted(latencies)
+    count = len(latencies)
+    print(f"requests: {count:,} in {elapsed:.2f}s ({count / elapsed:,.0f} req/s, "
+          f"{count * batch_size / elapsed:,.0f} records/s)")
+    print(f"latency p50: {percentile(latencies, 50) * 1000:.2f} ms, "
+          f"p90: {percentile(latencies, 90) * 1000:.2f} ms, "
+          f"p99: {percentile(latencies, 99) * 1000:.2f} ms")
+    if errors:
+        print(f"errors: {len(errors)}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the BMI scoring API.")
+    parser.add_argument("--url", help="target an already running server instead of starting one")
+    parser.add_argument("--connections", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=200, help="requests per connection")
+    parser.add_argument("--batch-size", type=int, default=1, help="records per request (>1 uses the batch endpoint)")
+    args = parser.parse_args(argv)
+
+    server = None
+    if args.url:
+        parts = urlsplit(args.url)
+        host, port = parts.hostname, parts.port or 80
+    else:
+        host, port = "127.0.0.1", free_port()
+        server = subprocess.Popen([sys.executable, "-m", "bmi_calculator.api", "--port", str(port)], cwd=ROOT)
+    try:
+        wait_for_port(host, port)
+        elapsed, latencies, errors = asyncio.run(
+            run_load(host, port, args.connections, args.requests, args.batch_size)
+        )
+        report(elapsed, latencies, errors, args.batch_size)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
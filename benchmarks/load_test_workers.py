@@ -0,0 +1,171 @@
+"""Session throughput of a multi-worker deployment as the worker count grows.
+
+For each worker count, starts ``python -m bmi_calculator.serve`` on a free
+port with a fresh shared cache and history database, then drives it through
+the built-in balancer for ``--duration`` seconds and reports throughput,
+speedup over one worker and scaling efficiency.
+
+- ``--app streamlit``: each simulated session opens the app's WebSocket,
+  runs the page, enters a random weight, clicks "Calculate" (rendering the
+  gauge and projection) and disconnects; throughput is sessions per second.
+- ``--app api``: keep-alive clients post single records; throughput is
+  requests per second.
+
+Run with ``python benchmarks/load_test_workers.py [--workers 1,2,4]`` from the
+repository root. Scaling can only be near-linear up to the number of CPU
+cores, so the default worker counts stop at ``os.cpu_count()``.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from load_test_api import build_request, read_response  # noqa: E402
+
+from bmi_calculator.serve import HEALTH_PATHS, wait_until_ready  # noqa: E402
+
+
+def free_port_block(size):
+    """A port whose following ``size`` ports are free too."""
+    while True:
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            base = sock.getsockname()[1]
+        if base + size >= 65535:
+            continue
+        try:
+            for port in range(base + 1, base + 1 + size):
+                with socket.socket() as sock:
+                    sock.bind(("127.0.0.1", port))
+            return base
+        except OSError:
+            continue
+
+
+async def streamlit_session(port, rng):
+    """One browser session: load the page, enter a weight, click Calculate."""
+    from streamlit.proto.BackMsg_pb2 import BackMsg
+    from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+    from websockets.asyncio.client import connect
+
+    async def run(ws, widgets):
+        await ws.send(widgets.SerializeToString())
+        ids = {}
+        while True:
+            msg = ForwardMsg()
+            msg.ParseFromString(await ws.recv())
+            kind = msg.WhichOneof("type")
+            if kind == "delta" and msg.delta.WhichOneof("type") == "new_element":
+                element = msg.delta.new_element
+                widget = getattr(element, element.WhichOneof("type") or "", None)
+                if getattr(widget, "id", ""):
+                    ids[element.WhichOneof("type")] = ids.get(element.WhichOneof("type"), []) + [widget.id]
+            elif kind == "script_finished":
+                return ids
+
+    async with connect(f"ws://127.0.0.1:{port}/_stcore/stream", subprotocols=["streamlit"], max_size=None) as ws:
+        first = BackMsg()
+        first.rerun_script.query_string = ""
+        ids = await run(ws, first)
+
+        click = BackMsg()
+        click.rerun_script.query_string = ""
+        weight = click.rerun_script.widget_states.widgets.add()
+        weight.id = next(i for i in ids["number_input"] if i.endswith("weight_kg"))
+        weight.double_value = round(rng.uniform(45, 140), 1)
+        button = click.rerun_script.widget_states.widgets.add()
+        button.id = ids["button"][0]
+        button.trigger_value = True
+        await run(ws, click)
+
+
+async def streamlit_user(port, deadline, rng, done, errors):
+    while time.perf_counter() < deadline:
+        try:
+            await streamlit_session(port, rng)
+            done.append(time.perf_counter())
+        except Exception as exc:  # noqa: BLE001 - any failure counts as an error
+            errors.append(repr(exc))
+
+
+async def api_user(port, deadline, rng, done, errors):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        while time.perf_counter() < deadline:
+            writer.write(build_request("127.0.0.1", 1, rng))
+            await writer.drain()
+            if await read_response(reader) == 200:
+                done.append(time.perf_counter())
+            else:
+                errors.append("status")
+    finally:
+        writer.close()
+
+
+async def drive(app, port, users, duration, warmup):
+    user = streamlit_user if app == "streamlit" else api_user
+    rng = random.Random(0)
+    # Warm every worker (imports, first figures) before measuring
+    await asyncio.gather(*(user(port, time.perf_counter() + warmup, rng, [], []) for _ in range(users)))
+    done, errors = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*(user(port, start + duration, rng, done, errors) for _ in range(users)))
+    return len(done) / (time.perf_counter() - start), errors
+
+
+def measure(app, workers, users_per_worker, duration, warmup):
+    port = free_port_block(workers)
+    with tempfile.TemporaryDirectory() as scratch:
+        env = dict(os.environ)
+        env["BMI_SHARED_CACHE"] = os.path.join(scratch, "shared.sqlite3")
+        env["BMI_HISTORY_DB"] = os.path.join(scratch, "history.sqlite3")
+        server = subprocess.Popen(
+            [sys.executable, "-m", "bmi_calculator.serve", "--app", app, "--workers", str(workers), "--port", str(port)],
+            cwd=ROOT, env=env, stdout=subprocess.DEVNULL,
+        )
+        try:
+            wait_until_ready(app, [port + 1 + i for i in range(workers)], timeout=120)
+            # Then the balancer itself
+            wait_until_ready(app, [port], timeout=30)
+            return asyncio.run(drive(app, port, users_per_worker * workers, duration, warmup))
+        finally:
+            server.terminate()
+            server.wait()
+
+
+def main(argv=None):
+    cpus = os.cpu_count() or 1
+    default_workers = ",".join(str(n) for n in (1, 2, 4, 8, 16) if n <= cpus) or "1"
+    parser = argparse.ArgumentParser(description="Load test the multi-worker deployment.")
+    parser.add_argument("--app", choices=sorted(HEALTH_PATHS), default="streamlit")
+    parser.add_argument("--workers", default=default_workers, help=f"comma-separated worker counts (default: {default_workers})")
+    parser.add_argument("--users-per-worker", type=int, default=4, help="concurrent sessions per worker")
+    parser.add_argument("--duration", type=float, default=20, help="measured seconds per worker count")
+    parser.add_argument("--warmup", type=float, default=5, help="unmeasured seconds before each run")
+    args = parser.parse_args(argv)
+
+    unit = "sessions/s" if args.app == "streamlit" else "req/s"
+    print(f"{cpus} CPUs, {args.app} workers, {args.users_per_worker} users per worker")
+    baseline = None
+    failed = False
+    for workers in (int(n) for n in args.workers.split(",")):
+        throughput, errors = measure(args.app, workers, args.users_per_worker, args.duration, args.warmup)
+        baseline = baseline or throughput / workers
+        speedup = throughput / baseline
+        print(f"{workers:>3} workers  {throughput:9.1f} {unit}  speedup {speedup:5.2f}x  "
+              f"efficiency {speedup / workers:6.1%}" + (f"  errors {len(errors)}" if errors else ""))
+        failed = failed or bool(errors)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
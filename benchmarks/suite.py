@@ -0,0 +1,166 @@
+"""Benchmark suite with a stored baseline and a regression gate.
+
+Covers scalar microbenchmarks of the calculations and the gauge figure, batch
+size sweeps of the vectorized engine, and headless reruns of main.py through
+Streamlit's ``AppTest`` with the Lottie network fetch mocked out.
+
+Usage (from the repository root)::
+
+    python benchmarks/suite.py --save-baseline        # record benchmarks/baseline.json
+    python benchmarks/suite.py                        # compare against it
+    python benchmarks/suite.py --threshold 0.10 --max-rows 10000000
+
+Each benchmark reports the best of several repeats in seconds per call. A run
+fails (exit status 1) when any benchmark is slower than its baseline by more
+than the threshold. Baselines are machine specific, so record one on the
+machine that runs the comparison.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import timeit
+from unittest import mock
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# The app tallies every Calculate click; keep the benchmark's clicks out of
+# the real history database. Set before bmi_calculator.history is imported.
+SCRATCH = tempfile.TemporaryDirectory()
+os.environ["BMI_HISTORY_DB"] = os.path.join(SCRATCH.name, "history.sqlite3")
+
+from bmi_calculator import batch, calculations, figures  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+DEFAULT_THRESHOLD = 0.25
+
+
+def best_of(func, number, repeat=5):
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+def micro_benchmarks():
+    weight, height, age = 72.5, 1.78, 34
+    yield "calculate_bmi", best_of(lambda: calculations.calculate_bmi(weight, height), 100_000)
+    yield "get_bmi_category", best_of(lambda: calculations.get_bmi_category(27.4), 100_000)
+    yield "calculate_bmr", best_of(lambda: calculations.calculate_bmr(weight, height, age, "Female"), 100_000)
+    yield "calculate_calories", best_of(lambda: calculations.calculate_calories(1650, "Very Active"), 100_000)
+    yield "calculate_ideal_weight", best_of(lambda: calculations.calculate_ideal_weight(height), 100_000)
+    yield "compute_health_metrics", best_of(
+        lambda: calculations.compute_health_metrics(weight, height, age, "Male", "Sedentary"), 20_000
+    )
+    # Uncached build versus a cache hit
+    yield "create_bmi_gauge[build]", best_of(lambda: figures._build_gauge(22.9), 20, repeat=3)
+    figures.create_bmi_gauge(22.9)
+    yield "create_bmi_gauge[cached]", best_of(lambda: figures.create_bmi_gauge(22.9), 100_000)
+
+
+def batch_sweep(max_rows):
+    rng = np.random.default_rng(0)
+    rows = 1
+    while rows <= max_rows:
+        weight = rng.uniform(40, 160, rows)
+        height = rng.integers(1400, 2101, rows) / 10 / 100
+        age = rng.integers(18, 80, rows)
+        gender = rng.choice(["Male", "Female", "Other"], rows)
+        activity = rng.integers(0, len(calculations.ACTIVITY_LEVELS), rows)
+        number = max(1, 100_000 // rows)
+        yield f"batch.compute_metrics[{rows}]", best_of(
+            lambda: batch.compute_metrics(weight, height, age, gender, activity), number, repeat=3
+        )
+        rows *= 10
+
+
+def app_benchmarks(reruns=10):
+    from streamlit.testing.v1 import AppTest
+
+    app_path = os.path.join(ROOT, "main.py")
+    # No network: every Lottie fetch fails fast, like a cold offline cache
+    with mock.patch("bmi_calculator.lottie_cache.fetch_animation", return_value=None):
+        first_load = []
+        clicks = []
+        for _ in range(reruns):
+            at = AppTest.from_file(app_path, default_timeout=60)
+            start = time.perf_counter()
+            at.run()
+            first_load.append(time.perf_counter() - start)
+            at.button[0].click()
+            start = time.perf_counter()
+            at.run()
+            clicks.append(time.perf_counter() - start)
+            if at.exception:
+                raise RuntimeError(at.exception[0].value)
+    yield "app.rerun[load]", min(first_load)
+    yield "app.rerun[calculate]", min(clicks)
+
+
+def run_suite(max_rows, include_app):
+    results = {}
+    groups = [micro_benchmarks(), batch_sweep(max_rows)]
+    if include_app:
+        groups.append(app_benchmarks())
+    for group in groups:
+        for name, seconds in group:
+            results[name] = seconds
+            print(f"{name:<36} {seconds * 1e6:>14.3f} us")
+    return results
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    print()
+    print(f"{'benchmark':<36} {'baseline us':>14} {'current us':>14} {'change':>9}")
+    for name, seconds in results.items():
+        before = baseline.get(name)
+        if before is None:
+            print(f"{name:<36} {'-':>14} {seconds * 1e6:>14.3f} {'new':>9}")
+            continue
+        change = seconds / before - 1
+        flag = " REGRESSION" if change > threshold else ""
+        print(f"{name:<36} {before * 1e6:>14.3f} {seconds * 1e6:>14.3f} {change:>+8.1%}{flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the BMI calculator benchmark suite.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown as a fraction of the baseline (default: 0.25)")
+    parser.add_argument("--max-rows", type=float, default=1e6, help="largest batch size in the sweep (default: 1e6)")
+    parser.add_argument("--skip-app", action="store_true", help="skip the Streamlit AppTest reruns")
+    args = parser.parse_args(argv)
+
+    results = run_suite(int(args.max_rows), not args.skip_app)
+
+    if args.save_baseline or not os.path.exists(args.baseline):
+        with open(args.baseline, "w", encoding="utf-8") as fh:
+            json.dump({
+                "machine": platform.platform(),
+                "python": platform.python_version(),
+                "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "results": results,
+            }, fh, indent=2, sort_keys=True)
+        print(f"\nbaseline written to {args.baseline}")
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as fh:
+        baseline = json.load(fh)["results"]
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1 @@
+"""Supporting modules for the Advanced BMI Calculator Streamlit app."""
@@ -0,0 +1,318 @@
+"""Asyncio HTTP/1.1 JSON service exposing the health metrics.
+
+Usage::
+
+    python -m bmi_calculator.api [--host 127.0.0.1] [--port 8080]
+
+Endpoints:
+
+``POST /v1/score``
+    One person: ``{"weight": 70, "height": 170, "age": 30, "gender": "Male",
+    "activity": "Moderately Active", "units": "metric"}``. Weight and height
+    are kg/cm for ``metric`` and lbs/inches for ``imperial``. Optional
+    ``bmr_formula`` and ``categories`` pick entries from
+    :mod:`bmi_calculator.formulas`; ``katch_mcardle`` needs ``body_fat`` (%).
+``POST /v1/score/batch``
+    ``{"records": [...], "units": "metric", "projection": false}``; records
+    have the same fields as a single request and are scored vectorized.
+    ``bmr_formula`` and ``categories`` apply to the whole batch.
+``GET /metrics``
+    Request counts and latency histograms in Prometheus text format.
+``GET /healthz``
+    Liveness check.
+
+Records are checked by :mod:`bmi_calculator.validation` before anything is
+computed; a request with a missing, non-numeric or implausible value gets a
+400 naming the first records that failed and why.
+
+Connections are kept alive between requests unless the client asks otherwise.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+from collections import defaultdict
+
+import numpy as np
+
+from . import batch
+from .calculations import compute_health_metrics
+from .formulas import get_bmr_formula, get_category_system
+from .models import RESULT_FIELDS
+from .simulation import simulate
+from .units import BULK_UNIT_FACTORS
+from .validation import describe_errors, validate
+
+logger = logging.getLogger(__name__)
+
+MAX_BODY_BYTES = 32 * 1024 * 1024
+KEEP_ALIVE_TIMEOUT = 15
+PROJECTION_WEEKS = 12
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class BadRequest(Exception):
+    status = 400
+
+
+class PayloadTooLarge(BadRequest):
+    status = 413
+
+
+class ServiceMetrics:
+    """Per-route request counters and latency histograms."""
+
+    def __init__(self):
+        self.started = time.time()
+        self.connections = 0
+        self.requests = defaultdict(int)  # (route, status) -> count
+        self.records = 0
+        self.latency_counts = defaultdict(lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+        self.latency_sum = defaultdict(float)
+
+    def observe(self, route, status, seconds):
+        self.requests[(route, status)] += 1
+        counts = self.latency_counts[route]
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                counts[i] += 1
+                break
+        else:
+            counts[-1] += 1
+        self.latency_sum[route] += seconds
+
+    def render(self):
+        lines = [
+            "# TYPE bmi_api_uptime_seconds gauge",
+            f"bmi_api_uptime_seconds {time.time() - self.started:.3f}",
+            "# TYPE bmi_api_connections_total counter",
+            f"bmi_api_connections_total {self.connections}",
+            "# TYPE bmi_api_records_scored_total counter",
+            f"bmi_api_records_scored_total {self.records}",
+            "# TYPE bmi_api_requests_total counter",
+        ]
+        for (route, status), count in sorted(self.requests.items()):
+            lines.append(f'bmi_api_requests_total{{route="{route}",status="{status}"}} {count}')
+        lines.append("# TYPE bmi_api_request_seconds histogram")
+        for route, counts in sorted(self.latency_counts.items()):
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS + ("+Inf",), counts):
+                cumulative += count
+                lines.append(f'bmi_api_request_seconds_bucket{{route="{route}",le="{bound}"}} {cumulative}')
+            lines.append(f'bmi_api_request_seconds_sum{{route="{route}"}} {self.latency_sum[route]:.6f}')
+            lines.append(f'bmi_api_request_seconds_count{{route="{route}"}} {cumulative}')
+        return "\n".join(lines) + "\n"
+
+
+def _units(payload):
+    units = payload.get("units", "metric")
+    if not isinstance(units, str) or units not in BULK_UNIT_FACTORS:
+        raise BadRequest(f"units must be one of: {', '.join(sorted(BULK_UNIT_FACTORS))}")
+    return units
+
+
+def _validated(records, units, formula):
+    """Convert and check ``records``, naming the first few that fail."""
+    try:
+        columns = {name: [r[name] for r in records] for name in ("weight", "height", "age", "gender", "activity")}
+        body_fat = [r.get("body_fat") for r in records]
+    except (KeyError, TypeError) as exc:
+        raise BadRequest(f"invalid record: {exc!r}")
+    for name, values in (*columns.items(), ("body_fat", body_fat)):
+        for i, value in enumerate(values):
+            if isinstance(value, (list, dict, bool)):
+                where = "" if len(records) == 1 else f"record {i}: "
+                raise BadRequest(f"{where}{name} must be a number or a string")
+    if all(value is None for value in body_fat):
+        body_fat = None
+    checked = validate(**columns, body_fat=body_fat, units=units, needs_body_fat=formula.needs_body_fat)
+    bad = np.flatnonzero(checked.errors)[:3]
+    if bad.size:
+        codes, labels = describe_errors(checked.errors[bad])
+        if len(records) == 1:
+            raise BadRequest(labels[codes[0]])
+        raise BadRequest("; ".join(f"record {i}: {labels[code]}" for i, code in zip(bad.tolist(), codes.tolist())))
+    return checked
+
+
+def _formulas(payload):
+    """Validate the optional ``bmr_formula`` and ``categories`` fields."""
+    for name in ("bmr_formula", "categories"):
+        if not isinstance(payload.get(name) or "", str):
+            raise BadRequest(f"{name} must be a string")
+    try:
+        formula = get_bmr_formula(payload.get("bmr_formula"))
+        system = get_category_system(payload.get("categories"))
+    except ValueError as exc:
+        raise BadRequest(str(exc))
+    if not system.available():
+        raise BadRequest(f"the {system.label} categories are not installed on this server")
+    return formula, system
+
+
+def score_one(payload):
+    units = _units(payload)
+    formula, system = _formulas(payload)
+    checked = _validated([payload], units, formula)
+    weight, height = float(checked.weight[0]), float(checked.height[0])
+    age, gender, activity = int(checked.age[0]), payload["gender"], payload["activity"]
+    body_fat = None if checked.body_fat is None else float(checked.body_fat[0])
+
+    metrics = compute_health_metrics(weight, height, age, gender, activity, formula.name, system.name, body_fat)
+    result = metrics.as_dict(RESULT_FIELDS)
+    weeks = np.arange(PROJECTION_WEEKS + 1)
+    trajectory = simulate(weight, height, age, gender, activity, metrics.calories_change, formula, body_fat)
+    result["projection"] = {
+        "weeks": weeks.tolist(),
+        "weight_kg": trajectory.weights_at(weeks * 7)[0].tolist(),
+    }
+    return result
+
+
+def score_batch(payload):
+    records = payload.get("records")
+    if not isinstance(records, list):
+        raise BadRequest("records must be a list")
+    units = _units(payload)
+    formula, system = _formulas(payload)
+    checked = _validated(records, units, formula)
+    weight, height, age, gender, activity, body_fat, _ = checked
+
+    metrics = batch.compute_batch(weight, height, age, gender, activity, formula, system, body_fat)
+    # Descriptions repeat per category, so batch responses leave them out
+    columns = {name: metrics.column(name).tolist() for name in RESULT_FIELDS if name != "description"}
+    if payload.get("projection"):
+        trajectory = simulate(
+            weight, height, age, gender, activity, metrics.column("calories_change"), formula, body_fat
+        )
+        columns["projection"] = trajectory.weights_at(np.arange(PROJECTION_WEEKS + 1) * 7).tolist()
+    names = list(columns)
+    return {"count": len(records), "results": [dict(zip(names, row)) for row in zip(*columns.values())]}
+
+
+class ScoringService:
+    def __init__(self):
+        self.metrics = ServiceMetrics()
+
+    async def handle_connection(self, reader, writer):
+        self.metrics.connections += 1
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(self._read_request(reader), KEEP_ALIVE_TIMEOUT)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except BadRequest as exc:
+                    await self._send(writer, exc.status, {"error": str(exc)}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+                method, path, headers, body = request
+                keep_alive = headers.get("connection", "").lower() != "close"
+                start = time.perf_counter()
+                status, response = await self._dispatch(method, path, body)
+                await self._send(writer, status, response, keep_alive)
+                self.metrics.observe(path if status != 404 else "unknown", status, time.perf_counter() - start)
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader):
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        try:
+            method, target, _ = request_line.decode("latin-1").split(" ", 2)
+        except ValueError:
+            raise BadRequest("malformed request line")
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get("content-length", 0) or 0)
+        except ValueError:
+            raise BadRequest("invalid Content-Length")
+        if length < 0:
+            raise BadRequest("invalid Content-Length")
+        if length > MAX_BODY_BYTES:
+            raise PayloadTooLarge("request body too large")
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), target.split("?", 1)[0], headers, body
+
+    async def _dispatch(self, method, path, body):
+        if path == "/healthz":
+            return 200, {"status": "ok"}
+        if path == "/metrics":
+            return 200, self.metrics.render()
+        handlers = {"/v1/score": score_one, "/v1/score/batch": score_batch}
+        if path not in handlers:
+            return 404, {"error": f"no route for {path}"}
+        if method != "POST":
+            return 405, {"error": "use POST"}
+        try:
+            payload = json.loads(body or b"{}")
+            if not isinstance(payload, dict):
+                raise BadRequest("request body must be a JSON object")
+            if path == "/v1/score/batch":
+                # Large batches are scored off the event loop
+                loop = asyncio.get_running_loop()
+                response = await loop.run_in_executor(None, score_batch, payload)
+                self.metrics.records += response["count"]
+            else:
+                response = score_one(payload)
+                self.metrics.records += 1
+        except (BadRequest, ValueError) as exc:
+            return 400, {"error": str(exc)}
+        except Exception:
+            logger.exception("error handling %s %s", method, path)
+            return 500, {"error": "internal server error"}
+        return 200, response
+
+    async def _send(self, writer, status, response, keep_alive):
+        if isinstance(response, str):
+            body, content_type = response.encode("utf-8"), "text/plain; version=0.0.4"
+        else:
+            body, content_type = json.dumps(response).encode("utf-8"), "application/json"
+        head = (
+            f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+            "\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+
+async def serve(host="127.0.0.1", port=8080):
+    service = ScoringService()
+    server = await asyncio.start_server(service.handle_connection, host, port)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m bmi_calculator.api", description="Serve the BMI metrics over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
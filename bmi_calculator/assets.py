@@ -0,0 +1,97 @@
+"""Self-hosted static assets for the app.
+
+The page background comes from ``bodymass.png`` in the repository root. At
+build time ``python -m bmi_calculator.assets`` resizes and recompresses it
+into ``static/`` as WebP (and AVIF when Pillow supports it); Streamlit serves
+that folder at ``app/static/`` (``enableStaticServing`` in
+``.streamlit/config.toml``), so browsers fetch and cache the image once.
+Without a build the original file is inlined as a base64 data URI instead.
+"""
+
+import argparse
+import base64
+import functools
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SOURCE_IMAGE = os.path.join(ROOT, "bodymass.png")
+STATIC_DIR = os.path.join(ROOT, "static")
+STATIC_ROUTE = "app/static"
+
+BACKGROUND_NAME = "background"
+# Formats to build, best first
+BUILD_FORMATS = (("avif", "AVIF", {"quality": 55}), ("webp", "WEBP", {"quality": 80, "method": 6}))
+MAX_WIDTH = 1920
+
+
+def _sniff_mime(data):
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    if data[:8] == b"\x89PNG\r\n\x1a\n":
+        return "image/png"
+    if data[:3] == b"\xff\xd8\xff":
+        return "image/jpeg"
+    return "application/octet-stream"
+
+
+def _built_backgrounds():
+    built = []
+    for extension, _, _ in BUILD_FORMATS:
+        if os.path.exists(os.path.join(STATIC_DIR, f"{BACKGROUND_NAME}.{extension}")):
+            built.append((extension, f"{STATIC_ROUTE}/{BACKGROUND_NAME}.{extension}"))
+    return built
+
+
+@functools.lru_cache(maxsize=None)
+def background_css(overlay="linear-gradient(rgba(0, 0, 0, 0.2), rgba(0, 0, 0, 0.2))"):
+    """Return the ``background-image`` declarations for the page background.
+
+    Built assets are offered through ``image-set()`` so browsers pick the best
+    format they support, after a plain WebP declaration for browsers that do
+    not understand ``image-set()``.
+    """
+    built = _built_backgrounds()
+    if not built:
+        with open(SOURCE_IMAGE, "rb") as fh:
+            data = fh.read()
+        uri = f"data:{_sniff_mime(data)};base64,{base64.b64encode(data).decode('ascii')}"
+        return f"background-image: {overlay}, url('{uri}');"
+    declarations = []
+    fallback = dict(built).get("webp")
+    if fallback:
+        declarations.append(f"background-image: {overlay}, url('{fallback}');")
+    candidates = ", ".join(f"url('{url}') type('image/{extension}')" for extension, url in built)
+    declarations.append(f"background-image: {overlay}, image-set({candidates});")
+    return "\n        ".join(declarations)
+
+
+def build(source=SOURCE_IMAGE, output_dir=STATIC_DIR, max_width=MAX_WIDTH):
+    """Write resized, recompressed copies of ``source`` to ``output_dir``."""
+    from PIL import Image, features
+
+    os.makedirs(output_dir, exist_ok=True)
+    written = []
+    with Image.open(source) as image:
+        image = image.convert("RGB")
+        if image.width > max_width:
+            image = image.resize((max_width, round(image.height * max_width / image.width)), Image.LANCZOS)
+        for extension, image_format, options in BUILD_FORMATS:
+            if not features.check(extension):
+                continue
+            path = os.path.join(output_dir, f"{BACKGROUND_NAME}.{extension}")
+            image.save(path, image_format, **options)
+            written.append(path)
+    background_css.cache_clear()
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m bmi_calculator.assets", description="Build the static image assets.")
+    parser.add_argument("--max-width", type=int, default=MAX_WIDTH)
+    args = parser.parse_args(argv)
+    for path in build(max_width=args.max_width):
+        print(f"{path}: {os.path.getsize(path):,} bytes")
+
+
+if __name__ == "__main__":
+    main()
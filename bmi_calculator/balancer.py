@@ -0,0 +1,99 @@
+"""A small local TCP load balancer for multi-worker deployments.
+
+Each client connection is forwarded whole to one worker, picked by fewest
+active connections, so WebSockets and keep-alive connections work unchanged.
+
+Streamlit keeps a session's state, uploads and download files in the worker
+that serves its WebSocket, so with ``sticky=True`` the first response on a
+connection without a ``bmi_worker`` cookie gets one, and later connections
+carrying it go back to the same worker. The stateless API does not need it.
+"""
+
+import asyncio
+import re
+import signal
+
+STICKY_COOKIE = "bmi_worker"
+
+# Largest request head read before picking a worker
+MAX_HEAD_BYTES = 64 * 1024
+
+_COOKIE = re.compile(rb"^cookie:.*?\b" + STICKY_COOKIE.encode() + rb"=(\d+)", re.IGNORECASE | re.MULTILINE)
+
+
+class Balancer:
+    """Forward connections to ``backends`` (a list of ``(host, port)``)."""
+
+    def __init__(self, backends, sticky=False):
+        self.backends = list(backends)
+        self.sticky = sticky
+        self.active = [0] * len(self.backends)
+        self.served = [0] * len(self.backends)
+
+    def choose(self, head):
+        """Return ``(worker index, whether the client is already pinned to it)``."""
+        if self.sticky:
+            match = _COOKIE.search(head)
+            if match and int(match.group(1)) < len(self.backends):
+                return int(match.group(1)), True
+        index = min(range(len(self.backends)), key=lambda i: (self.active[i], self.served[i]))
+        return index, False
+
+    async def handle(self, reader, writer):
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            writer.close()
+            return
+        index, pinned = self.choose(head)
+        try:
+            upstream_reader, upstream_writer = await asyncio.open_connection(*self.backends[index])
+        except OSError:
+            writer.write(b"HTTP/1.1 502 Bad Gateway\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+            writer.close()
+            return
+        self.active[index] += 1
+        self.served[index] += 1
+        try:
+            upstream_writer.write(head)
+            if self.sticky and not pinned:
+                response = await upstream_reader.readuntil(b"\r\n\r\n")
+                cookie = f"Set-Cookie: {STICKY_COOKIE}={index}; Path=/; HttpOnly; SameSite=Lax\r\n\r\n"
+                writer.write(response[:-2] + cookie.encode("latin-1"))
+            await asyncio.gather(_pipe(reader, upstream_writer), _pipe(upstream_reader, writer))
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError, asyncio.CancelledError):
+            # Cancelled when the balancer stops with connections still open
+            pass
+        finally:
+            self.active[index] -= 1
+            upstream_writer.close()
+            writer.close()
+
+    async def serve(self, host, port, stop_signals=(signal.SIGINT, signal.SIGTERM)):
+        """Balance ``host:port`` until one of ``stop_signals`` arrives."""
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in stop_signals:
+            loop.add_signal_handler(signum, stop.set)
+        server = await asyncio.start_server(self.handle, host, port, limit=MAX_HEAD_BYTES)
+        async with server:
+            await stop.wait()
+
+
+async def _pipe(source, destination):
+    try:
+        while True:
+            data = await source.read(65536)
+            if not data:
+                break
+            destination.write(data)
+            await destination.drain()
+    except ConnectionError:
+        pass
+    finally:
+        # Pass the half-close on so the other direction can finish
+        if destination.can_write_eof() and not destination.is_closing():
+            try:
+                destination.write_eof()
+            except OSError:
+                pass
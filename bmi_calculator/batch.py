@@ -0,0 +1,249 @@
+"""Vectorized versions of the calculations in :mod:`bmi_calculator.calculations`.
+
+Every function takes NumPy arrays (or anything ``np.asarray`` accepts) and
+returns arrays whose values are identical to calling the scalar function on
+each row, including Python's round-half-even behaviour.
+"""
+
+import numpy as np
+
+from . import formulas
+from .calculations import ACTIVITY_FACTORS, ACTIVITY_LEVELS, BMI_CATEGORIES, BMI_CUTOFFS, get_weight_goal
+from .tables import ideal_weight_arrays
+
+CUTOFFS = np.array(BMI_CUTOFFS, dtype=np.float64)
+CATEGORY_NAMES = np.array([name for name, _, _ in BMI_CATEGORIES])
+CATEGORY_COLORS = np.array([color for _, color, _ in BMI_CATEGORIES])
+CATEGORY_DESCRIPTIONS = np.array([description for _, _, description in BMI_CATEGORIES])
+
+# Weight goal and daily calorie change indexed by category code
+CATEGORY_GOALS = np.array([get_weight_goal(name)[0] for name, _, _ in BMI_CATEGORIES])
+CATEGORY_CALORIE_CHANGES = np.array([get_weight_goal(name)[1] for name, _, _ in BMI_CATEGORIES])
+
+# Activity factors indexed by activity code (position in ACTIVITY_LEVELS)
+ACTIVITY_FACTOR_TABLE = np.array([ACTIVITY_FACTORS[level] for level in ACTIVITY_LEVELS])
+ACTIVITY_LABELS = np.array(ACTIVITY_LEVELS)
+
+
+# Products within a few ulps of a .5 tie may round differently than Python
+_TIE_TOLERANCE = 4 * np.finfo(np.float64).eps
+
+
+def round_like_python(values, ndigits=0):
+    """Round an array exactly the way the builtin ``round`` rounds a float.
+
+    ``np.round`` scales by ``10**ndigits`` before rounding, which can land on
+    the other side of a tie than Python's correctly rounded result. Those rare
+    near-tie elements are recomputed with the builtin.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    scale = 10.0 ** ndigits
+    scaled = values * scale
+    rounded = np.rint(scaled)
+    with np.errstate(invalid="ignore"):
+        distance = np.abs(scaled - np.floor(scaled) - 0.5)
+    suspect = np.flatnonzero(distance <= _TIE_TOLERANCE * np.maximum(1.0, np.abs(scaled)))
+    result = rounded / scale
+    if suspect.size:
+        flat = result.reshape(-1)
+        source = values.reshape(-1)
+        flat[suspect] = [round(float(source[i]), ndigits) for i in suspect]
+    return result
+
+
+def encode_activity(activity):
+    """Return activity codes (indexes into ``ACTIVITY_LEVELS``) for labels or codes."""
+    activity = np.asarray(activity)
+    if activity.dtype.kind in "iu":
+        return activity
+    labels, inverse = np.unique(activity, return_inverse=True)
+    codes = np.array([ACTIVITY_LEVELS.index(label) for label in labels.tolist()], dtype=np.int8)
+    return codes[inverse].reshape(activity.shape)
+
+
+def calculate_bmi(weight, height):
+    weight = np.asarray(weight, dtype=np.float64)
+    height = np.asarray(height, dtype=np.float64)
+    return round_like_python(weight / (height ** 2), 2)
+
+
+def get_bmi_category(bmi):
+    """Return category codes (indexes into ``BMI_CATEGORIES``) for BMI values."""
+    return np.searchsorted(CUTOFFS, np.asarray(bmi, dtype=np.float64), side="right").astype(np.int8)
+
+
+def category_names(codes):
+    return CATEGORY_NAMES[codes]
+
+
+def bmr_coefficients(gender, formula=None, body_fat=None):
+    """Return the (base, weight, height, age) BMR coefficients per row.
+
+    ``formula`` is a name from :data:`bmi_calculator.formulas.BMR_FORMULAS`
+    (default: revised Harris-Benedict).
+    """
+    return formulas.get_bmr_formula(formula).coefficients(formulas.encode_sex(gender), body_fat)
+
+
+def bmr_unrounded(weight, height_in_meters, age, gender, formula=None, body_fat=None):
+    weight = np.asarray(weight, dtype=np.float64)
+    height_in_meters = np.asarray(height_in_meters, dtype=np.float64)
+    age = np.asarray(age, dtype=np.float64)
+    base, weight_coef, height_coef, age_coef = bmr_coefficients(gender, formula, body_fat)
+    return base + (weight_coef * weight) + (height_coef * height_in_meters * 100) - (age_coef * age)
+
+
+def calculate_bmr(weight, height_in_meters, age, gender, formula=None, body_fat=None):
+    return np.rint(bmr_unrounded(weight, height_in_meters, age, gender, formula, body_fat)).astype(np.int64)
+
+
+def activity_factors(activity):
+    return ACTIVITY_FACTOR_TABLE[encode_activity(activity)]
+
+
+def calculate_calories(bmr, activity):
+    return np.rint(np.asarray(bmr) * activity_factors(activity)).astype(np.int64)
+
+
+def calculate_ideal_weight(height_in_meters, gender=None):
+    # The range only depends on height; gender is accepted for parity with
+    # the scalar function
+    squared = np.asarray(height_in_meters, dtype=np.float64) ** 2
+    return round_like_python(18.5 * squared, 1), round_like_python(24.9 * squared, 1)
+
+
+def compute_metrics(weight, height_in_meters, age, gender, activity, bmr_formula=None, categories=None, body_fat=None):
+    """Compute every metric for a batch of people in a single pass.
+
+    Returns a dict of equally sized arrays: ``bmi``, ``category`` (codes),
+    ``bmr``, ``daily_calories``, ``lower_weight`` and ``upper_weight``.
+    ``bmr_formula`` and ``categories`` pick entries from
+    :mod:`bmi_calculator.formulas`; ``body_fat`` (percent) is only needed by
+    Katch-McArdle.
+    """
+    system = formulas.get_category_system(categories)
+    sex = formulas.encode_sex(gender)
+    bmi = calculate_bmi(weight, height_in_meters)
+    bmr = calculate_bmr(weight, height_in_meters, age, sex, bmr_formula, body_fat)
+    if system is formulas.WHO:
+        category = get_bmi_category(bmi)
+        lower_weight, upper_weight = ideal_weight_arrays(height_in_meters)
+    else:
+        category = system.categorize(bmi, age, sex)
+        low, high = system.healthy_bmi(age, sex)
+        squared = np.asarray(height_in_meters, dtype=np.float64) ** 2
+        lower_weight, upper_weight = round_like_python(low * squared, 1), round_like_python(high * squared, 1)
+    return {
+        "bmi": bmi,
+        "category": category,
+        "bmr": bmr,
+        "daily_calories": calculate_calories(bmr, activity),
+        "lower_weight": lower_weight,
+        "upper_weight": upper_weight,
+    }
+
+
+
+def metrics_dtype(gender_width=6):
+    """Structured dtype of :class:`HealthMetricsBatch`; labels are stored as codes."""
+    return np.dtype([
+        ("weight", np.float64),
+        ("height_in_meters", np.float64),
+        ("age", np.int64),
+        ("gender", f"U{max(1, gender_width)}"),
+        ("activity", np.int8),
+        ("bmi", np.float64),
+        ("category", np.int8),
+        ("bmr", np.int64),
+        ("daily_calories", np.int64),
+        ("lower_weight", np.float64),
+        ("upper_weight", np.float64),
+    ])
+
+
+class HealthMetricsBatch:
+    """Columnar counterpart of :class:`bmi_calculator.models.HealthMetrics`.
+
+    Rows live in one NumPy structured array (``data``); activity and category
+    are stored as codes and their labels, colors, goals and calorie changes
+    are looked up per column. Indexing a single row returns a ``HealthMetrics``.
+    """
+
+    __slots__ = ("data",)
+
+    # Fields stored as codes, with the table their labels come from
+    LABEL_FIELDS = {
+        "activity": ("activity", ACTIVITY_LABELS),
+        "category": ("category", CATEGORY_NAMES),
+        "color": ("category", CATEGORY_COLORS),
+        "description": ("category", CATEGORY_DESCRIPTIONS),
+        "goal": ("category", CATEGORY_GOALS),
+    }
+
+    def __init__(self, data):
+        self.data = data
+
+    @classmethod
+    def from_inputs(cls, weight, height_in_meters, age, gender, activity, bmr_formula=None, categories=None, body_fat=None):
+        gender = np.asarray(gender).astype(str)
+        activity = encode_activity(activity)
+        metrics = compute_metrics(weight, height_in_meters, age, gender, activity, bmr_formula, categories, body_fat)
+        data = np.empty(gender.shape, dtype=metrics_dtype(gender.dtype.itemsize // 4))
+        data["weight"] = weight
+        data["height_in_meters"] = height_in_meters
+        data["age"] = age
+        data["gender"] = gender
+        data["activity"] = activity
+        for name, values in metrics.items():
+            data[name] = values
+        return cls(data)
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, i):
+        from .models import HealthMetrics
+
+        row = self.data[i]
+        code = int(row["category"])
+        name, color, description = BMI_CATEGORIES[code]
+        return HealthMetrics(
+            weight=float(row["weight"]),
+            height_in_meters=float(row["height_in_meters"]),
+            age=int(row["age"]),
+            gender=str(row["gender"]),
+            activity=ACTIVITY_LEVELS[int(row["activity"])],
+            bmi=float(row["bmi"]),
+            category=name,
+            color=color,
+            description=description,
+            bmr=int(row["bmr"]),
+            daily_calories=int(row["daily_calories"]),
+            lower_weight=float(row["lower_weight"]),
+            upper_weight=float(row["upper_weight"]),
+            goal=str(CATEGORY_GOALS[code]),
+            calories_change=int(CATEGORY_CALORIE_CHANGES[code]),
+        )
+
+    def label_codes(self, name):
+        """Return ``(codes, labels)`` for one of :attr:`LABEL_FIELDS`."""
+        field, labels = self.LABEL_FIELDS[name]
+        return self.data[field], labels
+
+    def column(self, name):
+        """Return a column by field name, decoding labels; ``height`` is in cm."""
+        if name == "height":
+            return np.round(self.data["height_in_meters"] * 100, 4)
+        if name == "calories_change":
+            return CATEGORY_CALORIE_CHANGES[self.data["category"]]
+        if name in self.LABEL_FIELDS:
+            codes, labels = self.label_codes(name)
+            return labels[codes]
+        return self.data[name]
+
+
+def compute_batch(weight, height_in_meters, age, gender, activity, bmr_formula=None, categories=None, body_fat=None):
+    """Compute every metric for a batch of people into a :class:`HealthMetricsBatch`."""
+    return HealthMetricsBatch.from_inputs(
+        weight, height_in_meters, age, gender, activity, bmr_formula, categories, body_fat
+    )
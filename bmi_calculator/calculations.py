@@ -0,0 +1,126 @@
+"""Scalar health-metric calculations used by the Streamlit app."""
+
+from .models import HealthMetrics
+
+# Upper bounds (exclusive) of every BMI category except the last one
+BMI_CUTOFFS = (18.5, 25, 30, 35, 40)
+
+# BMI range drawn on the gauge
+GAUGE_RANGE = (10, 50)
+
+# (category, color, description) for each BMI band, in cutoff order
+BMI_CATEGORIES = (
+    ("Underweight", "#3366cc", "Your BMI indicates you're underweight. This may suggest insufficient calorie intake or other health issues."),
+    ("Normal Weight", "#4CAF50", "Your BMI is within the normal range. Keep maintaining a balanced diet and regular exercise."),
+    ("Overweight", "#ff9800", "Your BMI indicates you're overweight. Consider focusing on healthy dietary changes and increasing physical activity."),
+    ("Obese (Class I)", "#f44336", "Your BMI indicates Class I obesity. Consider consulting a healthcare professional for personalized advice."),
+    ("Obese (Class II)", "#e91e63", "Your BMI indicates Class II obesity. It's recommended to consult with healthcare professionals for a tailored weight management plan."),
+    ("Obese (Class III)", "#9c27b0", "Your BMI indicates Class III obesity. Please consult with healthcare professionals for medical guidance and support."),
+)
+
+ACTIVITY_FACTORS = {
+    "Sedentary": 1.2,
+    "Lightly Active": 1.375,
+    "Moderately Active": 1.55,
+    "Very Active": 1.725,
+    "Extremely Active": 1.9
+}
+
+ACTIVITY_LEVELS = tuple(ACTIVITY_FACTORS)
+
+GENDERS = ("Male", "Female", "Other")
+
+# Revised Harris-Benedict (base, weight, height cm, age) coefficients;
+# "Other" uses the mean of the male and female equations
+HARRIS_BENEDICT = {
+    "Male": (88.362, 13.397, 4.799, 5.677),
+    "Female": (447.593, 9.247, 3.098, 4.330),
+}
+HARRIS_BENEDICT["Other"] = tuple((m + f) / 2 for m, f in zip(HARRIS_BENEDICT["Male"], HARRIS_BENEDICT["Female"]))
+
+# Formulas used unless another one is picked from bmi_calculator.formulas
+DEFAULT_BMR_FORMULA = "harris_benedict"
+DEFAULT_CATEGORY_SYSTEM = "who"
+
+
+# Calculate BMI
+def calculate_bmi(weight, height):
+    bmi = weight / (height ** 2)
+    return round(bmi, 2)
+
+
+# BMI Categories
+def get_bmi_category(bmi):
+    for cutoff, category in zip(BMI_CUTOFFS, BMI_CATEGORIES):
+        if bmi < cutoff:
+            return category
+    return BMI_CATEGORIES[-1]
+
+
+# Calculate BMR (Basal Metabolic Rate)
+def calculate_bmr(weight, height_in_meters, age, gender):
+    base, weight_coef, height_coef, age_coef = HARRIS_BENEDICT.get(gender, HARRIS_BENEDICT["Other"])
+    bmr = base + (weight_coef * weight) + (height_coef * height_in_meters * 100) - (age_coef * age)
+    return round(bmr)
+
+
+# Calculate daily calorie needs
+def calculate_calories(bmr, activity):
+    return round(bmr * ACTIVITY_FACTORS[activity])
+
+
+# Calculate ideal weight range (the same healthy BMI range for every gender;
+# the argument is kept for callers that pass it)
+def calculate_ideal_weight(height_in_meters, gender=None):
+    squared = height_in_meters ** 2
+    return round(18.5 * squared, 1), round(24.9 * squared, 1)
+
+
+# Weight goal and daily calorie adjustment for a BMI category
+def get_weight_goal(category):
+    if category == "Underweight":
+        return "gain", 500
+    elif category in ["Normal Weight"]:
+        return "maintain", 0
+    else:
+        return "lose", -500
+
+
+# Every metric shown on the results page, computed in one go into a
+# HealthMetrics record. Other formulas from bmi_calculator.formulas go
+# through the batch engine with a single row.
+def compute_health_metrics(weight, height_in_meters, age, gender, activity,
+                           bmr_formula=None, categories=None, body_fat=None):
+    if (bmr_formula or DEFAULT_BMR_FORMULA) != DEFAULT_BMR_FORMULA or (categories or DEFAULT_CATEGORY_SYSTEM) != DEFAULT_CATEGORY_SYSTEM:
+        from . import batch
+
+        metrics = batch.compute_batch(
+            [weight], [height_in_meters], [age], [gender], [activity],
+            bmr_formula=bmr_formula, categories=categories, body_fat=None if body_fat is None else [body_fat],
+        )
+        return metrics[0]
+    bmi = calculate_bmi(weight, height_in_meters)
+    category, color, description = get_bmi_category(bmi)
+    # Imported here: the tables are built from the formulas in this module
+    from .tables import ideal_weight_range
+
+    bmr = calculate_bmr(weight, height_in_meters, age, gender)
+    lower_weight, upper_weight = ideal_weight_range(height_in_meters)
+    goal, calories_change = get_weight_goal(category)
+    return HealthMetrics(
+        weight=weight,
+        height_in_meters=height_in_meters,
+        age=age,
+        gender=gender,
+        activity=activity,
+        bmi=bmi,
+        category=category,
+        color=color,
+        description=description,
+        bmr=bmr,
+        daily_calories=calculate_calories(bmr, activity),
+        lower_weight=lower_weight,
+        upper_weight=upper_weight,
+        goal=goal,
+        calories_change=calories_change,
+    )
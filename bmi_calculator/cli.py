@@ -0,0 +1,258 @@
+"""Headless bulk scoring of CSV or Parquet rosters.
+
+Usage::
+
+    python -m bmi_calculator input.csv output.csv [--units metric] [--chunk-size 50000] [--workers N]
+    python -m bmi_calculator input.parquet cohort.pdf [--format pdf]
+
+The input needs ``weight``, ``height``, ``age``, ``gender`` and ``activity``
+columns. It is read in fixed-size chunks that are scored on a process pool and
+written back in input order as soon as they are ready, so memory use depends
+on the chunk size and worker count, not on the size of the file.
+
+The output format follows the output file's extension (or ``--format``):
+CSV, JSON lines and Parquet echo the input columns next to the scores; HTML
+and PDF are paginated reports with the fields of the text report.
+
+Every chunk is checked by :mod:`bmi_calculator.validation` before it is
+scored. Rows with missing, non-numeric or implausible values (or an unknown
+gender or activity) are left out of the output; ``--errors`` streams them,
+with the reasons, to a CSV file, and a summary is printed to stderr.
+"""
+
+import argparse
+import contextlib
+import csv
+import io
+import itertools
+import os
+import sys
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from . import batch
+from .formulas import BMR_FORMULAS, CATEGORY_SYSTEMS, get_bmr_formula
+from .exports import FORMATS, batch_export_columns, batch_to_csv, batch_to_jsonl, format_for_path, stream_export, write_export
+from .models import EXPORT_COLUMNS, REPORT_COLUMNS
+from .units import BULK_UNIT_FACTORS
+from .validation import ErrorReport, parse_numbers, reject, validate
+
+INPUT_COLUMNS = ("weight", "height", "age", "gender", "activity")
+# Read when present; the Katch-McArdle equation needs body fat (percent)
+OPTIONAL_COLUMNS = ("body_fat",)
+OUTPUT_COLUMNS = EXPORT_COLUMNS
+
+# Formats that are reports on the people rather than scored rosters
+REPORT_FORMATS = ("html", "pdf")
+
+# A block of unparsed CSV lines plus the header they belong to
+CsvChunk = namedtuple("CsvChunk", ["fieldnames", "lines"])
+
+
+def _source_name(source):
+    return source if isinstance(source, (str, os.PathLike)) else getattr(source, "name", "input")
+
+
+def iter_csv_chunks(source, chunk_size):
+    """Yield :class:`CsvChunk` blocks from a path or a binary file object."""
+    # Raw lines are handed to the workers, which do the CSV parsing, so the
+    # reader process only splits the file. utf-8-sig drops the byte order
+    # mark Excel writes before the header.
+    if isinstance(source, (str, os.PathLike)):
+        fh = open(source, newline="", encoding="utf-8-sig")
+    else:
+        fh = io.TextIOWrapper(source, newline="", encoding="utf-8-sig")
+    try:
+        fieldnames = next(csv.reader([fh.readline()]), [])
+        missing = set(INPUT_COLUMNS) - set(fieldnames)
+        if missing:
+            raise ValueError(f"{_source_name(source)} is missing columns: {', '.join(sorted(missing))}")
+        while True:
+            lines = list(itertools.islice(fh, chunk_size))
+            if not lines:
+                break
+            # An odd number of quotes means the last record has a quoted
+            # field with a line break in it; keep its lines together
+            quotes = sum(line.count('"') for line in lines)
+            while quotes % 2:
+                line = fh.readline()
+                if not line:
+                    break
+                lines.append(line)
+                quotes += line.count('"')
+            yield CsvChunk(fieldnames, lines)
+    finally:
+        if isinstance(source, (str, os.PathLike)):
+            fh.close()
+        else:
+            fh.detach()
+
+
+def parse_csv_chunk(chunk):
+    # Short rows are padded with empty fields and long ones cut, so a ragged
+    # row is rejected by the validator instead of misaligning the columns
+    width = len(chunk.fieldnames)
+    padding = [""] * width
+    rows = [row[:width] if len(row) >= width else row + padding[len(row):] for row in csv.reader(chunk.lines) if row]
+    columns = list(zip(*rows)) if rows else [()] * width
+    by_name = dict(zip(chunk.fieldnames, columns))
+    return {name: by_name[name] for name in INPUT_COLUMNS + OPTIONAL_COLUMNS if name in by_name}
+
+
+def iter_parquet_chunks(source, chunk_size):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise SystemExit("Reading Parquet files requires pyarrow (pip install pyarrow)")
+    parquet_file = pq.ParquetFile(source)
+    names = parquet_file.schema_arrow.names
+    columns = list(INPUT_COLUMNS) + [name for name in OPTIONAL_COLUMNS if name in names]
+    for record_batch in parquet_file.iter_batches(batch_size=chunk_size, columns=columns):
+        yield record_batch.to_pydict()
+
+
+def iter_chunks(source, chunk_size):
+    if str(_source_name(source)).lower().endswith((".parquet", ".pq")):
+        return iter_parquet_chunks(source, chunk_size)
+    return iter_csv_chunks(source, chunk_size)
+
+
+def output_columns(fmt):
+    return REPORT_COLUMNS if fmt in REPORT_FORMATS else OUTPUT_COLUMNS
+
+
+def score_chunk(chunk, units="metric", fmt="csv", bmr_formula=None, categories=None):
+    """Validate and score one chunk of input columns for output format ``fmt``.
+
+    Returns the scored valid rows and the chunk's :data:`Rejected` rows.
+    CSV and JSON lines come back already formatted (bytes, no header), so the
+    formatting happens in the worker; other formats get ``{name: array}``
+    columns for the main process to write.
+    """
+    if isinstance(chunk, CsvChunk):
+        chunk = parse_csv_chunk(chunk)
+    formula = get_bmr_formula(bmr_formula)
+    if formula.needs_body_fat and "body_fat" not in chunk:
+        raise ValueError(f"the {formula.label} equation needs a body_fat column")
+    weight = parse_numbers(chunk["weight"])
+    height = parse_numbers(chunk["height"])
+    checked = validate(
+        weight, height, chunk["age"], chunk["gender"], chunk["activity"], chunk.get("body_fat"), units,
+        formula.needs_body_fat,
+    )
+    rejected = reject(chunk, checked.errors)
+    # Bad rows are dropped before anything is computed
+    valid = slice(None) if not rejected.index.size else checked.errors == 0
+    age = checked.age[valid].astype(np.int64)
+    body_fat = None if checked.body_fat is None else checked.body_fat[valid]
+    metrics = batch.compute_batch(
+        checked.weight[valid], checked.height[valid], age, checked.gender[valid], checked.activity[valid],
+        bmr_formula, categories, body_fat,
+    )
+    if fmt in REPORT_FORMATS:
+        return batch_export_columns(metrics, output_columns(fmt)), rejected
+    if fmt == "csv":
+        # The input columns are echoed exactly as they were read
+        echo = {name: np.asarray(chunk[name])[valid] for name in INPUT_COLUMNS}
+    else:
+        # Typed formats echo the parsed values, still in the input units;
+        # validated ages are whole numbers
+        echo = {"weight": weight[valid], "height": height[valid], "age": age,
+                "gender": checked.gender[valid], "activity": checked.activity[valid]}
+    columns = batch_export_columns(metrics, OUTPUT_COLUMNS, overrides=echo)
+    if fmt == "csv":
+        return batch_to_csv(columns, header=False), rejected
+    if fmt == "jsonl":
+        return batch_to_jsonl(columns), rejected
+    return columns, rejected
+
+
+def iter_scored(source, units="metric", chunk_size=50_000, workers=None, fmt="csv", bmr_formula=None, categories=None,
+                report=None):
+    """Yield the scored rows of :func:`score_chunk` for ``source`` in input order.
+
+    Rejected rows go to ``report`` (an :class:`ErrorReport`), if given, in
+    the same order. At most ``2 * workers`` chunks are in flight at once.
+    """
+    report = report or ErrorReport()
+    workers = workers or os.cpu_count() or 1
+    chunks = iter_chunks(source, chunk_size)
+    if workers == 1:
+        results = (score_chunk(chunk, units, fmt, bmr_formula, categories) for chunk in chunks)
+    else:
+        results = _score_in_pool(chunks, workers, units, fmt, bmr_formula, categories)
+    for scored, rejected in results:
+        report.add(rejected)
+        yield scored
+
+
+def _score_in_pool(chunks, workers, *options):
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = []
+        for chunk in chunks:
+            pending.append(pool.submit(score_chunk, chunk, *options))
+            if len(pending) >= 2 * workers:
+                yield pending.pop(0).result()
+        for future in pending:
+            yield future.result()
+
+
+def score_file(input_path, output_path, units="metric", chunk_size=50_000, workers=None, fmt=None,
+               bmr_formula=None, categories=None, report=None):
+    """Stream ``input_path`` through the batch engine into ``output_path``.
+
+    ``fmt`` defaults to the format matching the output file's extension, or
+    CSV. Rejected rows go to ``report``, if given. Returns the number of
+    bytes written.
+    """
+    fmt = fmt or format_for_path(output_path)
+    scored = iter_scored(input_path, units, chunk_size, workers, fmt, bmr_formula, categories, report)
+    with open(output_path, "wb") as out:
+        return write_export(out, stream_export(fmt, scored, output_columns(fmt)))
+
+
+def score_to_bytes(source, units="metric", fmt="csv", bmr_formula=None, categories=None, report=None):
+    """Score ``source`` in this process and return the whole ``fmt`` report as bytes.
+
+    For serving a report from memory, as the app's download button does.
+    """
+    out = io.BytesIO()
+    scored = iter_scored(source, units, workers=1, fmt=fmt, bmr_formula=bmr_formula, categories=categories,
+                         report=report)
+    write_export(out, stream_export(fmt, scored, output_columns(fmt)))
+    return out.getvalue()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m bmi_calculator", description="Bulk-score a BMI roster.")
+    parser.add_argument("input", help="CSV or Parquet file with weight, height, age, gender and activity columns")
+    parser.add_argument("output", help="file to write the scored rows or the report to")
+    parser.add_argument("--units", choices=sorted(BULK_UNIT_FACTORS), default="metric",
+                        help="metric: kg and cm, imperial: lbs and inches (default: metric)")
+    parser.add_argument("--chunk-size", type=int, default=50_000, help="rows per chunk (default: 50000)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--format", choices=sorted(FORMATS), default=None,
+                        help="output format (default: from the output file's extension, else csv)")
+    parser.add_argument("--bmr-formula", choices=list(BMR_FORMULAS), default=None,
+                        help="BMR equation (default: harris_benedict; katch_mcardle needs a body_fat column)")
+    parser.add_argument("--categories", choices=list(CATEGORY_SYSTEMS), default=None,
+                        help="BMI category system (default: who)")
+    parser.add_argument("--errors", default=None,
+                        help="CSV file to write the rejected rows to, with the reasons")
+    args = parser.parse_args(argv)
+
+    try:
+        with contextlib.ExitStack() as stack:
+            report = ErrorReport(stack.enter_context(open(args.errors, "wb")) if args.errors else None)
+            score_file(
+                args.input, args.output, args.units, args.chunk_size, args.workers, args.format,
+                args.bmr_formula, args.categories, report,
+            )
+    except (OSError, ValueError, KeyError, ImportError) as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    if report.rejected:
+        print(report.summary(), file=sys.stderr)
+    return 0
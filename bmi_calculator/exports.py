@@ -0,0 +1,478 @@
+"""Exports of health metrics: CSV, JSON lines, Parquet, HTML and PDF.
+
+Single results are written from a :class:`HealthMetrics` record. Batches are
+written from the arrays of a :class:`HealthMetricsBatch` a whole column at a
+time: numbers are formatted by NumPy, repeated labels are escaped once per
+distinct value, the columns are joined row-wise into one fixed-width byte
+buffer and its padding is stripped, so no Python object is created per row.
+
+Cohort reports are generators (:data:`FORMATS`, :func:`stream_export`) that
+take an iterable of batches and yield the file as byte chunks, one batch or
+page at a time, so memory stays flat however many people are exported.
+"""
+
+import csv
+import html
+import io
+import json
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from .models import EXPORT_COLUMNS, REPORT_COLUMNS, REPORT_LABELS
+
+# A label column kept as codes into a small table of labels, so each label is
+# formatted once rather than once per row
+LabelColumn = namedtuple("LabelColumn", ["codes", "labels"])
+
+
+def metrics_to_csv(metrics, columns=EXPORT_COLUMNS):
+    """Return a header and one row of CSV for a :class:`HealthMetrics` record."""
+    out = io.StringIO()
+    writer = csv.writer(out, lineterminator="\n")
+    writer.writerow(columns)
+    writer.writerow([getattr(metrics, name) for name in columns])
+    return out.getvalue()
+
+
+def metrics_to_json(metrics, columns=EXPORT_COLUMNS):
+    """Return a :class:`HealthMetrics` record as a JSON object."""
+    return json.dumps(metrics.as_dict(columns))
+
+
+def batch_export_columns(metrics_batch, columns=EXPORT_COLUMNS, overrides=None):
+    """Return ``{name: array}`` for ``columns``, taking ``overrides`` first.
+
+    ``overrides`` lets callers echo input columns in their own units instead
+    of the batch's kg and m.
+    """
+    overrides = overrides or {}
+    exported = {}
+    for name in columns:
+        if name in overrides:
+            exported[name] = overrides[name]
+        elif name in metrics_batch.LABEL_FIELDS:
+            exported[name] = LabelColumn(*metrics_batch.label_codes(name))
+        else:
+            exported[name] = metrics_batch.column(name)
+    return exported
+
+
+def _format_labels(values, escape):
+    if isinstance(values, LabelColumn):
+        codes, labels = values
+    else:
+        labels, codes = np.unique(values.astype(str), return_inverse=True)
+    encoded = np.array([escape(str(label)).encode("utf-8") for label in labels.tolist()], dtype=bytes)
+    return encoded[np.asarray(codes).reshape(-1)]
+
+
+def _csv_quote(label):
+    # The quoting csv.writer applies by default
+    if any(ch in label for ch in ',"\n\r'):
+        return '"' + label.replace('"', '""') + '"'
+    return label
+
+
+# Values with at most this many decimals are formatted as scaled integers
+_MAX_DECIMALS = 4
+# Below this magnitude such values cannot need exponent notation or a
+# shorter round-tripping repr, so the integer form equals str(float)
+_DECIMAL_LIMIT = 1e9
+
+
+def _digit_matrix(values, width=None):
+    """ASCII digits of non-negative int64 ``values`` as a ``(rows, width)`` uint8 matrix.
+
+    Without ``width`` leading zeros are left as NUL padding; with it every
+    row is zero-padded to exactly ``width`` digits.
+    """
+    pad = width is None
+    if pad:
+        width = len(str(int(values.max()))) if values.size else 1
+    powers = 10 ** np.arange(width - 1, -1, -1, dtype=np.int64)
+    column = values[:, np.newaxis]
+    digits = (column // powers % 10 + ord("0")).astype(np.uint8)
+    if pad:
+        digits[(column < powers) & (powers > 1)] = 0
+    return digits
+
+
+def _sign_column(values):
+    return np.where(np.signbit(values), ord("-"), 0).astype(np.uint8)[:, np.newaxis]
+
+
+def _integer_field(values):
+    if values.size and (values.min() == np.iinfo(np.int64).min or values.max() > np.iinfo(np.int64).max):
+        return None
+    return np.hstack([_sign_column(values), _digit_matrix(np.abs(values.astype(np.int64)))])
+
+
+def _decimal_field(values):
+    """Format floats that have few decimals like ``str(float)``, as a byte matrix.
+
+    Returns None when some value needs the general repr (more decimals,
+    non-finite or very large), which NumPy's ``astype`` then handles.
+    """
+    magnitude = np.abs(values)
+    if not values.size or not (magnitude < _DECIMAL_LIMIT).all():
+        return None
+    for decimals in range(_MAX_DECIMALS + 1):
+        scale = 10 ** decimals
+        scaled = np.rint(magnitude * scale)
+        if (scaled / scale == magnitude).all():
+            break
+    else:
+        return None
+    scaled = scaled.astype(np.int64)
+    fraction = _digit_matrix(scaled % scale, max(decimals, 1))
+    # Strip trailing zeros, keeping at least one digit
+    trailing = np.ones(len(values), dtype=bool)
+    for column in range(fraction.shape[1] - 1, 0, -1):
+        trailing &= fraction[:, column] == ord("0")
+        fraction[trailing, column] = 0
+    point = np.full((len(values), 1), ord("."), dtype=np.uint8)
+    return np.hstack([_sign_column(values), _digit_matrix(scaled // scale), point, fraction])
+
+
+def _csv_field(values):
+    if isinstance(values, LabelColumn):
+        return _format_labels(values, _csv_quote)
+    values = np.asarray(values)
+    if values.dtype.kind in "USO":
+        values = values.astype(str)
+        plain = not any((np.strings.find(values, ch) >= 0).any() for ch in ',"\n\r')
+        if plain:
+            try:
+                return values.astype(bytes)
+            except UnicodeEncodeError:
+                pass
+        return _format_labels(values, _csv_quote)
+    if values.dtype.kind == "b":
+        return np.where(values, b"True", b"False")
+    if values.dtype.kind in "fiu":
+        matrix = _decimal_field(values) if values.dtype.kind == "f" else _integer_field(values)
+        if matrix is not None:
+            return matrix
+    # float64 is formatted with the shortest repr, exactly like str(float)
+    return values.astype(bytes)
+
+
+def _json_field(values):
+    if isinstance(values, LabelColumn):
+        return _format_labels(values, json.dumps)
+    values = np.asarray(values)
+    if values.dtype.kind in "USO":
+        return _format_labels(values, json.dumps)
+    if values.dtype.kind == "b":
+        return np.where(values, b"true", b"false")
+    if values.dtype.kind in "fiu":
+        matrix = _decimal_field(values) if values.dtype.kind == "f" else _integer_field(values)
+        if matrix is not None:
+            return matrix
+    text = values.astype(bytes)
+    if values.dtype.kind == "f" and not np.isfinite(values).all():
+        # Match json.dumps for the non-finite floats it lets through
+        text = np.where(np.isnan(values), b"NaN", text)
+        text = np.where(values == np.inf, b"Infinity", text)
+        text = np.where(values == -np.inf, b"-Infinity", text)
+    return text
+
+
+def _join_rows(pieces, rows):
+    """Concatenate ``pieces`` row by row.
+
+    A piece is a constant ``bytes``, a bytes array or a ``(rows, width)``
+    uint8 matrix, all NUL-padded.
+    """
+    # Every column is NUL-padded to its width: trim the padding, copy the
+    # columns side by side into one (rows, line width) byte matrix, then drop
+    # the remaining NULs at once
+    matrices = []
+    for piece in pieces:
+        if isinstance(piece, bytes):
+            matrices.append(np.frombuffer(piece, dtype=np.uint8)[np.newaxis, :])
+        elif piece.dtype == np.uint8:
+            matrices.append(piece)
+        elif rows:
+            piece = piece.astype(f"S{max(1, np.strings.str_len(piece).max())}")
+            matrices.append(piece.view(np.uint8).reshape(rows, piece.dtype.itemsize))
+    widths = [matrix.shape[1] for matrix in matrices]
+    buffer = np.zeros((rows, sum(widths)), dtype=np.uint8)
+    offset = 0
+    for matrix, width in zip(matrices, widths):
+        buffer[:, offset:offset + width] = matrix
+        offset += width
+    return buffer[buffer != 0].tobytes()
+
+
+def _rows(columns):
+    if not columns:
+        return 0
+    first = next(iter(columns.values()))
+    return len(first.codes if isinstance(first, LabelColumn) else first)
+
+
+def batch_to_csv(columns, header=True):
+    """Return ``{name: array}`` columns as UTF-8 CSV bytes."""
+    pieces = []
+    for values in columns.values():
+        pieces += [b",", _csv_field(values)]
+    body = _join_rows(pieces[1:] + [b"\n"], _rows(columns))
+    if header:
+        return (",".join(columns) + "\n").encode("utf-8") + body
+    return body
+
+
+def batch_to_jsonl(columns):
+    """Return ``{name: array}`` columns as UTF-8 JSON lines, one object per row."""
+    pieces = []
+    for name, values in columns.items():
+        pieces += [(", " + json.dumps(name) + ": ").encode("utf-8"), _json_field(values)]
+    if pieces:
+        pieces[0] = b"{" + pieces[0][2:]
+    return _join_rows(pieces + [b"}\n"], _rows(columns))
+
+
+# -- Streaming cohort reports -------------------------------------------------
+
+def _export_columns(item, columns):
+    if isinstance(item, dict):
+        return item
+    return batch_export_columns(item, columns)
+
+
+def iter_csv(batches, columns=REPORT_COLUMNS):
+    """Yield a CSV file: the header, then one chunk per batch.
+
+    Items may be :class:`HealthMetricsBatch` objects, ``{name: array}``
+    dicts, or bytes already formatted elsewhere (e.g. in a worker process),
+    which are passed through.
+    """
+    yield (",".join(columns) + "\n").encode("utf-8")
+    for item in batches:
+        yield item if isinstance(item, bytes) else batch_to_csv(_export_columns(item, columns), header=False)
+
+
+def iter_jsonl(batches, columns=REPORT_COLUMNS):
+    """Yield JSON lines, one chunk per batch; items are as for :func:`iter_csv`."""
+    for item in batches:
+        yield item if isinstance(item, bytes) else batch_to_jsonl(_export_columns(item, columns))
+
+
+def parquet_available():
+    import importlib.util
+
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+class _ByteSink(io.RawIOBase):
+    """A write-only file that hands back what was written since the last drain."""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _arrow_array(pa, values):
+    if isinstance(values, LabelColumn):
+        # Labels stay dictionary encoded in the file as well
+        return pa.DictionaryArray.from_arrays(np.asarray(values.codes), pa.array(np.asarray(values.labels).tolist()))
+    return pa.array(values)
+
+
+def iter_parquet(batches, columns=REPORT_COLUMNS):
+    """Yield a Parquet file with one row group per batch."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Writing Parquet files requires pyarrow (pip install pyarrow)")
+
+    sink = _ByteSink()
+    writer = None
+    try:
+        for item in batches:
+            exported = _export_columns(item, columns)
+            table = pa.table({name: _arrow_array(pa, values) for name, values in exported.items()})
+            if writer is None:
+                writer = pq.ParquetWriter(sink, table.schema)
+            writer.write_table(table.cast(writer.schema))
+            yield sink.drain()
+    finally:
+        if writer is not None:
+            writer.close()
+    yield sink.drain()
+
+
+def _decode(values):
+    if isinstance(values, LabelColumn):
+        return np.asarray(values.labels)[values.codes].tolist()
+    return np.asarray(values).tolist()
+
+
+def _slice(values, start, stop):
+    if isinstance(values, LabelColumn):
+        return LabelColumn(values.codes[start:stop], values.labels)
+    return values[start:stop]
+
+
+def iter_pages(batches, columns=REPORT_COLUMNS, page_size=40):
+    """Regroup batches into pages of ``page_size`` rows, as lists of Python values."""
+    page = {name: [] for name in columns}
+    filled = 0
+    for item in batches:
+        exported = _export_columns(item, columns)
+        rows = _rows(exported)
+        start = 0
+        while start < rows:
+            stop = min(rows, start + page_size - filled)
+            for name in columns:
+                page[name] += _decode(_slice(exported[name], start, stop))
+            filled += stop - start
+            start = stop
+            if filled == page_size:
+                yield page
+                page = {name: [] for name in columns}
+                filled = 0
+    if filled:
+        yield page
+
+
+def _page_table(page, columns):
+    """Headings and text rows of a page; the ideal weight bounds share a cell."""
+    names = [name for name in columns if name != "description"]
+    headings = [REPORT_LABELS.get(name, name) for name in names]
+    values = [page[name] for name in names]
+    if "lower_weight" in names and "upper_weight" in names:
+        i = names.index("lower_weight")
+        j = names.index("upper_weight")
+        ideal = [f"{low} - {high}" for low, high in zip(values[i], values[j])]
+        for k in sorted((i, j), reverse=True):
+            del names[k], headings[k], values[k]
+        names.insert(i, "ideal")
+        headings.insert(i, "Ideal Weight Range (kg)")
+        values.insert(i, ideal)
+    return headings, [[str(value) for value in row] for row in zip(*values)]
+
+
+def _page_recommendations(page):
+    """(category, recommendation) pairs on a page, in order of appearance."""
+    if "category" not in page or "description" not in page:
+        return []
+    return list(dict.fromkeys(zip(page["category"], page["description"])))
+
+
+HTML_STYLE = """
+body { font-family: Helvetica, Arial, sans-serif; font-size: 12px; color: #222; }
+table { border-collapse: collapse; width: 100%; }
+th, td { border: 1px solid #ccc; padding: 3px 6px; text-align: right; }
+th { background: #f0f0f0; }
+dt { font-weight: bold; margin-top: 6px; }
+.page { page-break-after: always; margin-bottom: 2em; }
+"""
+
+
+def iter_html(batches, columns=REPORT_COLUMNS, page_size=40, title="BMI Cohort Report", date=None):
+    """Yield a printable HTML report, one ``<section>`` per page."""
+    date = date or time.strftime("%Y-%m-%d")
+    yield (
+        f"<!DOCTYPE html>\n<html><head><meta charset='utf-8'><title>{html.escape(title)}</title>"
+        f"<style>{HTML_STYLE}</style></head><body>\n"
+    ).encode("utf-8")
+    for number, page in enumerate(iter_pages(batches, columns, page_size), start=1):
+        headings, rows = _page_table(page, columns)
+        parts = [
+            f"<section class='page'><h2>{html.escape(title)}</h2><p>Date: {date} &middot; Page {number}</p>",
+            "<table><thead><tr>" + "".join(f"<th>{html.escape(h)}</th>" for h in headings) + "</tr></thead><tbody>",
+        ]
+        parts += ["<tr>" + "".join(f"<td>{html.escape(cell)}</td>" for cell in row) + "</tr>" for row in rows]
+        parts.append("</tbody></table>")
+        recommendations = _page_recommendations(page)
+        if recommendations:
+            parts.append("<h3>Recommendations</h3><dl>")
+            parts += [f"<dt>{html.escape(c)}</dt><dd>{html.escape(d)}</dd>" for c, d in recommendations]
+            parts.append("</dl>")
+        parts.append("</section>\n")
+        yield "\n".join(parts).encode("utf-8")
+    yield b"</body></html>\n"
+
+
+def iter_pdf(batches, columns=REPORT_COLUMNS, page_size=40, title="BMI Cohort Report", date=None):
+    """Yield a paginated PDF report (A4 landscape, fixed-width table)."""
+    from .pdf import PAGE_SIZE, PdfStream, text_line
+
+    date = date or time.strftime("%Y-%m-%d")
+    margin, leading, size = 36, 10, 7
+    pdf = PdfStream()
+    yield pdf.start()
+    for number, page in enumerate(iter_pages(batches, columns, page_size), start=1):
+        headings, rows = _page_table(page, columns)
+        widths = [max(len(h), *(len(row[i]) for row in rows)) for i, h in enumerate(headings)]
+        line = lambda cells: "  ".join(cell.rjust(width) for cell, width in zip(cells, widths))
+        y = PAGE_SIZE[1] - margin
+        content = [text_line(margin, y, f"{title}    Date: {date}    Page {number}", size=11, bold=True)]
+        y -= 2 * leading
+        content.append(text_line(margin, y, line(headings), size=size, bold=True))
+        for row in rows:
+            y -= leading
+            content.append(text_line(margin, y, line(row), size=size))
+        recommendations = _page_recommendations(page)
+        if recommendations:
+            y -= 2 * leading
+            content.append(text_line(margin, y, "Recommendations", size=size + 1, bold=True))
+            for category, description in recommendations:
+                y -= leading
+                content.append(text_line(margin, y, f"{category}: {description}", size=size))
+        yield pdf.page(b"".join(content))
+    yield pdf.finish()
+
+
+# format name -> (media type, file extension, generator)
+FORMATS = {
+    "csv": ("text/csv", ".csv", iter_csv),
+    "jsonl": ("application/x-ndjson", ".jsonl", iter_jsonl),
+    "parquet": ("application/vnd.apache.parquet", ".parquet", iter_parquet),
+    "html": ("text/html", ".html", iter_html),
+    "pdf": ("application/pdf", ".pdf", iter_pdf),
+}
+
+
+def stream_export(fmt, batches, columns=REPORT_COLUMNS, **options):
+    """Return the byte-chunk generator writing ``batches`` in format ``fmt``."""
+    return FORMATS[fmt][2](batches, columns, **options)
+
+
+def format_for_path(path, default="csv"):
+    """Guess the export format from a file name's extension."""
+    lower = path.lower()
+    for fmt, (_, extension, _) in FORMATS.items():
+        if lower.endswith(extension):
+            return fmt
+    return default
+
+
+def write_export(fh, chunks):
+    """Write byte ``chunks`` to the binary file ``fh``; return the byte count."""
+    written = 0
+    for chunk in chunks:
+        fh.write(chunk)
+        written += len(chunk)
+    return written
@@ -0,0 +1,256 @@
+"""Plotly figures for the results page, memoized across reruns and sessions.
+
+Building and validating a ``go.Figure`` dominates the cost of a results
+render, so figures are cached in a bounded LRU keyed on the inputs that change
+what they look like. The gauge's static scaffolding (steps, axis, layout) is
+built and validated once and only its value and threshold are patched per BMI.
+
+In a multi-worker deployment a figure missing from the process's LRU is
+looked up in the :mod:`bmi_calculator.shared_cache` as Plotly JSON before it
+is built, and every figure built is stored there for the other workers.
+Figures revived from JSON skip validation (they were validated when first
+built), which makes them over ten times cheaper than building them again.
+"""
+
+import json
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from .calculations import BMI_CATEGORIES, BMI_CUTOFFS, GAUGE_RANGE, get_bmi_category
+from .shared_cache import get_shared_cache
+from .simulation import simulate
+
+
+class FigureCache:
+    """A thread-safe LRU of figures with a fixed maximum number of entries.
+
+    ``namespace`` names the cache's entries in the shared cache, if any.
+    """
+
+    def __init__(self, maxsize=256, namespace=None):
+        self.maxsize = maxsize
+        self.namespace = namespace
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _build(self, key, build):
+        shared = get_shared_cache() if self.namespace else None
+        if shared is None:
+            return build()
+        shared_key = repr(key)
+        spec = shared.get(self.namespace, shared_key)
+        if spec is not None:
+            return go.Figure(json.loads(spec), _validate=False)
+        fig = build()
+        shared.set(self.namespace, shared_key, pio.to_json(fig, validate=False).encode("utf-8"))
+        return fig
+
+    def get_or_build(self, key, build):
+        with self._lock:
+            fig = self._entries.get(key)
+            if fig is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return fig
+            self.misses += 1
+        fig = self._build(key, build)
+        with self._lock:
+            self._entries[key] = fig
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return fig
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+gauge_cache = FigureCache(maxsize=512, namespace="gauge")
+projection_cache = FigureCache(maxsize=256, namespace="projection")
+
+_gauge_template = None
+_template_lock = threading.Lock()
+
+
+def _build_gauge_template():
+    # Band edges run from the bottom of the gauge through every cutoff to the top
+    edges = (GAUGE_RANGE[0],) + BMI_CUTOFFS + (GAUGE_RANGE[1],)
+    steps = [
+        {'range': [low, high], 'color': color}
+        for low, high, (_, color, _) in zip(edges[:-1], edges[1:], BMI_CATEGORIES)
+    ]
+    fig = go.Figure(go.Indicator(
+        mode = "gauge+number",
+        value = GAUGE_RANGE[0],
+        domain = {'x': [0, 1], 'y': [0, 1]},
+        title = {'text': "BMI Scale"},
+        gauge = {
+            'axis': {'range': list(GAUGE_RANGE), 'tickwidth': 1, 'tickcolor': "darkblue"},
+            'bar': {'color': "darkblue"},
+            'bgcolor': "white",
+            'borderwidth': 2,
+            'bordercolor': "gray",
+            'steps': steps,
+            'threshold': {
+                'line': {'color': "white", 'width': 6},
+                'thickness': 0.75,
+                'value': GAUGE_RANGE[0]}
+        }
+    ))
+
+    fig.update_layout(
+        height=300,
+        margin=dict(l=20, r=20, t=50, b=20),
+        paper_bgcolor="rgba(0,0,0,0)",
+        font=dict(color="white")
+    )
+    # Kept as validated JSON: every gauge gets its own copy (plotly briefly
+    # mutates a figure's trace dicts while copying it, so a shared template
+    # is not safe across threads) and skips validating it again
+    return pio.to_json(fig, validate=False)
+
+
+def _gauge_scaffold():
+    global _gauge_template
+    if _gauge_template is None:
+        with _template_lock:
+            if _gauge_template is None:
+                _gauge_template = _build_gauge_template()
+    return _gauge_template
+
+
+def _build_gauge(bmi_value):
+    fig = go.Figure(json.loads(_gauge_scaffold()), _validate=False)
+    fig.update_traces(value=bmi_value, gauge_threshold_value=bmi_value)
+    return fig
+
+
+# Create BMI scale visualization with Plotly
+def create_bmi_gauge(bmi_value):
+    bmi_value = round(bmi_value, 2)
+    return gauge_cache.get_or_build(bmi_value, lambda: _build_gauge(bmi_value))
+
+
+def _build_projection(weight, height_in_meters, age, gender, activity, goal, calories_change, color, weeks,
+                      bmr_formula=None, body_fat=None):
+    # Simulated daily, but only the weekly points shown on the chart are evaluated
+    x = np.arange(weeks + 1)
+    trajectory = simulate(weight, height_in_meters, age, gender, activity, calories_change, bmr_formula, body_fat)
+    y = trajectory.weights_at(x * 7)[0]
+    if goal == "lose":
+        title = f"{weeks}-Week Weight Loss Projection"
+    else:
+        title = f"{weeks}-Week Weight Gain Projection"
+
+    fig = go.Figure(go.Scatter(x=x, y=y, mode="lines", line=dict(color=color, width=3)))
+    fig.update_layout(
+        title=title,
+        xaxis_title="Weeks",
+        yaxis_title="Weight (kg)",
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        xaxis=dict(showgrid=True, gridcolor='lightgray'),
+        yaxis=dict(showgrid=True, gridcolor='lightgray'),
+        hovermode="x"
+    )
+    return fig
+
+
+def create_projection_chart(weight, height_in_meters, age, gender, activity, goal, calories_change, color, weeks=12,
+                            bmr_formula=None, body_fat=None):
+    # Rounded only for the cache key; the figure is built from the exact inputs
+    key = (round(weight, 1), round(height_in_meters, 3), age, gender, activity, goal, calories_change, color, weeks,
+           bmr_formula, body_fat)
+    return projection_cache.get_or_build(key, lambda: _build_projection(
+        weight, height_in_meters, age, gender, activity, goal, calories_change, color, weeks, bmr_formula, body_fat,
+    ))
+
+
+def create_history_chart(history):
+    """BMI over time from a :meth:`HistoryStore.query` window (not cached)."""
+    import datetime
+
+    when = [datetime.datetime.fromtimestamp(t) for t in history["recorded_at"]]
+    fig = go.Figure(go.Scatter(
+        x=when,
+        y=history["bmi"],
+        customdata=list(zip(history["weight"], history["category"])),
+        mode="lines+markers",
+        line=dict(color="#2196f3", width=3),
+        hovertemplate="BMI %{y}<br>%{customdata[0]:.1f} kg<br>%{customdata[1]}<extra></extra>",
+    ))
+    # Category boundaries as faint reference lines
+    for cutoff, (_, color, _) in zip(BMI_CUTOFFS, BMI_CATEGORIES[1:]):
+        fig.add_hline(y=cutoff, line=dict(color=color, width=1, dash="dot"))
+    fig.update_layout(
+        title="BMI History",
+        xaxis_title="Date",
+        yaxis_title="BMI",
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        xaxis=dict(showgrid=True, gridcolor='lightgray'),
+        yaxis=dict(showgrid=True, gridcolor='lightgray'),
+        hovermode="x"
+    )
+    return fig
+
+
+def create_population_histogram(edges, counts, width):
+    """BMI distribution from :meth:`Population.bmi_histogram` bins (not cached).
+
+    Each bar takes the colour of its category, so the bands read like the gauge.
+    """
+    colors = [get_bmi_category(low + width / 2)[1] for low in edges.tolist()]
+    fig = go.Figure(go.Bar(
+        x=edges + width / 2,
+        y=counts,
+        width=width,
+        marker=dict(color=colors),
+        hovertemplate="BMI %{x}<br>%{y:,} results<extra></extra>",
+    ))
+    for cutoff, (_, color, _) in zip(BMI_CUTOFFS, BMI_CATEGORIES[1:]):
+        fig.add_vline(x=cutoff, line=dict(color=color, width=1, dash="dot"))
+    fig.update_layout(
+        title="BMI Distribution",
+        xaxis_title="BMI",
+        yaxis_title="Results",
+        bargap=0,
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        xaxis=dict(range=list(GAUGE_RANGE), showgrid=True, gridcolor='lightgray'),
+        yaxis=dict(showgrid=True, gridcolor='lightgray'),
+    )
+    return fig
+
+
+def create_category_shares_chart(keys, shares, title):
+    """Stacked category shares per group from :meth:`Population.category_shares` (not cached)."""
+    fig = go.Figure([
+        go.Bar(
+            name=name,
+            x=list(keys),
+            y=shares[:, code],
+            marker=dict(color=color),
+            hovertemplate=f"{name}: %{{y:.1%}}<extra></extra>",
+        )
+        for code, (name, color, _) in enumerate(BMI_CATEGORIES)
+    ])
+    fig.update_layout(
+        title=title,
+        barmode="stack",
+        yaxis=dict(tickformat=".0%", range=[0, 1], showgrid=True, gridcolor='lightgray'),
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        legend=dict(traceorder="normal"),
+    )
+    return fig
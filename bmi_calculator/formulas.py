@@ -0,0 +1,306 @@
+"""Registry of interchangeable BMR equations and BMI category systems.
+
+Every entry works on NumPy arrays, so the batch engine can switch formulas
+without losing its vectorized path:
+
+- BMR equations (:data:`BMR_FORMULAS`): revised Harris-Benedict (the
+  default), Mifflin-St Jeor and Katch-McArdle. All of them are linear in
+  weight, height and age, which keeps the closed-form weight simulation
+  valid. "Other" uses the mean of the male and female equations.
+- Category systems (:data:`CATEGORY_SYSTEMS`): the WHO adult cutoffs (the
+  default), the lower WHO cutoffs for Asian populations (18.5/23/25/30) and
+  CDC BMI-for-age percentiles for children aged 2-19 with WHO cutoffs for
+  adults. Every system assigns the same category codes as
+  :data:`bmi_calculator.calculations.BMI_CATEGORIES`, so labels, colors and
+  goals are shared.
+
+The CDC system needs the CDC's ``bmiagerev.csv`` LMS table (``BMI_CDC_TABLE``,
+default ``bmiagerev.csv`` in the cache directory); it is not bundled. The CSV
+is parsed once into a ``.npy`` file next to the cache, which every process
+then memory-maps instead of parsing again.
+
+New entries are added with :func:`register_bmr_formula` and
+:func:`register_category_system`.
+"""
+
+import csv
+import hashlib
+import os
+import tempfile
+import threading
+
+import numpy as np
+
+from .calculations import BMI_CUTOFFS, DEFAULT_BMR_FORMULA, DEFAULT_CATEGORY_SYSTEM, HARRIS_BENEDICT
+from .lottie_cache import CACHE_DIR
+
+CDC_TABLE_PATH = os.environ.get("BMI_CDC_TABLE", os.path.join(CACHE_DIR, "bmiagerev.csv"))
+
+# Sex codes used to index coefficient tables; anything but Male/Female is Other
+FEMALE, MALE, OTHER = 0, 1, 2
+
+BMR_FORMULAS = {}
+CATEGORY_SYSTEMS = {}
+
+
+def encode_sex(gender):
+    """Return sex codes (``FEMALE``, ``MALE``, ``OTHER``) for labels, a male mask or codes."""
+    gender = np.asarray(gender)
+    if gender.dtype.kind in "iu":
+        return gender
+    if gender.dtype == np.bool_:
+        return gender.astype(np.int8)
+    codes = np.full(gender.shape, OTHER, dtype=np.int8)
+    codes[gender == "Male"] = MALE
+    codes[gender == "Female"] = FEMALE
+    return codes
+
+
+class BmrFormula:
+    """A BMR equation ``base + w * weight + h * height_cm - a * age`` per sex.
+
+    ``male`` and ``female`` are ``(base, w, h, a)`` coefficient tuples.
+    """
+
+    needs_body_fat = False
+
+    def __init__(self, name, label, male, female):
+        self.name = name
+        self.label = label
+        other = tuple((m + f) / 2 for m, f in zip(male, female))
+        # One row per sex code
+        self.table = np.array([female, male, other], dtype=np.float64)
+
+    def coefficients(self, sex, body_fat=None):
+        """Return the ``(base, w, h, a)`` coefficient arrays for sex codes."""
+        rows = self.table[sex]
+        return rows[..., 0], rows[..., 1], rows[..., 2], rows[..., 3]
+
+    def unrounded(self, weight, height_in_meters, age, sex, body_fat=None):
+        base, weight_coef, height_coef, age_coef = self.coefficients(sex, body_fat)
+        return base + (weight_coef * weight) + (height_coef * height_in_meters * 100) - (age_coef * age)
+
+
+class KatchMcArdle(BmrFormula):
+    """``370 + 21.6 * lean body mass``, which needs body fat percentages."""
+
+    needs_body_fat = True
+
+    def __init__(self):
+        super().__init__("katch_mcardle", "Katch-McArdle", (370, 21.6, 0, 0), (370, 21.6, 0, 0))
+
+    def coefficients(self, sex, body_fat=None):
+        if body_fat is None:
+            raise ValueError("the Katch-McArdle equation needs body fat percentages")
+        base, weight_coef, height_coef, age_coef = super().coefficients(sex)
+        lean = 1 - np.asarray(body_fat, dtype=np.float64) / 100
+        return base, weight_coef * lean, height_coef, age_coef
+
+
+def register_bmr_formula(formula):
+    BMR_FORMULAS[formula.name] = formula
+    return formula
+
+
+def get_bmr_formula(name=None):
+    """Return the registered BMR formula ``name`` (default: Harris-Benedict)."""
+    if isinstance(name, BmrFormula):
+        return name
+    try:
+        return BMR_FORMULAS[name or DEFAULT_BMR_FORMULA]
+    except KeyError:
+        raise ValueError(f"BMR formula must be one of: {', '.join(BMR_FORMULAS)}")
+
+
+HARRIS_BENEDICT_FORMULA = register_bmr_formula(
+    BmrFormula("harris_benedict", "Harris-Benedict (revised)", HARRIS_BENEDICT["Male"], HARRIS_BENEDICT["Female"])
+)
+MIFFLIN_ST_JEOR = register_bmr_formula(
+    BmrFormula("mifflin_st_jeor", "Mifflin-St Jeor", (5, 10, 6.25, 5), (-161, 10, 6.25, 5))
+)
+KATCH_MCARDLE = register_bmr_formula(KatchMcArdle())
+
+
+class CutoffSystem:
+    """BMI categories from fixed cutoffs.
+
+    ``cutoffs`` are the exclusive upper bounds of the first categories, in
+    :data:`BMI_CATEGORIES` order; ``healthy`` is the (low, high) BMI range
+    used for the ideal weight.
+    """
+
+    def __init__(self, name, label, cutoffs, healthy):
+        self.name = name
+        self.label = label
+        self.cutoffs = np.array(cutoffs, dtype=np.float64)
+        self.healthy = healthy
+
+    def available(self):
+        return True
+
+    def categorize(self, bmi, age=None, sex=None):
+        """Return category codes for BMI values."""
+        return np.searchsorted(self.cutoffs, np.asarray(bmi, dtype=np.float64), side="right").astype(np.int8)
+
+    def healthy_bmi(self, age=None, sex=None):
+        return self.healthy
+
+
+# z-scores of the 5th, 85th and 95th percentiles
+_PERCENTILE_Z = np.array([-1.6448536269514722, 1.0364333894937898, 1.6448536269514722])
+
+
+class LmsTable:
+    """CDC BMI-for-age LMS parameters, one block of rows per sex.
+
+    ``data`` is an ``(n, 5)`` array of ``(sex, agemos, L, M, S)`` rows sorted
+    by sex and age, with the CDC's sex codes (1 male, 2 female).
+    """
+
+    def __init__(self, data):
+        self.data = data
+        split = int(np.searchsorted(data[:, 0], 1.5))
+        self.by_sex = {MALE: data[:split], FEMALE: data[split:]}
+        if not all(len(rows) for rows in self.by_sex.values()):
+            raise ValueError("the CDC table needs rows for both sexes")
+
+    def _percentiles(self, rows, months):
+        # Linear interpolation of L, M and S between the tabulated ages
+        agemos = rows[:, 1]
+        lms = [np.interp(months, agemos, rows[:, column])[:, np.newaxis] for column in (2, 3, 4)]
+        l, m, s = lms
+        with np.errstate(divide="ignore", invalid="ignore"):
+            power = m * (1 + l * s * _PERCENTILE_Z) ** (1 / l)
+        return np.where(np.abs(l) < 1e-12, m * np.exp(s * _PERCENTILE_Z), power)
+
+    def percentiles(self, months, sex):
+        """Return the BMI at the 5th, 85th and 95th percentiles, shape ``(n, 3)``.
+
+        Ages outside the table are clamped to its first or last month.
+        """
+        months = np.asarray(months, dtype=np.float64)
+        sex = encode_sex(sex)
+        result = np.empty(months.shape + (3,))
+        for code in (MALE, FEMALE):
+            rows = sex == code
+            if rows.any():
+                result[rows] = self._percentiles(self.by_sex[code], months[rows])
+        other = sex == OTHER
+        if other.any():
+            result[other] = (
+                self._percentiles(self.by_sex[MALE], months[other]) + self._percentiles(self.by_sex[FEMALE], months[other])
+            ) / 2
+        return result
+
+
+def parse_cdc_table(path):
+    """Read a CDC ``bmiagerev.csv`` file into ``(sex, agemos, L, M, S)`` rows."""
+    rows = []
+    with open(path, newline="", encoding="utf-8-sig") as fh:
+        for record in csv.DictReader(fh):
+            # The published file repeats its header row between the two sexes
+            if record.get("Sex", "").strip() not in ("1", "2"):
+                continue
+            rows.append([float(record[name]) for name in ("Sex", "Agemos", "L", "M", "S")])
+    if not rows:
+        raise ValueError(f"{path} has no Sex, Agemos, L, M, S rows")
+    data = np.array(rows, dtype=np.float64)
+    return data[np.lexsort((data[:, 1], data[:, 0]))]
+
+
+def _cached_npy(path):
+    with open(path, "rb") as fh:
+        digest = hashlib.sha1(fh.read()).hexdigest()[:16]
+    npy_path = os.path.join(CACHE_DIR, "tables", f"cdc_bmi_for_age-{digest}.npy")
+    if not os.path.exists(npy_path):
+        data = parse_cdc_table(path)
+        os.makedirs(os.path.dirname(npy_path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(npy_path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as fh:
+            np.save(fh, data)
+        # Atomic so concurrent processes never map a half-written file
+        os.replace(tmp_path, npy_path)
+    return npy_path
+
+
+_lms_tables = {}
+_lock = threading.Lock()
+
+
+def load_cdc_table(path=None):
+    """Return the :class:`LmsTable` for ``path``, memory-mapped and loaded once."""
+    path = path or CDC_TABLE_PATH
+    table = _lms_tables.get(path)
+    if table is None:
+        with _lock:
+            table = _lms_tables.get(path)
+            if table is None:
+                table = LmsTable(np.load(_cached_npy(path), mmap_mode="r"))
+                _lms_tables[path] = table
+    return table
+
+
+class CdcBmiForAge:
+    """CDC BMI-for-age percentiles below 20 years, ``adult`` cutoffs from 20.
+
+    Children are underweight below the 5th percentile, overweight from the
+    85th and obese from the 95th; 120% and 140% of the 95th percentile mark
+    the CDC's class II and III obesity. Whole-year ages are taken at the
+    middle of the year (``age * 12 + 6`` months).
+    """
+
+    CHILD_MAX_AGE = 20
+
+    def __init__(self, name, label, adult, path=None):
+        self.name = name
+        self.label = label
+        self.adult = adult
+        self.path = path
+
+    def available(self):
+        return os.path.exists(self.path or CDC_TABLE_PATH)
+
+    def _percentiles(self, age, sex):
+        return load_cdc_table(self.path).percentiles(np.asarray(age, dtype=np.float64) * 12 + 6, sex)
+
+    def categorize(self, bmi, age=None, sex=None):
+        bmi = np.asarray(bmi, dtype=np.float64)
+        codes = self.adult.categorize(bmi)
+        child = np.asarray(age) < self.CHILD_MAX_AGE
+        if child.any():
+            percentiles = self._percentiles(np.asarray(age)[child], encode_sex(sex)[child])
+            p95 = percentiles[:, 2:3]
+            cutoffs = np.hstack([percentiles, 1.2 * p95, 1.4 * p95])
+            codes[child] = (bmi[child][:, np.newaxis] >= cutoffs).sum(axis=1)
+        return codes
+
+    def healthy_bmi(self, age=None, sex=None):
+        age = np.asarray(age)
+        low, high = self.adult.healthy
+        low = np.full(age.shape, low, dtype=np.float64)
+        high = np.full(age.shape, high, dtype=np.float64)
+        child = age < self.CHILD_MAX_AGE
+        if child.any():
+            percentiles = self._percentiles(age[child], encode_sex(sex)[child])
+            low[child], high[child] = percentiles[:, 0], percentiles[:, 1]
+        return low, high
+
+
+def register_category_system(system):
+    CATEGORY_SYSTEMS[system.name] = system
+    return system
+
+
+def get_category_system(name=None):
+    """Return the registered category system ``name`` (default: WHO adult)."""
+    if not isinstance(name, str) and name is not None:
+        return name
+    try:
+        return CATEGORY_SYSTEMS[name or DEFAULT_CATEGORY_SYSTEM]
+    except KeyError:
+        raise ValueError(f"category system must be one of: {', '.join(CATEGORY_SYSTEMS)}")
+
+
+WHO = register_category_system(CutoffSystem("who", "WHO adult", BMI_CUTOFFS, (18.5, 24.9)))
+ASIAN = register_category_system(CutoffSystem("asian", "WHO Asian populations", (18.5, 23, 25, 30), (18.5, 22.9)))
+CDC = register_category_system(CdcBmiForAge("cdc", "CDC BMI-for-age (under 20), WHO adult", WHO))
@@ -0,0 +1,225 @@
+"""Persistent per-user history of computed results in a local SQLite database.
+
+The database (``BMI_HISTORY_DB``, default ``history.sqlite3`` in the cache
+directory) runs in WAL mode so readers never block the writer. Connections
+come from a small pool shared by every thread. :meth:`HistoryStore.record`
+only queues a row; queued rows are written in one transaction when the batch
+fills up, when a background flush timer fires, or before a query, so a user
+always sees their own latest result. :meth:`HistoryStore.tally` queues a
+result that is only counted in the population statistics, for calculations
+made without a profile.
+
+Rows are indexed on ``(user_id, recorded_at)`` for per-user windows and on
+``recorded_at`` for time-range scans across users. Each transaction also
+updates the pre-aggregated counts in :mod:`bmi_calculator.population`, which
+the population dashboard reads instead of the results.
+"""
+
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from . import population
+from .lottie_cache import CACHE_DIR
+
+DB_PATH = os.environ.get("BMI_HISTORY_DB", os.path.join(CACHE_DIR, "history.sqlite3"))
+
+COLUMNS = (
+    "user_id",
+    "recorded_at",
+    "weight",
+    "height",
+    "age",
+    "gender",
+    "activity",
+    "bmi",
+    "category",
+    "bmr",
+    "daily_calories",
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    recorded_at REAL NOT NULL,
+    weight REAL NOT NULL,
+    height REAL NOT NULL,
+    age INTEGER NOT NULL,
+    gender TEXT NOT NULL,
+    activity TEXT NOT NULL,
+    bmi REAL NOT NULL,
+    category TEXT NOT NULL,
+    bmr INTEGER NOT NULL,
+    daily_calories INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_user_time ON results (user_id, recorded_at);
+CREATE INDEX IF NOT EXISTS results_time ON results (recorded_at);
+"""
+
+_INSERT = f"INSERT INTO results ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+
+
+class ConnectionPool:
+    """A fixed number of SQLite connections handed out one thread at a time.
+
+    ``pragmas`` are extra ``PRAGMA`` statements run on every connection.
+    """
+
+    def __init__(self, path, size=4, pragmas=()):
+        self.path = path
+        self.pragmas = pragmas
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._idle = queue.LifoQueue()
+        for _ in range(size):
+            self._idle.put(self._connect())
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        # Durable at checkpoints; a crash can lose only the last transactions
+        conn.execute("PRAGMA synchronous=NORMAL")
+        for pragma in self.pragmas:
+            conn.execute(f"PRAGMA {pragma}")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        conn = self._idle.get()
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class HistoryStore:
+    """Batched writes and windowed per-user reads of the results table."""
+
+    def __init__(self, path=DB_PATH, pool_size=4, batch_size=256, flush_interval=1.0):
+        self.pool = ConnectionPool(path, pool_size)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending = []
+        self._tallies = []
+        self._lock = threading.Lock()
+        self._timer = None
+        with self.pool.connection() as conn:
+            conn.executescript(SCHEMA)
+            population.ensure_built(conn, COLUMNS)
+
+    def record(self, user_id, metrics, recorded_at=None):
+        """Queue one :class:`HealthMetrics` result for ``user_id``."""
+        self._queue(self._pending, self._row(user_id, metrics, recorded_at))
+
+    def tally(self, metrics, recorded_at=None):
+        """Queue one result for the population counts only, without saving it.
+
+        For results computed without a profile, which have no history to join.
+        """
+        self._queue(self._tallies, self._row(None, metrics, recorded_at))
+
+    def _row(self, user_id, metrics, recorded_at):
+        return (
+            user_id,
+            time.time() if recorded_at is None else recorded_at,
+            metrics.weight,
+            metrics.height_in_meters,
+            metrics.age,
+            metrics.gender,
+            metrics.activity,
+            metrics.bmi,
+            metrics.category,
+            metrics.bmr,
+            metrics.daily_calories,
+        )
+
+    def _queue(self, pending, row):
+        with self._lock:
+            pending.append(row)
+            full = len(self._pending) + len(self._tallies) >= self.batch_size
+            if not full and self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if full:
+            self.flush()
+
+    def write_many(self, rows, tallies=()):
+        """Insert rows (tuples in :data:`COLUMNS` order) and count them, in a single transaction.
+
+        ``tallies`` are rows that are only counted, not inserted.
+        """
+        counted = list(rows) + list(tallies)
+        with self.pool.connection() as conn:
+            conn.execute("BEGIN")
+            try:
+                conn.executemany(_INSERT, rows)
+                if counted:
+                    population.add(conn, dict(zip(COLUMNS, zip(*counted))))
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def flush(self):
+        """Write every queued row and tally now; return the number of rows saved."""
+        with self._lock:
+            rows, self._pending = self._pending, []
+            tallies, self._tallies = self._tallies, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if rows or tallies:
+            self.write_many(rows, tallies)
+        return len(rows)
+
+    def query(self, user_id, start=None, end=None, limit=None):
+        """Return ``user_id``'s rows with ``start <= recorded_at <= end``, oldest first.
+
+        The result is a dict of column lists (without ``user_id``). Only rows in
+        the window are read, through the ``(user_id, recorded_at)`` index.
+        """
+        self.flush()
+        sql = f"SELECT {', '.join(COLUMNS[1:])} FROM results WHERE user_id = ?"
+        params = [user_id]
+        if start is not None:
+            sql += " AND recorded_at >= ?"
+            params.append(start)
+        if end is not None:
+            sql += " AND recorded_at <= ?"
+            params.append(end)
+        if limit is not None:
+            # The most recent ``limit`` rows of the window, still returned oldest first
+            sql = f"SELECT * FROM ({sql} ORDER BY recorded_at DESC LIMIT ?) ORDER BY recorded_at"
+            params.append(limit)
+        else:
+            sql += " ORDER BY recorded_at"
+        with self.pool.connection() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        return {name: [row[i] for row in rows] for i, name in enumerate(COLUMNS[1:])}
+
+    def count(self):
+        self.flush()
+        with self.pool.connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def population(self):
+        """Return the :class:`~bmi_calculator.population.Population` of every stored result."""
+        self.flush()
+        with self.pool.connection() as conn:
+            return population.load(conn)
+
+    def close(self):
+        self.flush()
+        self.pool.close()
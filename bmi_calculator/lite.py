@@ -0,0 +1,91 @@
+"""Lightweight rendering for slow links and low-end devices.
+
+Lite mode is switched on with ``?lite=1`` for one session, or with
+``BMI_LITE=1`` for every session (``?lite=0`` opts a session back out). It
+drops the Lottie animations and the CSS transitions and hover transforms,
+and draws the BMI gauge and weight projection as small static SVGs, built
+here without Plotly. The browser then never loads the Lottie component or
+Streamlit's Plotly chart bundle, and the server builds no Plotly figures.
+"""
+
+import os
+from html import escape
+
+import numpy as np
+
+from .calculations import BMI_CATEGORIES, BMI_CUTOFFS, GAUGE_RANGE
+from .simulation import simulate
+
+ENABLED = os.environ.get("BMI_LITE", "") not in ("", "0")
+
+_FONT = "font-family='sans-serif'"
+
+
+def lite_enabled(query_value=None):
+    """Whether a session renders in lite mode, given its ``lite`` query parameter."""
+    if query_value is None:
+        return ENABLED
+    return query_value not in ("", "0")
+
+
+def _gauge_point(value, radius, center=(150, 150)):
+    low, high = GAUGE_RANGE
+    fraction = (min(max(value, low), high) - low) / (high - low)
+    angle = np.pi * (1 - fraction)
+    return center[0] + radius * np.cos(angle), center[1] - radius * np.sin(angle)
+
+
+def gauge_svg(bmi_value, outer=120, inner=85):
+    """A half-circle BMI gauge with one band per category and a needle at ``bmi_value``."""
+    edges = (GAUGE_RANGE[0],) + BMI_CUTOFFS + (GAUGE_RANGE[1],)
+    bands = []
+    for low, high, (_, color, _) in zip(edges[:-1], edges[1:], BMI_CATEGORIES):
+        (x0, y0), (x1, y1) = _gauge_point(low, outer), _gauge_point(high, outer)
+        (x2, y2), (x3, y3) = _gauge_point(high, inner), _gauge_point(low, inner)
+        bands.append(
+            f"<path d='M{x0:.1f} {y0:.1f}A{outer} {outer} 0 0 1 {x1:.1f} {y1:.1f}"
+            f"L{x2:.1f} {y2:.1f}A{inner} {inner} 0 0 0 {x3:.1f} {y3:.1f}Z' fill='{color}'/>"
+        )
+    x, y = _gauge_point(bmi_value, outer + 5)
+    return (
+        "<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 300 175' width='100%' role='img' "
+        f"aria-label='BMI {bmi_value}'>{''.join(bands)}"
+        f"<line x1='150' y1='150' x2='{x:.1f}' y2='{y:.1f}' stroke='darkblue' stroke-width='4'/>"
+        "<circle cx='150' cy='150' r='6' fill='darkblue'/>"
+        f"<text x='150' y='130' text-anchor='middle' font-size='28' {_FONT}>{bmi_value}</text>"
+        f"<text x='30' y='170' text-anchor='middle' font-size='12' {_FONT}>{GAUGE_RANGE[0]}</text>"
+        f"<text x='270' y='170' text-anchor='middle' font-size='12' {_FONT}>{GAUGE_RANGE[1]}</text>"
+        "</svg>"
+    )
+
+
+def projection_svg(weight, height_in_meters, age, gender, activity, goal, calories_change, color, weeks=12,
+                   bmr_formula=None, body_fat=None, width=600, height=260):
+    """The weekly weight projection as an SVG line chart (the same points as the Plotly chart)."""
+    trajectory = simulate(weight, height_in_meters, age, gender, activity, calories_change, bmr_formula, body_fat)
+    weights = trajectory.weights_at(np.arange(weeks + 1) * 7)[0]
+    if goal == "lose":
+        title = f"{weeks}-Week Weight Loss Projection"
+    else:
+        title = f"{weeks}-Week Weight Gain Projection"
+
+    left, right, top, bottom = 50, 15, 35, 35
+    low, high = float(weights.min()), float(weights.max())
+    span = (high - low) or 1.0
+    xs = left + np.arange(weeks + 1) * (width - left - right) / weeks
+    ys = top + (high - weights) * (height - top - bottom) / span
+    points = " ".join(f"{x:.1f},{y:.1f}" for x, y in zip(xs, ys))
+    base = height - bottom
+    return (
+        f"<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 {width} {height}' width='100%' role='img' "
+        f"aria-label='{escape(title)}'>"
+        f"<text x='{width / 2}' y='20' text-anchor='middle' font-size='16' {_FONT}>{escape(title)}</text>"
+        f"<path d='M{left} {top}V{base}H{width - right}' fill='none' stroke='lightgray'/>"
+        f"<polyline points='{points}' fill='none' stroke='{color}' stroke-width='3'/>"
+        f"<text x='{left - 5}' y='{top + 4}' text-anchor='end' font-size='11' {_FONT}>{high:.1f} kg</text>"
+        f"<text x='{left - 5}' y='{base}' text-anchor='end' font-size='11' {_FONT}>{low:.1f} kg</text>"
+        f"<text x='{left}' y='{base + 16}' text-anchor='middle' font-size='11' {_FONT}>0</text>"
+        f"<text x='{width - right}' y='{base + 16}' text-anchor='middle' font-size='11' {_FONT}>{weeks}</text>"
+        f"<text x='{(left + width - right) / 2}' y='{height - 5}' text-anchor='middle' font-size='12' {_FONT}>Weeks</text>"
+        "</svg>"
+    )
@@ -0,0 +1,151 @@
+"""Cached loading of the Lottie animations shown in the app.
+
+Lookups go through an in-process memo, then a JSON store on disk, then the
+simple stand-in animations shipped in ``bmi_calculator/lottie_data``. The
+network is only touched from a small background thread pool when an entry is
+missing or older than its TTL, so a Streamlit rerun never waits on the CDN.
+A failed fetch is not retried for ``FAILURE_COOLDOWN`` seconds, so an
+offline server does not start a new fetch on every rerun.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .profiling import record_network
+
+# How long a fetched animation is considered fresh (seconds)
+DEFAULT_TTL = 7 * 24 * 60 * 60
+
+# How long to wait before fetching a url again after a failure (seconds)
+FAILURE_COOLDOWN = 5 * 60
+
+# (connect, read) timeouts for the CDN
+FETCH_TIMEOUT = (3.05, 5)
+
+CACHE_DIR = os.environ.get(
+    "BMI_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "bmi_calculator"),
+)
+# Stand-ins for the CDN animations, stored like disk entries but always stale
+BUNDLED_DIR = os.path.join(os.path.dirname(__file__), "lottie_data")
+
+_memo = {}  # url -> (fetched_at, data)
+_inflight = {}  # url -> Future
+_failed = {}  # url -> time of the last failed fetch
+_lock = threading.Lock()
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="lottie-fetch")
+
+
+def _cache_key(url):
+    return hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+
+def _disk_path(url):
+    return os.path.join(CACHE_DIR, "lottie", _cache_key(url) + ".json")
+
+
+def _bundled_path(url):
+    return os.path.join(BUNDLED_DIR, _cache_key(url) + ".json")
+
+
+def _read_entry(path):
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            entry = json.load(fh)
+        return entry["fetched_at"], entry["data"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _write_entry(url, fetched_at, data):
+    path = _disk_path(url)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump({"url": url, "fetched_at": fetched_at, "data": data}, fh)
+        # Atomic so concurrent sessions never read a half-written file
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+def fetch_animation(url, timeout=FETCH_TIMEOUT):
+    """Fetch an animation from the network, returning None on any failure."""
+    # Imported here so the app does not pay for requests until it has to fetch
+    import requests
+
+    start = time.perf_counter()
+    try:
+        r = requests.get(url, timeout=timeout)
+    except requests.RequestException:
+        record_network(url, 0, time.perf_counter() - start, ok=False)
+        return None
+    record_network(url, len(r.content), time.perf_counter() - start, ok=r.status_code == 200)
+    if r.status_code != 200:
+        return None
+    try:
+        return r.json()
+    except ValueError:
+        return None
+
+
+def _refresh(url):
+    try:
+        data = fetch_animation(url)
+        if data is None:
+            with _lock:
+                _failed[url] = time.time()
+            return None
+        fetched_at = time.time()
+        with _lock:
+            _memo[url] = (fetched_at, data)
+            _failed.pop(url, None)
+        _write_entry(url, fetched_at, data)
+        return data
+    finally:
+        with _lock:
+            _inflight.pop(url, None)
+
+
+def _schedule_refresh(url):
+    with _lock:
+        future = _inflight.get(url)
+        if future is None:
+            if time.time() - _failed.get(url, float("-inf")) < FAILURE_COOLDOWN:
+                return None
+            future = _executor.submit(_refresh, url)
+            _inflight[url] = future
+    return future
+
+
+def _lookup(url):
+    with _lock:
+        entry = _memo.get(url)
+    if entry is not None:
+        return entry
+    entry = _read_entry(_disk_path(url)) or _read_entry(_bundled_path(url))
+    if entry is not None:
+        with _lock:
+            _memo.setdefault(url, entry)
+    return entry
+
+
+def get_animation(url, ttl=DEFAULT_TTL):
+    """Return the best cached copy of an animation without blocking.
+
+    Stale or missing entries trigger a background refresh (unless the last
+    fetch failed within ``FAILURE_COOLDOWN``); a stale copy is still returned
+    so the page keeps its animation while the CDN is slow. Returns None only
+    when nothing has ever been cached or bundled for ``url``.
+    """
+    entry = _lookup(url)
+    if entry is None or time.time() - entry[0] > ttl:
+        _schedule_refresh(url)
+    return entry[1] if entry is not None else None
+
@@ -0,0 +1,77 @@
+"""The result record shared by the app, the report, the exports and the API.
+
+:class:`HealthMetrics` is a frozen, slotted dataclass holding one person's
+inputs (in kg and m) and every metric computed from them. Its columnar
+counterpart for many people is :class:`bmi_calculator.batch.HealthMetricsBatch`.
+"""
+
+from dataclasses import dataclass
+
+INPUT_FIELDS = ("weight", "height_in_meters", "age", "gender", "activity")
+RESULT_FIELDS = (
+    "bmi",
+    "category",
+    "color",
+    "description",
+    "bmr",
+    "daily_calories",
+    "lower_weight",
+    "upper_weight",
+    "goal",
+    "calories_change",
+)
+
+# Columns written by the CSV and JSON exports, single and batch alike
+EXPORT_COLUMNS = ("weight", "height", "age", "gender", "activity") + (
+    "bmi", "category", "bmr", "daily_calories", "lower_weight", "upper_weight",
+)
+
+# The fields of the text report, in report order, with their headings;
+# cohort reports use the same fields
+REPORT_COLUMNS = (
+    "height", "weight", "bmi", "category", "bmr", "daily_calories", "lower_weight", "upper_weight", "description",
+)
+REPORT_LABELS = {
+    "height": "Height (cm)",
+    "weight": "Weight (kg)",
+    "bmi": "BMI",
+    "category": "Category",
+    "bmr": "BMR (kcal/day)",
+    "daily_calories": "Daily Calorie Needs (kcal/day)",
+    "lower_weight": "Ideal Weight Min (kg)",
+    "upper_weight": "Ideal Weight Max (kg)",
+    "description": "Recommendations",
+}
+
+
+@dataclass(frozen=True)
+class HealthMetrics:
+    __slots__ = INPUT_FIELDS + RESULT_FIELDS
+
+    weight: float
+    height_in_meters: float
+    age: int
+    gender: str
+    activity: str
+    bmi: float
+    category: str
+    color: str
+    description: str
+    bmr: int
+    daily_calories: int
+    lower_weight: float
+    upper_weight: float
+    goal: str
+    calories_change: int
+
+    @property
+    def inputs(self):
+        return tuple(getattr(self, name) for name in INPUT_FIELDS)
+
+    @property
+    def height(self):
+        """Height in centimeters, as the exports and the report show it."""
+        return round(self.height_in_meters * 100, 4)
+
+    def as_dict(self, fields=INPUT_FIELDS + RESULT_FIELDS):
+        return {name: getattr(self, name) for name in fields}
@@ -0,0 +1,81 @@
+"""A minimal text-only PDF writer that emits the file as it goes.
+
+Pages are written and forgotten one at a time; only their object offsets are
+kept for the cross-reference table. The page tree is written last, so the
+page count need not be known up front. Text uses the standard Courier fonts,
+which every viewer has, so nothing is embedded.
+"""
+
+# A4 landscape, in points
+PAGE_SIZE = (842, 595)
+
+_CATALOG, _PAGES, _FONT, _BOLD_FONT = 1, 2, 3, 4
+
+
+def escape_text(text):
+    """Return ``text`` as a PDF literal string body (Latin-1, escaped)."""
+    text = text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    return text.encode("latin-1", errors="replace")
+
+
+def text_line(x, y, text, size=8, bold=False):
+    """Content-stream operators drawing one line of text at (x, y)."""
+    font = b"/F2" if bold else b"/F1"
+    return b"BT %s %g Tf %g %g Td (%s) Tj ET\n" % (font, size, x, y, escape_text(text))
+
+
+class PdfStream:
+    """Produce a PDF as a sequence of byte chunks.
+
+    Call :meth:`start` once, :meth:`page` for every page and :meth:`finish`
+    at the end, writing out the bytes each call returns in order.
+    """
+
+    def __init__(self, page_size=PAGE_SIZE):
+        self.page_size = page_size
+        self._offset = 0
+        self._offsets = {}
+        self._kids = []
+        self._next_id = _BOLD_FONT + 1
+
+    def _emit(self, data):
+        self._offset += len(data)
+        return data
+
+    def _object(self, number, body):
+        self._offsets[number] = self._offset
+        return self._emit(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+
+    def start(self):
+        return b"".join((
+            self._emit(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n"),
+            self._object(_CATALOG, b"<< /Type /Catalog /Pages %d 0 R >>" % _PAGES),
+            self._object(_FONT, b"<< /Type /Font /Subtype /Type1 /BaseFont /Courier /Encoding /WinAnsiEncoding >>"),
+            self._object(_BOLD_FONT, b"<< /Type /Font /Subtype /Type1 /BaseFont /Courier-Bold /Encoding /WinAnsiEncoding >>"),
+        ))
+
+    def page(self, content):
+        """Emit one page whose content stream is ``content`` (bytes)."""
+        contents, page = self._next_id, self._next_id + 1
+        self._next_id += 2
+        self._kids.append(page)
+        width, height = self.page_size
+        return b"".join((
+            self._object(contents, b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content)),
+            self._object(page, (
+                b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %g %g] "
+                b"/Resources << /Font << /F1 %d 0 R /F2 %d 0 R >> >> /Contents %d 0 R >>"
+            ) % (_PAGES, width, height, _FONT, _BOLD_FONT, contents)),
+        ))
+
+    def finish(self):
+        kids = b" ".join(b"%d 0 R" % kid for kid in self._kids)
+        pages = self._object(_PAGES, b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(self._kids)))
+        xref_offset = self._offset
+        size = self._next_id
+        entries = [b"0000000000 65535 f \n"]
+        entries += [b"%010d 00000 n \n" % self._offsets[number] for number in range(1, size)]
+        tail = b"xref\n0 %d\n%strailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+            size, b"".join(entries), size, _CATALOG, xref_offset
+        )
+        return pages + self._emit(tail)
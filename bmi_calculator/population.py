@@ -0,0 +1,208 @@
+"""Pre-aggregated population statistics over every computed result.
+
+Every result the app computes is counted, saved to a profile or not: each
+batch :class:`~bmi_calculator.history.HistoryStore` writes adds its rows and
+tallies to a small table of counts, in the same transaction:
+
+- a BMI histogram per gender, in 0.5-wide bins over the gauge's range, so
+  every bin falls in exactly one category
+- a daily-calorie histogram per gender, in 25 kcal bins
+- category counts by age band, by gender and by activity level
+
+The population dashboard reads these few hundred counts instead of scanning
+the results, so it renders just as fast over millions of stored results.
+Percentiles read from the calorie histogram are interpolated within a bin,
+so they are exact to about half a bin (12.5 kcal).
+
+Results stored before the counts existed are folded in once, the first time
+a store opens the database.
+"""
+
+import numpy as np
+
+from .calculations import ACTIVITY_LEVELS, BMI_CATEGORIES, GAUGE_RANGE, GENDERS
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS population_bins (
+    dimension TEXT NOT NULL,
+    key TEXT NOT NULL,
+    bin INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (dimension, key, bin)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS population_state (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+_UPSERT = (
+    "INSERT INTO population_bins (dimension, key, bin, count) VALUES (?, ?, ?, ?) "
+    "ON CONFLICT (dimension, key, bin) DO UPDATE SET count = count + excluded.count"
+)
+
+BMI_BIN_WIDTH = 0.5
+# Interior bins between the gauge's ends; bin 0 and the last bin hold
+# everything below and above them
+BMI_BINS = round((GAUGE_RANGE[1] - GAUGE_RANGE[0]) / BMI_BIN_WIDTH)
+
+CALORIE_BIN_WIDTH = 25
+CALORIE_RANGE = (0, 6000)
+CALORIE_BINS = round((CALORIE_RANGE[1] - CALORIE_RANGE[0]) / CALORIE_BIN_WIDTH)
+
+# Lower edges of the age bands, and their labels
+AGE_BAND_EDGES = (18, 30, 45, 60, 75)
+AGE_BANDS = ("2-17", "18-29", "30-44", "45-59", "60-74", "75+")
+
+CATEGORY_NAMES = tuple(name for name, _, _ in BMI_CATEGORIES)
+
+# Category count dimensions and the order of their keys
+CATEGORY_DIMENSIONS = {
+    "age": ("category_by_age", AGE_BANDS),
+    "gender": ("category_by_gender", GENDERS),
+    "activity": ("category_by_activity", ACTIVITY_LEVELS),
+}
+
+# Rows read at a time when folding in results stored before the counts
+REBUILD_CHUNK = 100_000
+
+
+def _histogram_bins(values, low, width, bins):
+    index = np.floor((np.asarray(values, dtype=np.float64) - low) / width) + 1
+    return np.clip(index, 0, bins + 1).astype(np.int64)
+
+
+def bmi_bins(bmi):
+    """Histogram bin of each BMI: 0 below the gauge range, ``BMI_BINS + 1`` above it."""
+    return _histogram_bins(bmi, GAUGE_RANGE[0], BMI_BIN_WIDTH, BMI_BINS)
+
+
+def calorie_bins(calories):
+    return _histogram_bins(calories, CALORIE_RANGE[0], CALORIE_BIN_WIDTH, CALORIE_BINS)
+
+
+def age_bands(age):
+    """Index into :data:`AGE_BANDS` of each age."""
+    return np.searchsorted(AGE_BAND_EDGES, np.asarray(age), side="right")
+
+
+def _encode(values):
+    # A handful of distinct labels: a dict lookup per value is much cheaper
+    # than converting the strings to a NumPy array and sorting them
+    codes = {}
+    encoded = np.fromiter((codes.setdefault(value, len(codes)) for value in values), dtype=np.int64, count=len(values))
+    return list(codes), encoded
+
+
+def _count(dimension, labels, keys, bins, size):
+    counts = np.bincount(keys * size + bins, minlength=len(labels) * size)
+    return [
+        (dimension, labels[code // size], code % size, count)
+        for code, count in zip(np.flatnonzero(counts).tolist(), counts[counts > 0].tolist())
+    ]
+
+
+def bin_counts(columns):
+    """Return ``(dimension, key, bin, count)`` rows for a batch of result columns.
+
+    ``columns`` maps at least ``age``, ``gender``, ``activity``, ``bmi``,
+    ``category`` and ``daily_calories`` to equal-length sequences.
+    """
+    # Each text column is encoded once and everything is counted on the codes
+    genders, gender = _encode(columns["gender"])
+    activities, activity = _encode(columns["activity"])
+    names, category = _encode(columns["category"])
+    category = np.array([CATEGORY_NAMES.index(name) for name in names], dtype=np.int64)[category]
+    size = len(BMI_CATEGORIES)
+    return (
+        _count("bmi", genders, gender, bmi_bins(columns["bmi"]), BMI_BINS + 2)
+        + _count("calories", genders, gender, calorie_bins(columns["daily_calories"]), CALORIE_BINS + 2)
+        + _count("category_by_age", AGE_BANDS, age_bands(columns["age"]), category, size)
+        + _count("category_by_gender", genders, gender, category, size)
+        + _count("category_by_activity", activities, activity, category, size)
+    )
+
+
+def add(conn, columns):
+    """Add a batch of result columns to the counts, inside the caller's transaction."""
+    conn.executemany(_UPSERT, bin_counts(columns))
+
+
+def ensure_built(conn, names):
+    """Fold every stored result into the counts once per database.
+
+    ``names`` are the results table's columns, in :data:`history.COLUMNS` order.
+    """
+    conn.executescript(SCHEMA)
+    if conn.execute("SELECT 1 FROM population_state WHERE name = 'built'").fetchone():
+        return
+    # Taking the write lock first means only one process does the rebuild
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        if not conn.execute("SELECT 1 FROM population_state WHERE name = 'built'").fetchone():
+            conn.execute("DELETE FROM population_bins")
+            cursor = conn.execute(f"SELECT {', '.join(names)} FROM results")
+            while True:
+                rows = cursor.fetchmany(REBUILD_CHUNK)
+                if not rows:
+                    break
+                add(conn, dict(zip(names, zip(*rows))))
+            conn.execute("INSERT INTO population_state (name, value) VALUES ('built', 1)")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+def load(conn):
+    """Read the counts into a :class:`Population`."""
+    return Population(conn.execute("SELECT dimension, key, bin, count FROM population_bins").fetchall())
+
+
+class Population:
+    """Count arrays per dimension and key, and the statistics the dashboard shows."""
+
+    def __init__(self, rows):
+        sizes = {"bmi": BMI_BINS + 2, "calories": CALORIE_BINS + 2}
+        self.counts = {}
+        for dimension, key, index, count in rows:
+            arrays = self.counts.setdefault(dimension, {})
+            if key not in arrays:
+                arrays[key] = np.zeros(sizes.get(dimension, len(BMI_CATEGORIES)), dtype=np.int64)
+            arrays[key][index] += count
+
+    def _summed(self, dimension, size, key=None):
+        arrays = self.counts.get(dimension, {})
+        if key is not None:
+            return arrays.get(key, np.zeros(size, dtype=np.int64))
+        return sum(arrays.values(), np.zeros(size, dtype=np.int64))
+
+    @property
+    def total(self):
+        return int(self._summed("bmi", BMI_BINS + 2).sum())
+
+    def bmi_histogram(self, gender=None):
+        """Return the interior bins' lower edges and counts, plus the counts below and above them."""
+        counts = self._summed("bmi", BMI_BINS + 2, gender)
+        edges = GAUGE_RANGE[0] + BMI_BIN_WIDTH * np.arange(BMI_BINS)
+        return edges, counts[1:-1], int(counts[0]), int(counts[-1])
+
+    def category_shares(self, by):
+        """Return ``by``'s keys and the share of each category per key (rows sum to 1)."""
+        dimension, keys = CATEGORY_DIMENSIONS[by]
+        arrays = self.counts.get(dimension, {})
+        keys = [key for key in keys if key in arrays]
+        counts = np.array([arrays[key] for key in keys], dtype=np.float64).reshape(len(keys), len(BMI_CATEGORIES))
+        totals = counts.sum(axis=1, keepdims=True)
+        return keys, np.divide(counts, totals, out=np.zeros_like(counts), where=totals > 0)
+
+    def calorie_percentiles(self, percentiles=(5, 25, 50, 75, 95), gender=None):
+        """Daily calorie needs at ``percentiles``, interpolated within the histogram's bins."""
+        counts = self._summed("calories", CALORIE_BINS + 2, gender)[1:-1]
+        total = counts.sum()
+        if not total:
+            return {p: None for p in percentiles}
+        cumulative = np.concatenate(([0], np.cumsum(counts))) / total
+        edges = CALORIE_RANGE[0] + CALORIE_BIN_WIDTH * np.arange(CALORIE_BINS + 1)
+        values = np.interp(np.asarray(percentiles) / 100, cumulative, edges)
+        return {p: round(float(value)) for p, value in zip(percentiles, values)}
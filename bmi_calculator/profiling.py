@@ -0,0 +1,189 @@
+"""Opt-in timing and counters for the stages of a Streamlit rerun.
+
+Profiling is off unless ``BMI_PROFILE=1`` is set or a session opts in (the
+app uses the ``?debug=1`` query parameter). While a run is active on the
+current thread, :func:`checkpoint` and :func:`span` record ``perf_counter``
+timings for it; every finished run is also folded into process-wide totals
+that :func:`render_prometheus` exposes in Prometheus text format and
+:func:`write_prometheus` dumps to a local file.
+
+Network calls are counted whether or not profiling is on, since they are rare
+and the counters are cheap.
+"""
+
+import os
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+ENABLED = os.environ.get("BMI_PROFILE", "") not in ("", "0")
+METRICS_PATH = os.environ.get("BMI_PROFILE_FILE", os.path.join(tempfile.gettempdir(), "bmi_calculator.prom"))
+
+_local = threading.local()
+_lock = threading.Lock()
+
+_stage_seconds = defaultdict(float)
+_stage_count = defaultdict(int)
+_figure_bytes = defaultdict(int)
+_figure_count = defaultdict(int)
+_lite_saved_bytes = defaultdict(int)
+_runs = 0
+_network_requests = 0
+_network_failures = 0
+_network_bytes = 0
+_network_seconds = 0.0
+
+
+class RunProfile:
+    """Spans, figure sizes, lite-mode savings and network calls recorded during one rerun."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._last = self.started
+        self.spans = []  # (stage, seconds)
+        self.figures = []  # (figure, serialized bytes)
+        self.payload = []  # (element, full-mode bytes, lite-mode bytes)
+        self.network = []  # (url, bytes, seconds)
+
+    @property
+    def total_seconds(self):
+        return time.perf_counter() - self.started
+
+
+def current_run():
+    """Return the profile being recorded on this thread, or None."""
+    return getattr(_local, "run", None)
+
+
+def start_run(enabled=None):
+    """Begin profiling a rerun on this thread if profiling is enabled."""
+    if not (ENABLED if enabled is None else enabled):
+        _local.run = None
+        return None
+    _local.run = RunProfile()
+    return _local.run
+
+
+def checkpoint(stage):
+    """Attribute the time since the previous checkpoint to ``stage``."""
+    run = current_run()
+    if run is None:
+        return
+    now = time.perf_counter()
+    run.spans.append((stage, now - run._last))
+    run._last = now
+
+
+@contextmanager
+def span(stage):
+    """Time the enclosed block as ``stage`` when a run is being profiled."""
+    run = current_run()
+    if run is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        run.spans.append((stage, time.perf_counter() - start))
+        run._last = time.perf_counter()
+
+
+def record_figure(name, fig):
+    """Record the serialized size of a Plotly figure (costs a serialization)."""
+    run = current_run()
+    if run is None:
+        return
+    run.figures.append((name, len(fig.to_json())))
+
+
+def record_payload(element, full_bytes, lite_bytes):
+    """Record what lite mode sent for ``element`` instead of the full render."""
+    run = current_run()
+    if run is None:
+        return
+    run.payload.append((element, full_bytes, lite_bytes))
+
+
+def record_network(url, nbytes, seconds, ok=True):
+    global _network_requests, _network_failures, _network_bytes, _network_seconds
+    with _lock:
+        _network_requests += 1
+        _network_failures += 0 if ok else 1
+        _network_bytes += nbytes
+        _network_seconds += seconds
+    run = current_run()
+    if run is not None:
+        run.network.append((url, nbytes, seconds))
+
+
+def finish_run():
+    """Fold the current run into the process totals and return it."""
+    global _runs
+    run = current_run()
+    if run is None:
+        return None
+    _local.run = None
+    with _lock:
+        _runs += 1
+        for stage, seconds in run.spans:
+            _stage_seconds[stage] += seconds
+            _stage_count[stage] += 1
+        _stage_seconds["total"] += run.total_seconds
+        _stage_count["total"] += 1
+        for name, nbytes in run.figures:
+            _figure_bytes[name] += nbytes
+            _figure_count[name] += 1
+        for element, full_bytes, lite_bytes in run.payload:
+            _lite_saved_bytes[element] += full_bytes - lite_bytes
+    return run
+
+
+def render_prometheus(extra=None):
+    """Return the process totals (plus ``extra`` gauges) in Prometheus text format."""
+    with _lock:
+        lines = [
+            "# TYPE bmi_profiled_runs_total counter",
+            f"bmi_profiled_runs_total {_runs}",
+            "# TYPE bmi_stage_seconds summary",
+        ]
+        for stage in sorted(_stage_seconds):
+            lines.append(f'bmi_stage_seconds_sum{{stage="{stage}"}} {_stage_seconds[stage]:.6f}')
+            lines.append(f'bmi_stage_seconds_count{{stage="{stage}"}} {_stage_count[stage]}')
+        lines.append("# TYPE bmi_figure_json_bytes summary")
+        for name in sorted(_figure_bytes):
+            lines.append(f'bmi_figure_json_bytes_sum{{figure="{name}"}} {_figure_bytes[name]}')
+            lines.append(f'bmi_figure_json_bytes_count{{figure="{name}"}} {_figure_count[name]}')
+        lines.append("# TYPE bmi_lite_saved_bytes_total counter")
+        for element in sorted(_lite_saved_bytes):
+            lines.append(f'bmi_lite_saved_bytes_total{{element="{element}"}} {_lite_saved_bytes[element]}')
+        lines += [
+            "# TYPE bmi_network_requests_total counter",
+            f"bmi_network_requests_total {_network_requests}",
+            "# TYPE bmi_network_failures_total counter",
+            f"bmi_network_failures_total {_network_failures}",
+            "# TYPE bmi_network_bytes_total counter",
+            f"bmi_network_bytes_total {_network_bytes}",
+            "# TYPE bmi_network_seconds_total counter",
+            f"bmi_network_seconds_total {_network_seconds:.6f}",
+        ]
+    for name, value in sorted((extra or {}).items()):
+        lines.append(f"# TYPE {name} gauge")
+        lines.append(f"{name} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path=METRICS_PATH, extra=None):
+    """Atomically write :func:`render_prometheus` output to ``path``."""
+    text = render_prometheus(extra)
+    directory = os.path.dirname(os.path.abspath(path))
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            fh.write(text)
+        os.replace(tmp_path, path)
+    except OSError:
+        return None
+    return path
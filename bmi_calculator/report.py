@@ -0,0 +1,26 @@
+"""Plain-text health report offered by the download button."""
+
+REPORT_TEMPLATE = """
+            BMI HEALTH REPORT
+            -----------------
+            Date: {date}
+            
+            MEASUREMENTS
+            Height: {m.height:.1f} cm
+            Weight: {m.weight:.1f} kg
+            BMI: {m.bmi}
+            Category: {m.category}
+            
+            HEALTH METRICS
+            BMR: {m.bmr} kcal/day
+            Daily Calorie Needs: {m.daily_calories} kcal/day
+            Ideal Weight Range: {m.lower_weight} - {m.upper_weight} kg
+            
+            RECOMMENDATIONS
+            {m.description}
+            """
+
+
+def format_text_report(metrics, date):
+    """Fill the report template from a :class:`HealthMetrics` record."""
+    return REPORT_TEMPLATE.format(m=metrics, date=date)
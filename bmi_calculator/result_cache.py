@@ -0,0 +1,100 @@
+"""Server-side cache of complete result bundles, shared by every session.
+
+A bundle holds everything the results page shows for one set of inputs: the
+:class:`HealthMetrics` record from :func:`compute_health_metrics`, the tips,
+the report and CSV/JSON exports (encoded once, ready for the download
+buttons) and, once they have been rendered, the gauge and projection figures. Bundles are
+keyed on the canonical SI inputs (kg, m) after unit conversion, so the same
+person entered in different unit systems shares one entry; the bundle itself
+is computed from the first caller's unrounded inputs.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from .calculations import compute_health_metrics
+from .exports import metrics_to_csv, metrics_to_json
+from .report import format_text_report
+from .tips import get_health_tips
+
+# Decimal places kept when canonicalizing kg and m; enough to absorb float
+# noise between unit systems without merging genuinely different inputs
+CANONICAL_DIGITS = 6
+
+
+def canonical_key(weight, height_in_meters, age, gender, activity):
+    return (
+        round(float(weight), CANONICAL_DIGITS),
+        round(float(height_in_meters), CANONICAL_DIGITS),
+        int(age),
+        gender,
+        activity,
+    )
+
+
+class ResultCache:
+    """A thread-safe LRU of result bundles with hit/miss/eviction counters."""
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, weight, height_in_meters, age, gender, activity, bmr_formula=None, categories=None, body_fat=None):
+        """Return the bundle for these inputs, computing it on a miss."""
+        # The report is dated, so bundles only live for the day they were made
+        date = time.strftime("%Y-%m-%d")
+        key = canonical_key(weight, height_in_meters, age, gender, activity) + (bmr_formula, categories, body_fat, date)
+        with self._lock:
+            bundle = self._entries.get(key)
+            if bundle is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return bundle
+            self.misses += 1
+
+        # The rounded values are only the key: the caller's exact height is
+        # what matches a row of the precomputed height tables
+        metrics = compute_health_metrics(weight, height_in_meters, age, gender, activity, bmr_formula, categories, body_fat)
+        bundle = {
+            "metrics": metrics,
+            "tips": get_health_tips(metrics.category),
+            "report": format_text_report(metrics, date).encode("utf-8"),
+            "csv": metrics_to_csv(metrics).encode("utf-8"),
+            "json": metrics_to_json(metrics).encode("utf-8"),
+            "figures": {},
+        }
+        with self._lock:
+            self._entries[key] = bundle
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return bundle
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def bundle_figure(bundle, name, build):
+    """Return ``bundle``'s figure called ``name``, building it on first use."""
+    figures = bundle["figures"]
+    fig = figures.get(name)
+    if fig is None:
+        fig = figures[name] = build()
+    return fig
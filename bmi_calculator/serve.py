@@ -0,0 +1,165 @@
+"""Run several app workers on one machine behind a local load balancer.
+
+Usage::
+
+    python -m bmi_calculator.serve [--app streamlit] [--workers N] [--port 8501]
+    python -m bmi_calculator.serve --app api --workers 4 --port 8080
+    python -m bmi_calculator.serve --workers 4 --nginx-conf bmi.conf --no-balancer
+
+A single Streamlit process runs every session's script on threads of one
+interpreter, so CPU-bound work such as building and serializing Plotly
+figures contends on the GIL. This starts ``--workers`` processes (Streamlit
+or the JSON API) on the ports after ``--port`` and balances ``--port`` across
+them with :mod:`bmi_calculator.balancer` (sticky per browser for Streamlit).
+``--nginx-conf`` writes an equivalent nginx configuration instead of, or as
+well as, running the built-in balancer.
+
+Workers share figures through :mod:`bmi_calculator.shared_cache`; Lottie
+animations and the CDC table were already shared through files in the cache
+directory, and the history database is one SQLite file in WAL mode.
+"""
+
+import argparse
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+
+from .balancer import Balancer
+from .lottie_cache import CACHE_DIR
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(ROOT, "main.py")
+
+HEALTH_PATHS = {"streamlit": "/_stcore/health", "api": "/healthz"}
+
+NGINX_TEMPLATE = """\
+# BMI Calculator: {workers} {app} workers behind port {port}.
+# Include this file from the http block of nginx.conf.
+map $http_upgrade $bmi_connection_upgrade {{
+    default upgrade;
+    ''      '';
+}}
+
+upstream bmi_{app} {{
+    {balance};
+{servers}
+    keepalive 32;
+}}
+
+server {{
+    listen {port};
+
+    location / {{
+        proxy_pass http://bmi_{app};
+        proxy_http_version 1.1;
+        proxy_set_header Host $host;
+        proxy_set_header Upgrade $http_upgrade;
+        proxy_set_header Connection $bmi_connection_upgrade;
+        proxy_read_timeout 1d;
+    }}
+}}
+"""
+
+
+def worker_command(app, port):
+    if app == "streamlit":
+        return [
+            sys.executable, "-m", "streamlit", "run", APP_PATH,
+            "--server.port", str(port), "--server.address", "127.0.0.1", "--server.headless", "true",
+        ]
+    return [sys.executable, "-m", "bmi_calculator.api", "--host", "127.0.0.1", "--port", str(port)]
+
+
+def render_nginx_config(app, port, worker_ports):
+    """nginx configuration balancing ``port`` across ``worker_ports``."""
+    # Streamlit sessions live in one worker, so each client is pinned to one
+    balance = "ip_hash" if app == "streamlit" else "least_conn"
+    servers = "\n".join(f"    server 127.0.0.1:{worker_port};" for worker_port in worker_ports)
+    return NGINX_TEMPLATE.format(app=app, port=port, workers=len(worker_ports), balance=balance, servers=servers)
+
+
+def worker_env():
+    env = dict(os.environ)
+    env.setdefault("BMI_SHARED_CACHE", os.path.join(CACHE_DIR, "shared.sqlite3"))
+    # Workers import bmi_calculator from this checkout
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, (ROOT, env.get("PYTHONPATH"))))
+    return env
+
+
+def start_workers(app, worker_ports):
+    env = worker_env()
+    return [subprocess.Popen(worker_command(app, port), cwd=ROOT, env=env) for port in worker_ports]
+
+
+def wait_until_ready(app, ports, timeout=60):
+    """Block until every port answers its health check."""
+    deadline = time.time() + timeout
+    pending = list(ports)
+    while pending:
+        port = pending[0]
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}{HEALTH_PATHS[app]}", timeout=1):
+                pending.pop(0)
+                continue
+        except OSError:
+            pass
+        if time.time() > deadline:
+            raise RuntimeError(f"worker on port {port} did not become healthy")
+        time.sleep(0.2)
+
+
+def stop_workers(workers):
+    for worker in workers:
+        worker.terminate()
+    for worker in workers:
+        try:
+            worker.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            worker.kill()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m bmi_calculator.serve", description="Run several app workers.")
+    parser.add_argument("--app", choices=sorted(HEALTH_PATHS), default="streamlit")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes (default: CPU count)")
+    parser.add_argument("--host", default="127.0.0.1", help="address the balancer listens on")
+    parser.add_argument("--port", type=int, default=8501, help="balancer port; workers use the following ports")
+    parser.add_argument("--nginx-conf", help="also write an nginx configuration for these workers to this file")
+    parser.add_argument("--no-balancer", action="store_true", help="only start the workers (e.g. behind nginx)")
+    args = parser.parse_args(argv)
+
+    worker_ports = [args.port + 1 + i for i in range(args.workers)]
+    if args.nginx_conf:
+        with open(args.nginx_conf, "w", encoding="utf-8") as fh:
+            fh.write(render_nginx_config(args.app, args.port, worker_ports))
+
+    workers = start_workers(args.app, worker_ports)
+    # Stop the workers on SIGTERM as well as on Ctrl+C
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        wait_until_ready(args.app, worker_ports)
+        print(f"{args.workers} {args.app} workers ready on ports {worker_ports[0]}-{worker_ports[-1]}", flush=True)
+        if args.no_balancer:
+            while all(worker.poll() is None for worker in workers):
+                time.sleep(1)
+        else:
+            backends = [("127.0.0.1", port) for port in worker_ports]
+            balancer = Balancer(backends, sticky=args.app == "streamlit")
+            print(f"balancing http://{args.host}:{args.port}", flush=True)
+            asyncio.run(balancer.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    except RuntimeError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    finally:
+        stop_workers(workers)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
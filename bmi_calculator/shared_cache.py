@@ -0,0 +1,103 @@
+"""Cache shared by every worker process of a multi-worker deployment.
+
+Entries are byte strings in a local SQLite database (``BMI_SHARED_CACHE``,
+set by :mod:`bmi_calculator.serve`) that runs in WAL mode with reads
+memory-mapped, so workers on one machine read the same page-cache pages
+instead of each holding its own copy, and a value built by one worker is
+reused by all the others. Without ``BMI_SHARED_CACHE`` the app runs as a
+single process and :func:`get_shared_cache` returns None.
+
+Each namespace keeps its ``max_entries`` most recently stored values.
+"""
+
+import os
+import threading
+import time
+
+from .history import ConnectionPool
+
+SHARED_CACHE_PATH = os.environ.get("BMI_SHARED_CACHE")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    stored_at REAL NOT NULL,
+    value BLOB NOT NULL,
+    PRIMARY KEY (namespace, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS entries_age ON entries (namespace, stored_at);
+"""
+
+# Stores between two trims of a namespace down to its max_entries
+_TRIM_EVERY = 256
+
+
+class SharedCache:
+    """A bounded, cross-process key-value store of byte strings."""
+
+    def __init__(self, path, max_entries=4096, pool_size=4, mmap_size=64 * 1024 * 1024):
+        self.pool = ConnectionPool(path, pool_size, pragmas=(f"mmap_size={mmap_size}",))
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._stores = 0
+        self._lock = threading.Lock()
+        with self.pool.connection() as conn:
+            conn.executescript(SCHEMA)
+
+    def get(self, namespace, key):
+        with self.pool.connection() as conn:
+            row = conn.execute(
+                "SELECT value FROM entries WHERE namespace = ? AND key = ?", (namespace, key)
+            ).fetchone()
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return row[0]
+
+    def set(self, namespace, key, value):
+        with self.pool.connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (namespace, key, stored_at, value) VALUES (?, ?, ?, ?)",
+                (namespace, key, time.time(), value),
+            )
+        with self._lock:
+            self._stores += 1
+            trim = self._stores % _TRIM_EVERY == 0
+        if trim:
+            self.trim(namespace)
+
+    def trim(self, namespace):
+        """Drop all but the ``max_entries`` most recently stored entries of ``namespace``."""
+        with self.pool.connection() as conn:
+            conn.execute(
+                "DELETE FROM entries WHERE namespace = ? AND stored_at < ("
+                "SELECT stored_at FROM entries WHERE namespace = ? ORDER BY stored_at DESC LIMIT 1 OFFSET ?)",
+                (namespace, namespace, self.max_entries - 1),
+            )
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "stores": self._stores}
+
+    def close(self):
+        self.pool.close()
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_cache():
+    """Return the process's :class:`SharedCache`, or None when it is not configured."""
+    global _shared
+    if SHARED_CACHE_PATH is None:
+        return None
+    if _shared is None:
+        with _shared_lock:
+            if _shared is None:
+                _shared = SharedCache(SHARED_CACHE_PATH)
+    return _shared
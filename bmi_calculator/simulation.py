@@ -0,0 +1,85 @@
+"""Time-stepped weight trajectories for a weight management plan.
+
+Each person eats a fixed daily intake (their maintenance calories plus the
+plan's change) while their BMR and daily calorie needs are recomputed from
+the current weight every day, so weight change slows as the body adapts.
+About 7700 kcal of surplus or deficit makes one kilogram.
+
+Because every BMR equation in :mod:`bmi_calculator.formulas` is linear in weight, one simulated day is the
+affine map ``w -> ratio * w + shift`` and day ``t`` has the closed form
+``equilibrium + (w0 - equilibrium) * ratio ** t``. :class:`Trajectory` uses
+it to evaluate only the days that are asked for, for any number of people at
+once, without stepping through the days in between. :meth:`Trajectory.iter_days`
+steps day by day with the batch BMR function for consumers that want every
+day.
+"""
+
+import numpy as np
+
+from . import batch
+
+KCAL_PER_KG = 7700
+
+
+def plan_intake(weight, height_in_meters, age, gender, activity, calories_change, bmr_formula=None, body_fat=None):
+    """Daily intake (kcal) for a plan: today's calorie needs plus the change.
+
+    The needs are not rounded as they are for display, so a plan with no
+    change keeps the weight exactly where it is.
+    """
+    bmr = batch.bmr_unrounded(weight, height_in_meters, age, gender, bmr_formula, body_fat)
+    return bmr * batch.activity_factors(activity) + np.asarray(calories_change)
+
+
+class Trajectory:
+    """Lazily evaluated daily weights (kg) for a batch of people."""
+
+    def __init__(self, weight, height_in_meters, age, gender, activity, intake, bmr_formula=None, body_fat=None):
+        weight, height_in_meters, age, intake = np.broadcast_arrays(
+            *(np.atleast_1d(np.asarray(x, dtype=np.float64)) for x in (weight, height_in_meters, age, intake))
+        )
+        size = weight.shape
+        self.initial_weight = weight
+        self.height_in_meters = height_in_meters
+        self.age = age
+        self.gender = np.broadcast_to(np.atleast_1d(np.asarray(gender)), size)
+        self.activity = np.broadcast_to(np.atleast_1d(np.asarray(activity)), size)
+        self.intake = intake
+        self.bmr_formula = bmr_formula
+        # Body fat is held at its starting percentage
+        self.body_fat = None if body_fat is None else np.broadcast_to(np.asarray(body_fat, dtype=np.float64), size)
+
+        # Daily calorie needs are intercept + slope * weight
+        base, weight_coef, height_coef, age_coef = batch.bmr_coefficients(self.gender, bmr_formula, self.body_fat)
+        factor = batch.activity_factors(self.activity)
+        intercept = factor * (base + (height_coef * height_in_meters * 100) - (age_coef * age))
+        slope = factor * weight_coef
+        self.ratio = 1 - slope / KCAL_PER_KG
+        self.equilibrium = (intake - intercept) / slope
+
+    def __len__(self):
+        return self.initial_weight.size
+
+    def weights_at(self, days):
+        """Return weights for the given days, shape ``(people, len(days))``."""
+        days = np.asarray(days, dtype=np.float64)
+        decay = self.ratio[:, np.newaxis] ** days[np.newaxis, :]
+        offset = (self.initial_weight - self.equilibrium)[:, np.newaxis]
+        return self.equilibrium[:, np.newaxis] + offset * decay
+
+    def iter_days(self):
+        """Yield the weights for day 0, 1, 2, ... by explicit daily steps."""
+        weight = self.initial_weight.copy()
+        while True:
+            yield weight.copy()
+            needs = batch.bmr_unrounded(
+                weight, self.height_in_meters, self.age, self.gender, self.bmr_formula, self.body_fat
+            )
+            needs = needs * batch.activity_factors(self.activity)
+            weight += (self.intake - needs) / KCAL_PER_KG
+
+
+def simulate(weight, height_in_meters, age, gender, activity, calories_change=0, bmr_formula=None, body_fat=None):
+    """Build the :class:`Trajectory` for a plan of ``calories_change`` kcal/day."""
+    intake = plan_intake(weight, height_in_meters, age, gender, activity, calories_change, bmr_formula, body_fat)
+    return Trajectory(weight, height_in_meters, age, gender, activity, intake, bmr_formula, body_fat)
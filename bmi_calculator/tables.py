@@ -0,0 +1,141 @@
+"""Precomputed height tables for the ideal weight range.
+
+Every height the app can produce comes from a bounded input grid: 50-250 cm
+and 20-100 inches in 0.1 steps, and 1-8 ft plus 0-11 in. Each grid is turned
+into compact ``array('d')`` columns once, on first use, and a lookup maps a
+height in meters back to its row in O(1). Heights that are not on a grid
+(bulk feeds, API calls) fall back to the formulas in
+:mod:`bmi_calculator.calculations`, so lookups always agree with them.
+
+Categories are not tabulated: they follow the BMI as rounded for display, and
+comparing weights with per-height cutoff weights would disagree with it for
+BMIs that round up onto a cutoff.
+"""
+
+import threading
+from array import array
+
+from .calculations import calculate_ideal_weight
+from .units import FOOT_TO_CM, INCH_TO_CM, INCH_TO_M
+
+
+class HeightTable:
+    """Columns for one input grid, with ``index`` mapping meters to a row."""
+
+    def __init__(self, heights, index):
+        self.index = index
+        self.height = array("d")
+        self.lower = array("d")
+        self.upper = array("d")
+        for height in heights:
+            lower, upper = calculate_ideal_weight(height)
+            self.height.append(height)
+            self.lower.append(lower)
+            self.upper.append(upper)
+
+    def row(self, height_in_meters):
+        """Return the row for ``height_in_meters`` or None if it is off the grid."""
+        try:
+            i = self.index(height_in_meters)
+        except (ValueError, OverflowError):
+            return None
+        if 0 <= i < len(self.height) and self.height[i] == height_in_meters:
+            return i
+        return None
+
+
+def _metric_table():
+    # 50.0 to 250.0 cm in 0.1 cm steps, converted like the metric inputs
+    return HeightTable(
+        ((i / 10) / 100 for i in range(500, 2501)),
+        lambda h: round(h * 1000) - 500,
+    )
+
+
+def _imperial_table():
+    # 20.0 to 100.0 inches in 0.1 inch steps
+    return HeightTable(
+        ((i / 10) * INCH_TO_M for i in range(200, 1001)),
+        lambda h: round(h / INCH_TO_M * 10) - 200,
+    )
+
+
+def _mixed_table():
+    # 1-8 feet plus 0-11 inches, one row per whole inch from 1 ft 0 in
+    return HeightTable(
+        ((feet * FOOT_TO_CM + inches * INCH_TO_CM) / 100 for feet in range(1, 9) for inches in range(12)),
+        lambda h: round(h / INCH_TO_M) - 12,
+    )
+
+
+_tables = None
+_lock = threading.Lock()
+
+
+def get_tables():
+    """Return the (metric, imperial, mixed) tables, building them on first use."""
+    global _tables
+    if _tables is None:
+        with _lock:
+            if _tables is None:
+                _tables = (_metric_table(), _imperial_table(), _mixed_table())
+    return _tables
+
+
+def _find(height_in_meters):
+    for table in get_tables():
+        i = table.row(height_in_meters)
+        if i is not None:
+            return table, i
+    return None, None
+
+
+def ideal_weight_range(height_in_meters):
+    """Return ``calculate_ideal_weight(height_in_meters)`` via the tables."""
+    table, i = _find(height_in_meters)
+    if table is None:
+        return calculate_ideal_weight(height_in_meters)
+    return table.lower[i], table.upper[i]
+
+
+def ideal_weight_arrays(height_in_meters):
+    """Vectorized :func:`ideal_weight_range` for NumPy arrays of heights.
+
+    Rows on one of the grids are gathered from the tables; anything else is
+    computed with :func:`bmi_calculator.batch.calculate_ideal_weight`.
+    """
+    import numpy as np
+
+    from . import batch
+
+    heights = np.asarray(height_in_meters, dtype=np.float64)
+    flat = heights.reshape(-1)
+    lower = np.empty(flat.shape)
+    upper = np.empty(flat.shape)
+    # Positions still to resolve; each table only looks at what the previous missed
+    pending = np.arange(flat.size)
+    scales = (1000.0, 10 / INCH_TO_M, 1 / INCH_TO_M)
+    offsets = (500, 200, 12)
+    with np.errstate(invalid="ignore"):
+        for table, scale, offset in zip(get_tables(), scales, offsets):
+            if not pending.size:
+                break
+            values = flat[pending]
+            grid_height = np.frombuffer(table.height, dtype=np.float64)
+            rows = np.rint(values * scale) - offset
+            rows = np.clip(np.nan_to_num(rows, nan=-1.0), -1, grid_height.size).astype(np.int64)
+            valid = (rows >= 0) & (rows < grid_height.size)
+            rows[~valid] = 0
+            hit = valid & (grid_height[rows] == values)
+            if pending.size == flat.size and hit.all():
+                # Every height sits on this grid (the common case): gather directly
+                lower = np.frombuffer(table.lower, dtype=np.float64)[rows]
+                upper = np.frombuffer(table.upper, dtype=np.float64)[rows]
+                pending = pending[:0]
+                break
+            lower[pending[hit]] = np.frombuffer(table.lower, dtype=np.float64)[rows[hit]]
+            upper[pending[hit]] = np.frombuffer(table.upper, dtype=np.float64)[rows[hit]]
+            pending = pending[~hit]
+    if pending.size:
+        lower[pending], upper[pending] = batch.calculate_ideal_weight(flat[pending])
+    return lower.reshape(heights.shape), upper.reshape(heights.shape)
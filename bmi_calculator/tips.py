@@ -0,0 +1,36 @@
+"""Personalized health tips shown for each BMI category."""
+
+# (background, accent color, tips) per tip group
+HEALTH_TIPS = {
+    "Underweight": ("rgba(51, 102, 204, 0.1)", "#3366cc", (
+        "Consider increasing your calorie intake with nutrient-dense foods",
+        "Include healthy fats like avocados, nuts, and olive oil in your diet",
+        "Incorporate strength training to build muscle mass",
+        "Consult with a healthcare provider or dietitian for personalized advice",
+    )),
+    "Normal Weight": ("rgba(76, 175, 80, 0.1)", "#4CAF50", (
+        "Maintain your balanced diet and regular exercise routine",
+        "Aim for 150 minutes of moderate exercise per week",
+        "Stay hydrated and get adequate sleep",
+        "Continue regular health check-ups",
+    )),
+    "Overweight": ("rgba(255, 152, 0, 0.1)", "#ff9800", (
+        "Focus on portion control and mindful eating",
+        "Increase physical activity gradually (aim for 30 minutes daily)",
+        "Reduce processed foods and added sugars",
+        "Consider consulting a healthcare provider for personalized advice",
+    )),
+    # Shared by every obesity class
+    "Obese": ("rgba(244, 67, 54, 0.1)", "#f44336", (
+        "Consult with healthcare professionals for a comprehensive weight management plan",
+        "Consider working with a registered dietitian for personalized nutrition guidance",
+        "Start with gentle, low-impact exercises like walking or swimming",
+        "Focus on sustainable lifestyle changes rather than quick fixes",
+        "Monitor other health metrics like blood pressure and cholesterol",
+    )),
+}
+
+
+def get_health_tips(category):
+    """Return (background, accent color, tips) for a BMI category."""
+    return HEALTH_TIPS.get(category, HEALTH_TIPS["Obese"])
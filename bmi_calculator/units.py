@@ -0,0 +1,59 @@
+"""Unit conversion constants and helpers (everything is converted to kg and m)."""
+
+LB_TO_KG = 0.453592
+INCH_TO_M = 0.0254
+FOOT_TO_CM = 30.48
+INCH_TO_CM = 2.54
+
+METRIC = "Metric (kg, cm)"
+IMPERIAL = "Imperial (lbs, inches)"
+MIXED = "Mixed (kg, feet/inches)"
+UNIT_SYSTEMS = (METRIC, IMPERIAL, MIXED)
+
+# Unit weights are entered and shown in, per unit system
+WEIGHT_UNITS = {METRIC: "kg", IMPERIAL: "lbs", MIXED: "kg"}
+
+# Multipliers that turn bulk (weight, height) columns into (kg, m)
+BULK_UNIT_FACTORS = {
+    "metric": (1.0, 0.01),  # kg, cm
+    "imperial": (LB_TO_KG, INCH_TO_M),  # lbs, inches
+}
+
+
+def lbs_to_kg(weight):
+    return weight * LB_TO_KG
+
+
+def kg_to_lbs(weight):
+    return weight / LB_TO_KG
+
+
+def cm_to_m(height):
+    return height / 100
+
+
+def inches_to_m(height):
+    return height * INCH_TO_M
+
+
+def feet_inches_to_m(feet, inches):
+    return (feet * FOOT_TO_CM + inches * INCH_TO_CM) / 100
+
+
+def to_si(unit, weight, height):
+    """Convert a weight and height entered in ``unit`` to kg and m.
+
+    Mixed heights are ``(feet, inches)``.
+    """
+    if unit == IMPERIAL:
+        return lbs_to_kg(weight), inches_to_m(height)
+    if unit == MIXED:
+        return weight, feet_inches_to_m(*height)
+    return weight, cm_to_m(height)
+
+
+def display_weight(weight_kg, unit):
+    """Return ``weight_kg`` in ``unit``'s weight unit, as the app shows it."""
+    if WEIGHT_UNITS[unit] == "lbs":
+        return round(kg_to_lbs(weight_kg), 1)
+    return weight_kg
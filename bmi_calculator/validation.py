@@ -0,0 +1,198 @@
+"""Vectorized unit conversion and plausibility checks for bulk inputs.
+
+:func:`validate` converts raw weight and height columns to kg and m and runs
+every check on whole arrays, returning a per-row bit mask of the checks each
+row failed (0 for a valid row). Rows that fail are left out before anything
+is computed, so a bad row can neither raise in the batch engine nor come out
+as a plausible-looking score. :func:`describe_errors` turns masks into
+messages, and :class:`ErrorReport` streams the rejected rows as CSV.
+
+Weights, heights or BMIs well outside human ranges usually mean swapped
+columns or the wrong ``units``; when a row that fails them would pass in the
+other units, the message says so.
+"""
+
+from collections import Counter, namedtuple
+
+import numpy as np
+
+from .calculations import ACTIVITY_LEVELS, GENDERS
+from .exports import LabelColumn, batch_to_csv
+from .units import BULK_UNIT_FACTORS
+
+# Accepted ranges, in kg, m and years; the app's inputs stay inside them
+WEIGHT_RANGE_KG = (1.0, 320.0)
+HEIGHT_RANGE_M = (0.5, 2.55)
+AGE_RANGE = (2, 120)
+BODY_FAT_RANGE = (2.0, 70.0)
+# Outside this no body is plausible; usually swapped units or columns
+BMI_RANGE = (8.0, 120.0)
+
+# Check bit -> message, in bit order
+ERROR_MESSAGES = (
+    "weight is missing or not a number",
+    f"weight is outside {WEIGHT_RANGE_KG[0]:g}-{WEIGHT_RANGE_KG[1]:g} kg",
+    "height is missing or not a number",
+    f"height is outside {HEIGHT_RANGE_M[0]:g}-{HEIGHT_RANGE_M[1]:g} m",
+    "age is missing or not a number",
+    f"age is outside {AGE_RANGE[0]}-{AGE_RANGE[1]}",
+    f"gender must be one of: {', '.join(GENDERS)}",
+    f"activity must be one of: {', '.join(ACTIVITY_LEVELS)}",
+    "body_fat is missing or not a number",
+    f"body_fat is outside {BODY_FAT_RANGE[0]:g}-{BODY_FAT_RANGE[1]:g}%",
+    f"BMI is outside {BMI_RANGE[0]:g}-{BMI_RANGE[1]:g}",
+    "the weight and height would be plausible in other units",
+    "age must be a whole number of years",
+)
+(WEIGHT_MISSING, WEIGHT_RANGE, HEIGHT_MISSING, HEIGHT_RANGE, AGE_MISSING, AGE_OUT_OF_RANGE, GENDER_UNKNOWN,
+ ACTIVITY_UNKNOWN, BODY_FAT_MISSING, BODY_FAT_OUT_OF_RANGE, BMI_IMPLAUSIBLE, UNITS_SWAPPED, AGE_NOT_INTEGER) = (
+    1 << bit for bit in range(len(ERROR_MESSAGES))
+)
+
+# Validated columns in kg and m; ``errors`` is the per-row check mask
+Validated = namedtuple("Validated", ["weight", "height", "age", "gender", "activity", "body_fat", "errors"])
+
+# The rejected rows of one chunk: the chunk's row count, their positions in
+# it, their error masks and their ECHO_COLUMNS as strings
+Rejected = namedtuple("Rejected", ["rows", "index", "errors", "values"])
+
+# Input columns repeated in the error report
+ECHO_COLUMNS = ("weight", "height", "age", "gender", "activity", "body_fat")
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def parse_numbers(values):
+    """Return ``values`` as float64, with empty or unparsable entries as NaN."""
+    try:
+        return np.asarray(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        # A chunk with a bad value; float() per value costs about what
+        # NumPy's own conversion of a list of strings does
+        return np.fromiter(map(_to_float, values), dtype=np.float64, count=len(values))
+
+
+def bulk_to_si(weight, height, units="metric"):
+    """Convert bulk weight and height columns in ``units`` to kg and m."""
+    weight_factor, height_factor = BULK_UNIT_FACTORS[units]
+    return parse_numbers(weight) * weight_factor, parse_numbers(height) * height_factor
+
+
+def _outside(values, bounds):
+    # NaN compares False both ways, so missing values are not also out of range
+    return (values < bounds[0]) | (values > bounds[1])
+
+
+def _implausible_body(weight, height):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        bmi = weight / height ** 2
+    return _outside(weight, WEIGHT_RANGE_KG) | _outside(height, HEIGHT_RANGE_M) | _outside(bmi, BMI_RANGE)
+
+
+def validate(weight, height, age, gender, activity, body_fat=None, units="metric", needs_body_fat=False):
+    """Convert and check raw input columns; return :data:`Validated` columns.
+
+    ``weight`` and ``height`` are in ``units`` (see ``BULK_UNIT_FACTORS``).
+    Body fat is checked when it is given or ``needs_body_fat`` is set.
+    """
+    raw_weight, raw_height = parse_numbers(weight), parse_numbers(height)
+    weight, height = bulk_to_si(raw_weight, raw_height, units)
+    age = parse_numbers(age)
+    gender = np.asarray(gender)
+    activity = np.asarray(activity)
+
+    errors = np.zeros(weight.shape, dtype=np.uint16)
+    for values, bounds, missing, out_of_range in (
+        (weight, WEIGHT_RANGE_KG, WEIGHT_MISSING, WEIGHT_RANGE),
+        (height, HEIGHT_RANGE_M, HEIGHT_MISSING, HEIGHT_RANGE),
+        (age, AGE_RANGE, AGE_MISSING, AGE_OUT_OF_RANGE),
+    ):
+        errors[~np.isfinite(values)] |= missing
+        errors[_outside(values, bounds)] |= out_of_range
+    # Ages are whole years, as in the app; NaN and inf are already flagged
+    with np.errstate(invalid="ignore"):
+        errors[np.isfinite(age) & (age != np.floor(age))] |= AGE_NOT_INTEGER
+    errors[~np.isin(gender, GENDERS)] |= GENDER_UNKNOWN
+    errors[~np.isin(activity, ACTIVITY_LEVELS)] |= ACTIVITY_UNKNOWN
+    if body_fat is not None or needs_body_fat:
+        body_fat = np.full(weight.shape, np.nan) if body_fat is None else parse_numbers(body_fat)
+        errors[~np.isfinite(body_fat)] |= BODY_FAT_MISSING
+        errors[_outside(body_fat, BODY_FAT_RANGE)] |= BODY_FAT_OUT_OF_RANGE
+
+    # BMI is only judged when weight and height are each plausible
+    measured = (errors & (WEIGHT_MISSING | WEIGHT_RANGE | HEIGHT_MISSING | HEIGHT_RANGE)) == 0
+    errors[measured & _implausible_body(weight, height)] |= BMI_IMPLAUSIBLE
+    implausible = (errors & (WEIGHT_RANGE | HEIGHT_RANGE | BMI_IMPLAUSIBLE)) != 0
+    if implausible.any():
+        for other, (weight_factor, height_factor) in BULK_UNIT_FACTORS.items():
+            if other != units:
+                plausible = ~_implausible_body(raw_weight * weight_factor, raw_height * height_factor)
+                errors[implausible & plausible] |= UNITS_SWAPPED
+    return Validated(weight, height, age, gender, activity, body_fat, errors)
+
+
+def reject(chunk, errors):
+    """Return the :data:`Rejected` rows of a chunk of raw input columns."""
+    index = np.flatnonzero(errors)
+    values = {}
+    for name in ECHO_COLUMNS:
+        column = chunk.get(name)
+        picked = [""] * index.size if column is None else [column[i] for i in index.tolist()]
+        values[name] = ["" if value is None else str(value) for value in picked]
+    return Rejected(len(errors), index, errors[index], values)
+
+
+def describe_errors(errors):
+    """Return a :class:`LabelColumn` of ``"; "``-joined messages for error masks."""
+    masks, codes = np.unique(errors, return_inverse=True)
+    labels = np.array([
+        "; ".join(message for bit, message in enumerate(ERROR_MESSAGES) if int(mask) >> bit & 1)
+        for mask in masks.tolist()
+    ])
+    return LabelColumn(codes.reshape(-1), labels)
+
+
+def count_errors(errors):
+    """Return a ``Counter`` of rows failing each check, keyed by message."""
+    counts = Counter()
+    for bit, message in enumerate(ERROR_MESSAGES):
+        failed = int(np.count_nonzero(errors & (1 << bit)))
+        if failed:
+            counts[message] = failed
+    return counts
+
+
+class ErrorReport:
+    """Collects rejected rows as chunks are scored and streams them as CSV.
+
+    The report has the 1-based ``row`` of each rejected input row, its
+    ``errors`` and its :data:`ECHO_COLUMNS` as they were read. ``out`` is a
+    binary file, or None to only count.
+    """
+
+    def __init__(self, out=None):
+        self.out = out
+        self.rows = 0
+        self.rejected = 0
+        self.counts = Counter()
+
+    def add(self, rejected):
+        """Record the :data:`Rejected` rows of the next chunk."""
+        if rejected.index.size:
+            self.counts.update(count_errors(rejected.errors))
+            if self.out is not None:
+                columns = {"row": rejected.index + self.rows + 1, "errors": describe_errors(rejected.errors)}
+                columns.update((name, np.array(values, dtype=str)) for name, values in rejected.values.items())
+                self.out.write(batch_to_csv(columns, header=self.rejected == 0))
+        self.rows += rejected.rows
+        self.rejected += int(rejected.index.size)
+
+    def summary(self):
+        lines = [f"rejected {self.rejected:,} of {self.rows:,} rows"]
+        lines += [f"  {count:,} {message}" for message, count in self.counts.most_common()]
+        return "\n".join(lines)
@@ -1,13 +1,27 @@
-import streamlit as st 
-from PIL import Image
-import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-from streamlit_lottie import st_lottie
-import requests
-import json
+import atexit
 import time
-import base64
+
+import streamlit as st 
+
+# Only the pure-Python core is imported up front; plotly and streamlit_lottie
+# are imported where they are first rendered
+from bmi_calculator.calculations import ACTIVITY_LEVELS
+from bmi_calculator import profiling
+from bmi_calculator.assets import background_css
+from bmi_calculator.formulas import BMR_FORMULAS, CATEGORY_SYSTEMS
+from bmi_calculator.history import HistoryStore
+from bmi_calculator.lite import lite_enabled
+from bmi_calculator.lottie_cache import get_animation
+from bmi_calculator.result_cache import ResultCache, bundle_figure
+from bmi_calculator.units import (
+    IMPERIAL,
+    LB_TO_KG,
+    METRIC,
+    UNIT_SYSTEMS,
+    WEIGHT_UNITS,
+    display_weight,
+    to_si,
+)
 
 # Set page title and icon
 st.set_page_config(
@@ -16,13 +30,20 @@ st.set_page_config(
     layout="wide"
 )
 
-# Custom CSS for enhanced styling
-st.markdown(
-    """
+# Opt-in stage timings: BMI_PROFILE=1 for every session, or ?debug=1 for one
+debug_mode = st.query_params.get("debug") == "1"
+profile = profiling.start_run(enabled=profiling.ENABLED or debug_mode)
+
+# Lightweight rendering: BMI_LITE=1 for every session, or ?lite=1 for one
+lite_mode = lite_enabled(st.query_params.get("lite"))
+
+# Custom CSS for enhanced styling; the background image is self-hosted
+# (see bmi_calculator.assets) and filled in when the stylesheet is built,
+# as are the transitions and hover effects of MOTION_CSS outside lite mode
+PAGE_CSS = """
     <style>
     .stApp {
-        background-image: linear-gradient(rgba(0, 0, 0, 0.2), rgba(0, 0, 0, 0.2)),
-                        url('https://i.pinimg.com/736x/45/63/32/456332c909f732da36000118c44943ab.jpg');
+        __BACKGROUND__
         background-size: cover;
         background-position: center;
         background-attachment: fixed;
@@ -52,11 +73,6 @@ st.markdown(
         padding: 25px;
         box-shadow: 0 8px 16px rgba(0, 0, 0, 0.2);
         margin-bottom: 20px;
-        transition: transform 0.3s, box-shadow 0.3s;
-    }
-    .content-section:hover {
-        transform: translateY(-5px);
-        box-shadow: 0 12px 20px rgba(0, 0, 0, 0.3);
     }
     .stButton button {
         background: linear-gradient(90deg, #4CAF50 0%, #45a049 100%);
@@ -68,13 +84,11 @@ st.markdown(
         border: none;
         cursor: pointer;
         box-shadow: 0 4px 8px rgba(0, 0, 0, 0.2);
-        transition: all 0.3s ease;
     }
     .stButton button:hover {
         background: linear-gradient(90deg, #45a049 0%, #3d8a41 100%);
         color: white;
         box-shadow: 0 6px 12px rgba(0, 0, 0, 0.3);
-        transform: translateY(-2px);
     }
     .metric-card {
         background: rgba(255, 255, 255, 0.9);
@@ -82,13 +96,6 @@ st.markdown(
         padding: 20px;
         margin: 10px 0;
         box-shadow: 0 4px 8px rgba(0, 0, 0, 0.1);
-        transition: transform 0.3s;
-    }
-    .metric-card:hover {
-        transform: scale(1.02);
-    }
-    .stNumberInput {
-        transition: all 0.3s ease;
     }
     .stNumberInput:focus {
         box-shadow: 0 0 10px rgba(76, 175, 80, 0.5);
@@ -133,24 +140,80 @@ st.markdown(
         padding: 15px;
         margin: 15px 0;
     }
+    __MOTION__
     </style>
-    """,
-    unsafe_allow_html=True,
-)
+    """
+
+MOTION_CSS = """
+    .content-section {
+        transition: transform 0.3s, box-shadow 0.3s;
+    }
+    .content-section:hover {
+        transform: translateY(-5px);
+        box-shadow: 0 12px 20px rgba(0, 0, 0, 0.3);
+    }
+    .stButton button {
+        transition: all 0.3s ease;
+    }
+    .stButton button:hover {
+        transform: translateY(-2px);
+    }
+    .metric-card {
+        transition: transform 0.3s;
+    }
+    .metric-card:hover {
+        transform: scale(1.02);
+    }
+    .stNumberInput {
+        transition: all 0.3s ease;
+    }
+"""
+
+# Built once per server process. Streamlit drops any element a rerun does not
+# emit again, so the style block itself is re-sent, but it no longer carries
+# or points at a remote image
+@st.cache_resource
+def get_page_css(lite=False):
+    motion = "" if lite else MOTION_CSS.strip()
+    return PAGE_CSS.replace("__BACKGROUND__", background_css()).replace("__MOTION__", motion)
 
-# Load Lottie animation function
-def load_lottieurl(url: str):
-    try:
-        r = requests.get(url)
-        if r.status_code != 200:
-            return None
-        return r.json()
-    except:
-        return None
+st.markdown(get_page_css(lite_mode), unsafe_allow_html=True)
+if lite_mode:
+    profiling.record_payload("css", len(get_page_css()), len(get_page_css(lite=True)))
+profiling.checkpoint("css")
 
-# Load animations
-health_animation = load_lottieurl("https://assets4.lottiefiles.com/packages/lf20_5njp3vgg.json")
-weight_animation = load_lottieurl("https://assets1.lottiefiles.com/packages/lf20_Xf9mNu.json")
+# One result cache for the whole server, shared by every session
+@st.cache_resource
+def get_result_cache():
+    return ResultCache(maxsize=2048)
+
+# One pooled, batching history store for the whole server; queued rows
+# are written when the server shuts down
+@st.cache_resource
+def get_history_store():
+    store = HistoryStore()
+    atexit.register(store.close)
+    return store
+
+HISTORY_WINDOWS = {"Last 30 days": 30, "Last 90 days": 90, "Last year": 365, "All time": None}
+
+HEALTH_ANIMATION_URL = "https://assets4.lottiefiles.com/packages/lf20_5njp3vgg.json"
+WEIGHT_ANIMATION_URL = "https://assets1.lottiefiles.com/packages/lf20_Xf9mNu.json"
+
+# Load animations from the local cache; missing or stale entries are refreshed
+# in the background, so a cold cache renders without them on the first run.
+# Lite mode shows neither
+if lite_mode:
+    health_animation = weight_animation = None
+    if profile is not None:
+        import json
+        for name, url in (("health_animation", HEALTH_ANIMATION_URL), ("weight_animation", WEIGHT_ANIMATION_URL)):
+            animation = get_animation(url)
+            profiling.record_payload(name, len(json.dumps(animation)) if animation else 0, 0)
+else:
+    health_animation = get_animation(HEALTH_ANIMATION_URL)
+    weight_animation = get_animation(WEIGHT_ANIMATION_URL)
+profiling.checkpoint("lottie_cache")
 
 # Title and description with custom styling
 st.markdown("<h1 class='title-text'>⚖️ Advanced BMI Calculator</h1>", unsafe_allow_html=True)
@@ -162,6 +225,7 @@ col1, col2 = st.columns([1, 1])
 with col1:
     # Animation
     if health_animation:
+        from streamlit_lottie import st_lottie
         st_lottie(health_animation, height=350, key="health")
     
     # Unit selection with improved styling
@@ -169,7 +233,7 @@ with col1:
     st.subheader("📏 Choose Your Unit System")
     unit = st.selectbox(
         "Select measurement system:",
-        ("Metric (kg, cm)", "Imperial (lbs, inches)", "Mixed (kg, feet/inches)")
+        UNIT_SYSTEMS
     )
     st.markdown("</div>", unsafe_allow_html=True)
     
@@ -177,16 +241,13 @@ with col1:
     st.markdown("<div class='content-section'>", unsafe_allow_html=True)
     st.subheader("📊 Enter Your Measurements")
     
-    if unit == "Metric (kg, cm)":
+    if unit == METRIC:
         weight = st.number_input("Weight (kg)", min_value=1.0, max_value=300.0, value=70.0, step=0.1, key="weight_kg")
         height = st.number_input("Height (cm)", min_value=50.0, max_value=250.0, value=170.0, step=0.1, key="height_cm")
-        height_in_meters = height / 100
         
-    elif unit == "Imperial (lbs, inches)":
+    elif unit == IMPERIAL:
         weight = st.number_input("Weight (lbs)", min_value=1.0, max_value=700.0, value=154.0, step=0.1, key="weight_lbs")
         height = st.number_input("Height (inches)", min_value=20.0, max_value=100.0, value=67.0, step=0.1, key="height_in")
-        weight = weight * 0.453592  # Convert lbs to kg
-        height_in_meters = height * 0.0254  # Convert inches to meters
         
     else:  # Mixed
         weight = st.number_input("Weight (kg)", min_value=1.0, max_value=300.0, value=70.0, step=0.1, key="weight_kg_mixed")
@@ -195,7 +256,10 @@ with col1:
             feet = st.number_input("Feet", min_value=1, max_value=8, value=5, step=1)
         with col_in:
             inches = st.number_input("Inches", min_value=0, max_value=11, value=7, step=1)
-        height_in_meters = (feet * 30.48 + inches * 2.54) / 100
+        height = (feet, inches)
+    
+    # Everything below works in kg and m
+    weight, height_in_meters = to_si(unit, weight, height)
     
     # Additional metrics
     age = st.slider("Age", min_value=2, max_value=120, value=30, step=1)
@@ -204,312 +268,226 @@ with col1:
     # Activity level
     activity_level = st.select_slider(
         "Activity Level",
-        options=["Sedentary", "Lightly Active", "Moderately Active", "Very Active", "Extremely Active"],
+        options=ACTIVITY_LEVELS,
         value="Moderately Active"
     )
+    
+    # Formula choices; the CDC percentiles are only offered once their table is installed
+    with st.expander("⚙️ Formulas"):
+        bmr_formula = st.selectbox(
+            "BMR equation",
+            list(BMR_FORMULAS),
+            format_func=lambda name: BMR_FORMULAS[name].label,
+            key="bmr_formula",
+        )
+        body_fat = None
+        if BMR_FORMULAS[bmr_formula].needs_body_fat:
+            body_fat = st.number_input("Body fat (%)", min_value=2.0, max_value=70.0, value=25.0, step=0.5, key="body_fat")
+        category_system = st.selectbox(
+            "BMI categories",
+            [name for name, system in CATEGORY_SYSTEMS.items() if system.available()],
+            format_func=lambda name: CATEGORY_SYSTEMS[name].label,
+            key="category_system",
+        )
+    
+    # Optional profile name; results are only saved to the history when it is set.
+    # The name is the only key to the history, so it is never taken from the URL
+    profile_name = st.text_input(
+        "Profile name (optional, saves your history)",
+        key="profile_name",
+        help="Anyone who enters the same name sees the same history.",
+    ).strip()
+    st.caption(
+        "Profile names are not private: anyone who types your profile name can see its "
+        "history. Pick a name nobody else would guess, and leave it empty to save nothing."
+    )
     st.markdown("</div>", unsafe_allow_html=True)
+profiling.checkpoint("inputs")
 
 with col2:
     # Weight animation
     if weight_animation:
+        from streamlit_lottie import st_lottie
         st_lottie(weight_animation, height=300, key="weight")
     
-    # Calculate BMI function
-    def calculate_bmi(weight, height):
-        bmi = weight / (height ** 2)
-        return round(bmi, 2)
-    
-    # BMI Categories
-    def get_bmi_category(bmi):
-        if bmi < 18.5:
-            return "Underweight", "#3366cc", "Your BMI indicates you're underweight. This may suggest insufficient calorie intake or other health issues."
-        elif 18.5 <= bmi < 25:
-            return "Normal Weight", "#4CAF50", "Your BMI is within the normal range. Keep maintaining a balanced diet and regular exercise."
-        elif 25 <= bmi < 30:
-            return "Overweight", "#ff9800", "Your BMI indicates you're overweight. Consider focusing on healthy dietary changes and increasing physical activity."
-        elif 30 <= bmi < 35:
-            return "Obese (Class I)", "#f44336", "Your BMI indicates Class I obesity. Consider consulting a healthcare professional for personalized advice."
-        elif 35 <= bmi < 40:
-            return "Obese (Class II)", "#e91e63", "Your BMI indicates Class II obesity. It's recommended to consult with healthcare professionals for a tailored weight management plan."
-        else:
-            return "Obese (Class III)", "#9c27b0", "Your BMI indicates Class III obesity. Please consult with healthcare professionals for medical guidance and support."
-    
-    # Calculate BMR (Basal Metabolic Rate)
-    def calculate_bmr(weight, height_in_meters, age, gender):
-        if gender == "Male":
-            bmr = 88.362 + (13.397 * weight) + (4.799 * height_in_meters * 100) - (5.677 * age)
-        else:
-            bmr = 447.593 + (9.247 * weight) + (3.098 * height_in_meters * 100) - (4.330 * age)
-        return round(bmr)
-    
-    # Calculate daily calorie needs
-    def calculate_calories(bmr, activity):
-        activity_factors = {
-            "Sedentary": 1.2,
-            "Lightly Active": 1.375,
-            "Moderately Active": 1.55,
-            "Very Active": 1.725,
-            "Extremely Active": 1.9
-        }
-        return round(bmr * activity_factors[activity])
-    
-    # Calculate ideal weight range
-    def calculate_ideal_weight(height_in_meters, gender):
-        if gender == "Male":
-            lower = round(18.5 * (height_in_meters ** 2), 1)
-            upper = round(24.9 * (height_in_meters ** 2), 1)
-        else:
-            lower = round(18.5 * (height_in_meters ** 2), 1)
-            upper = round(24.9 * (height_in_meters ** 2), 1)
-        return lower, upper
-    
-    # Create BMI scale visualization with Plotly
-    def create_bmi_gauge(bmi_value):
-        fig = go.Figure(go.Indicator(
-            mode = "gauge+number",
-            value = bmi_value,
-            domain = {'x': [0, 1], 'y': [0, 1]},
-            title = {'text': "BMI Scale"},
-            gauge = {
-                'axis': {'range': [10, 50], 'tickwidth': 1, 'tickcolor': "darkblue"},
-                'bar': {'color': "darkblue"},
-                'bgcolor': "white",
-                'borderwidth': 2,
-                'bordercolor': "gray",
-                'steps': [
-                    {'range': [10, 18.5], 'color': '#3366cc'},
-                    {'range': [18.5, 25], 'color': '#4CAF50'},
-                    {'range': [25, 30], 'color': '#ff9800'},
-                    {'range': [30, 35], 'color': '#f44336'},
-                    {'range': [35, 40], 'color': '#e91e63'},
-                    {'range': [40, 50], 'color': '#9c27b0'}],
-                'threshold': {
-                    'line': {'color': "white", 'width': 6},
-                    'thickness': 0.75,
-                    'value': bmi_value}
-            }
-        ))
-        
-        fig.update_layout(
-            height=300,
-            margin=dict(l=20, r=20, t=50, b=20),
-            paper_bgcolor="rgba(0,0,0,0)",
-            font=dict(color="white")
-        )
-        
-        return fig
+    profiling.checkpoint("weight_animation")
     
     # Button to calculate with loading animation
     st.markdown("<div class='content-section'>", unsafe_allow_html=True)
     if st.button("📊 Calculate Health Metrics"):
-        with st.spinner("Calculating your health metrics..."):
-            # Add a small delay to show the spinner
-            time.sleep(1)
-            
-            # Calculate BMI
-            bmi = calculate_bmi(weight, height_in_meters)
-            category, color, description = get_bmi_category(bmi)
-            
-            # Calculate BMR and daily calorie needs
-            bmr = calculate_bmr(weight, height_in_meters, age, gender)
-            daily_calories = calculate_calories(bmr, activity_level)
-            
-            # Calculate ideal weight range
-            lower_weight, upper_weight = calculate_ideal_weight(height_in_meters, gender)
-            
-            # Display results
-            st.success("Calculations complete!")
-            
-            st.markdown("<div class='results-section'>", unsafe_allow_html=True)
-            st.subheader("🔍 Your BMI Results")
-            
-            # Display BMI with large font
-            st.markdown(f"<h1 style='font-size:60px; color:{color};'>{bmi}</h1>", unsafe_allow_html=True)
-            
-            # Display category with styling
-            st.markdown(f"<div class='bmi-category' style='background-color:{color}; color:white;'>{category}</div>", unsafe_allow_html=True)
-            
-            # Description
-            st.markdown(f"<p style='font-size:18px;'>{description}</p>", unsafe_allow_html=True)
-            
-            # Visual feedback with Plotly gauge chart
-            st.markdown("<div class='plotly-container'>", unsafe_allow_html=True)
-            fig = create_bmi_gauge(bmi)
-            st.plotly_chart(fig, use_container_width=True)
-            st.markdown("</div>", unsafe_allow_html=True)
-            
-            # Additional health metrics
-            st.subheader("📈 Additional Health Insights")
-            
-            # Create three columns for metrics
-            col_a, col_b, col_c = st.columns(3)
-            
-            with col_a:
-                st.markdown("<div class='metric-card'>", unsafe_allow_html=True)
-                st.markdown("<h3 style='text-align:center;'>BMR</h3>", unsafe_allow_html=True)
-                st.markdown(f"<h2 style='text-align:center;'>{bmr} kcal/day</h2>", unsafe_allow_html=True)
-                st.markdown("<p style='text-align:center;'>Calories your body needs at rest</p>", unsafe_allow_html=True)
-                st.markdown("</div>", unsafe_allow_html=True)
-            
-            with col_b:
-                st.markdown("<div class='metric-card'>", unsafe_allow_html=True)
-                st.markdown("<h3 style='text-align:center;'>Daily Calories</h3>", unsafe_allow_html=True)
-                st.markdown(f"<h2 style='text-align:center;'>{daily_calories} kcal/day</h2>", unsafe_allow_html=True)
-                st.markdown("<p style='text-align:center;'>Calories to maintain current weight</p>", unsafe_allow_html=True)
-                st.markdown("</div>", unsafe_allow_html=True)
-            
-            with col_c:
-                st.markdown("<div class='metric-card'>", unsafe_allow_html=True)
-                st.markdown("<h3 style='text-align:center;'>Ideal Weight Range</h3>", unsafe_allow_html=True)
-                
-                if unit == "Metric (kg, cm)":
-                    st.markdown(f"<h2 style='text-align:center;'>{lower_weight} - {upper_weight} kg</h2>", unsafe_allow_html=True)
-                elif unit == "Imperial (lbs, inches)":
-                    lower_lbs = round(lower_weight / 0.453592, 1)
-                    upper_lbs = round(upper_weight / 0.453592, 1)
-                    st.markdown(f"<h2 style='text-align:center;'>{lower_lbs} - {upper_lbs} lbs</h2>", unsafe_allow_html=True)
-                else:
-                    st.markdown(f"<h2 style='text-align:center;'>{lower_weight} - {upper_weight} kg</h2>", unsafe_allow_html=True)
-            
-            st.markdown("<p style='text-align:center;'>Healthy weight range for your height</p>", unsafe_allow_html=True)
-            st.markdown("</div>", unsafe_allow_html=True)
+        # Compute everything up front (or reuse the bundle for identical
+        # inputs); rendering below never waits on arithmetic
+        with profiling.span("compute"):
+            bundle = get_result_cache().get(
+                weight, height_in_meters, age, gender, activity_level, bmr_formula, category_system, body_fat
+            )
+        metrics = bundle["metrics"]
+        # Every result feeds the population counts; only named ones are saved
+        if profile_name:
+            get_history_store().record(profile_name, metrics)
+        else:
+            get_history_store().tally(metrics)
         
-        # Personalized health tips
-        st.subheader("💡 Personalized Health Tips")
+        # Display results
+        st.success("Calculations complete!")
         
-        if category == "Underweight":
-            st.markdown("<div class='health-tip' style='background-color:rgba(51, 102, 204, 0.1); border-left:5px solid #3366cc;'>", unsafe_allow_html=True)
-            st.markdown("""
-            <ul>
-                <li>Consider increasing your calorie intake with nutrient-dense foods</li>
-                <li>Include healthy fats like avocados, nuts, and olive oil in your diet</li>
-                <li>Incorporate strength training to build muscle mass</li>
-                <li>Consult with a healthcare provider or dietitian for personalized advice</li>
-            </ul>
-            """, unsafe_allow_html=True)
-            st.markdown("</div>", unsafe_allow_html=True)
+        st.markdown("<div class='results-section'>", unsafe_allow_html=True)
+        st.subheader("🔍 Your BMI Results")
         
-        elif category == "Normal Weight":
-            st.markdown("<div class='health-tip' style='background-color:rgba(76, 175, 80, 0.1); border-left:5px solid #4CAF50;'>", unsafe_allow_html=True)
-            st.markdown("""
-            <ul>
-                <li>Maintain your balanced diet and regular exercise routine</li>
-                <li>Aim for 150 minutes of moderate exercise per week</li>
-                <li>Stay hydrated and get adequate sleep</li>
-                <li>Continue regular health check-ups</li>
-            </ul>
-            """, unsafe_allow_html=True)
-            st.markdown("</div>", unsafe_allow_html=True)
+        # Display BMI with large font
+        st.markdown(f"<h1 style='font-size:60px; color:{metrics.color};'>{metrics.bmi}</h1>", unsafe_allow_html=True)
         
-        elif category == "Overweight":
-            st.markdown("<div class='health-tip' style='background-color:rgba(255, 152, 0, 0.1); border-left:5px solid #ff9800;'>", unsafe_allow_html=True)
-            st.markdown("""
-            <ul>
-                <li>Focus on portion control and mindful eating</li>
-                <li>Increase physical activity gradually (aim for 30 minutes daily)</li>
-                <li>Reduce processed foods and added sugars</li>
-                <li>Consider consulting a healthcare provider for personalized advice</li>
-            </ul>
-            """, unsafe_allow_html=True)
+        # Display category with styling
+        st.markdown(f"<div class='bmi-category' style='background-color:{metrics.color}; color:white;'>{metrics.category}</div>", unsafe_allow_html=True)
+        
+        # Description
+        st.markdown(f"<p style='font-size:18px;'>{metrics.description}</p>", unsafe_allow_html=True)
+        
+        # Visual feedback with Plotly gauge chart
+        st.markdown("<div class='plotly-container'>", unsafe_allow_html=True)
+        # Reserve the gauge's slot; the figure is filled in once the text has rendered
+        gauge_slot = st.empty()
+        st.markdown("</div>", unsafe_allow_html=True)
+        
+        # Additional health metrics
+        st.subheader("📈 Additional Health Insights")
+        
+        # Create three columns for metrics
+        col_a, col_b, col_c = st.columns(3)
+        
+        with col_a:
+            st.markdown("<div class='metric-card'>", unsafe_allow_html=True)
+            st.markdown("<h3 style='text-align:center;'>BMR</h3>", unsafe_allow_html=True)
+            st.markdown(f"<h2 style='text-align:center;'>{metrics.bmr} kcal/day</h2>", unsafe_allow_html=True)
+            st.markdown("<p style='text-align:center;'>Calories your body needs at rest</p>", unsafe_allow_html=True)
             st.markdown("</div>", unsafe_allow_html=True)
         
-        else:  # Obese categories
-            st.markdown("<div class='health-tip' style='background-color:rgba(244, 67, 54, 0.1); border-left:5px solid #f44336;'>", unsafe_allow_html=True)
-            st.markdown("""
-            <ul>
-                <li>Consult with healthcare professionals for a comprehensive weight management plan</li>
-                <li>Consider working with a registered dietitian for personalized nutrition guidance</li>
-                <li>Start with gentle, low-impact exercises like walking or swimming</li>
-                <li>Focus on sustainable lifestyle changes rather than quick fixes</li>
-                <li>Monitor other health metrics like blood pressure and cholesterol</li>
-            </ul>
-            """, unsafe_allow_html=True)
+        with col_b:
+            st.markdown("<div class='metric-card'>", unsafe_allow_html=True)
+            st.markdown("<h3 style='text-align:center;'>Daily Calories</h3>", unsafe_allow_html=True)
+            st.markdown(f"<h2 style='text-align:center;'>{metrics.daily_calories} kcal/day</h2>", unsafe_allow_html=True)
+            st.markdown("<p style='text-align:center;'>Calories to maintain current weight</p>", unsafe_allow_html=True)
             st.markdown("</div>", unsafe_allow_html=True)
         
+        with col_c:
+            st.markdown("<div class='metric-card'>", unsafe_allow_html=True)
+            st.markdown("<h3 style='text-align:center;'>Ideal Weight Range</h3>", unsafe_allow_html=True)
+            
+            # In the unit the weight was entered in
+            lower, upper = display_weight(metrics.lower_weight, unit), display_weight(metrics.upper_weight, unit)
+            st.markdown(f"<h2 style='text-align:center;'>{lower} - {upper} {WEIGHT_UNITS[unit]}</h2>", unsafe_allow_html=True)
+        
+        st.markdown("<p style='text-align:center;'>Healthy weight range for your height</p>", unsafe_allow_html=True)
+        st.markdown("</div>", unsafe_allow_html=True)
+
+        # Personalized health tips
+        st.subheader("💡 Personalized Health Tips")
+        
+        background, accent, tips = bundle["tips"]
+        st.markdown(f"<div class='health-tip' style='background-color:{background}; border-left:5px solid {accent};'>", unsafe_allow_html=True)
+        st.markdown("<ul>" + "".join(f"<li>{tip}</li>" for tip in tips) + "</ul>", unsafe_allow_html=True)
+        st.markdown("</div>", unsafe_allow_html=True)
+        
         # Weight management plan
         st.subheader("🗓️ Weight Management Plan")
         
-        # Weight goal
-        if category == "Underweight":
-            goal = "gain"
-            calories_change = 500
-        elif category in ["Normal Weight"]:
-            goal = "maintain"
-            calories_change = 0
-        else:
-            goal = "lose"
-            calories_change = -500
-        
-        if goal != "maintain":
-            target_calories = daily_calories + calories_change
+        if metrics.goal != "maintain":
+            target_calories = metrics.daily_calories + metrics.calories_change
             st.markdown(f"""
             <div style='background-color:rgba(33, 150, 243, 0.1); padding:15px; border-radius:8px; margin-top:10px;'>
-                <h4>Recommended daily calorie intake to {goal} weight:</h4>
+                <h4>Recommended daily calorie intake to {metrics.goal} weight:</h4>
                 <h2 style='text-align:center;'>{target_calories} kcal/day</h2>
-                <p>This would result in approximately {abs(calories_change/500)} lb ({abs(calories_change/500 * 0.453592):.1f} kg) {goal} per week.</p>
+                <p>This would result in approximately {abs(metrics.calories_change/500)} lb ({abs(metrics.calories_change/500 * LB_TO_KG):.1f} kg) {metrics.goal} per week.</p>
             </div>
             """, unsafe_allow_html=True)
         
-        # Create a weight projection chart
-        if goal != "maintain":
-            weeks = list(range(0, 13))  # 12 weeks projection
-            if goal == "lose":
-                current_weight_kg = weight
-                projected_weights = [current_weight_kg + (i * (calories_change/500 * 0.453592)) for i in range(0, 13)]
-                title = "12-Week Weight Loss Projection"
-            else:
-                current_weight_kg = weight
-                projected_weights = [current_weight_kg + (i * abs(calories_change/500 * 0.453592)) for i in range(0, 13)]
-                title = "12-Week Weight Gain Projection"
-            
-            # Create the plot with Plotly Express
-            fig = px.line(
-                x=weeks,
-                y=projected_weights,
-                labels={'x': 'Weeks', 'y': 'Weight (kg)'},
-                title=title
-            )
-            
-            # Customize the plot
-            fig.update_traces(line=dict(color=color, width=3))
-            fig.update_layout(
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                xaxis=dict(showgrid=True, gridcolor='lightgray'),
-                yaxis=dict(showgrid=True, gridcolor='lightgray'),
-                hovermode="x"
-            )
-            
-            # Display the plot
-            st.plotly_chart(fig, use_container_width=True)
+        # Reserve the projection chart's slot below the plan
+        projection_slot = st.empty()
+        profiling.checkpoint("results_markdown")
         
-        # Download button for report
+        # Download buttons for the report and the raw metrics; the bytes are
+        # encoded once per bundle
         st.download_button(
             label="📥 Download Health Report",
-            data=f"""
-            BMI HEALTH REPORT
-            -----------------
-            Date: {time.strftime("%Y-%m-%d")}
-            
-            MEASUREMENTS
-            Height: {height_in_meters*100:.1f} cm
-            Weight: {weight:.1f} kg
-            BMI: {bmi}
-            Category: {category}
-            
-            HEALTH METRICS
-            BMR: {bmr} kcal/day
-            Daily Calorie Needs: {daily_calories} kcal/day
-            Ideal Weight Range: {lower_weight} - {upper_weight} kg
-            
-            RECOMMENDATIONS
-            {description}
-            """,
+            data=bundle["report"],
             file_name="bmi_health_report.txt",
             mime="text/plain",
         )
+        col_csv, col_json = st.columns(2)
+        with col_csv:
+            st.download_button("📄 Download CSV", data=bundle["csv"], file_name="bmi_metrics.csv", mime="text/csv")
+        with col_json:
+            st.download_button("🧾 Download JSON", data=bundle["json"], file_name="bmi_metrics.json", mime="application/json")
+        profiling.checkpoint("report")
+        
+        # Charts are the slowest part to build, so they render last into
+        # the slots reserved above; lite mode draws them as static SVG
+        if lite_mode:
+            from bmi_calculator.lite import gauge_svg, projection_svg
+            with profiling.span("gauge_svg"):
+                gauge = bundle_figure(bundle, "gauge_svg", lambda: gauge_svg(metrics.bmi))
+                gauge_slot.html(gauge)
+            if metrics.goal != "maintain":
+                with profiling.span("projection_svg"):
+                    projection = bundle_figure(
+                        bundle, "projection_svg", lambda: projection_svg(
+                            *metrics.inputs, metrics.goal, metrics.calories_change, metrics.color,
+                            bmr_formula=bmr_formula, body_fat=body_fat,
+                        )
+                    )
+                    projection_slot.html(projection)
+            if profile is not None:
+                # Sizing the Plotly figures lite mode replaced means building them
+                from bmi_calculator.figures import create_bmi_gauge, create_projection_chart
+                profiling.record_payload("gauge", len(create_bmi_gauge(metrics.bmi).to_json()), len(gauge))
+                if metrics.goal != "maintain":
+                    full = create_projection_chart(
+                        *metrics.inputs, metrics.goal, metrics.calories_change, metrics.color,
+                        bmr_formula=bmr_formula, body_fat=body_fat,
+                    )
+                    profiling.record_payload("projection", len(full.to_json()), len(projection))
+        else:
+            from bmi_calculator.figures import create_bmi_gauge, create_projection_chart
+            with profiling.span("gauge_figure"):
+                gauge = bundle_figure(bundle, "gauge", lambda: create_bmi_gauge(metrics.bmi))
+                gauge_slot.plotly_chart(gauge, use_container_width=True)
+            profiling.record_figure("gauge", gauge)
+            
+            # Create a weight projection chart
+            if metrics.goal != "maintain":
+                with profiling.span("projection_figure"):
+                    projection = bundle_figure(
+                        bundle, "projection", lambda: create_projection_chart(
+                            *metrics.inputs, metrics.goal, metrics.calories_change, metrics.color,
+                            bmr_formula=bmr_formula, body_fat=body_fat,
+                        )
+                    )
+                    projection_slot.plotly_chart(projection, use_container_width=True)
+                profiling.record_figure("projection", projection)
         
         st.markdown("</div>", unsafe_allow_html=True)
+    
+    # History for the named profile, reading only the selected window
+    if profile_name:
+        st.markdown("<div class='content-section'>", unsafe_allow_html=True)
+        st.subheader("📅 Your History")
+        window = st.selectbox("Show", list(HISTORY_WINDOWS), key="history_window")
+        days = HISTORY_WINDOWS[window]
+        with profiling.span("history_query"):
+            start = None if days is None else time.time() - days * 24 * 60 * 60
+            history = get_history_store().query(profile_name, start=start)
+        if history["recorded_at"] and lite_mode:
+            import datetime
+            with profiling.span("history_chart"):
+                when = [datetime.datetime.fromtimestamp(t) for t in history["recorded_at"]]
+                st.line_chart({"Date": when, "BMI": history["bmi"]}, x="Date", y="BMI")
+        elif history["recorded_at"]:
+            from bmi_calculator.figures import create_history_chart
+            with profiling.span("history_figure"):
+                st.plotly_chart(create_history_chart(history), use_container_width=True)
+        else:
+            st.markdown("<p>No saved results in this window yet.</p>", unsafe_allow_html=True)
+        st.markdown("</div>", unsafe_allow_html=True)
 
 st.markdown("</div>", unsafe_allow_html=True)
 st.markdown("<div class='footer'>", unsafe_allow_html=True)
@@ -525,3 +503,31 @@ st.markdown("""
             <h4>⚠️ Disclaimer</h4> 
             <p>This BMI Calculator is for informational purposes only and not a substitute for professional medical advice. Always consult with a healthcare professional before making any health-related decisions.</p>
              </div> """, unsafe_allow_html=True)
+profiling.checkpoint("footer")
+
+# Hidden debug panel with this rerun's profile; totals go to a local
+# Prometheus text file so releases can be compared
+if profile is not None:
+    profiling.finish_run()
+    extra = {f"bmi_result_cache_{name}": value for name, value in get_result_cache().stats().items()}
+    metrics_path = profiling.write_prometheus(extra=extra)
+    if debug_mode:
+        with st.expander("🛠️ Debug: rerun profile"):
+            st.markdown(f"**Total:** {profile.total_seconds * 1000:.1f} ms")
+            st.table({
+                "stage": [stage for stage, _ in profile.spans],
+                "ms": [round(seconds * 1000, 2) for _, seconds in profile.spans],
+            })
+            if profile.figures:
+                st.markdown("**Figure JSON size:** " + ", ".join(f"{name}: {size:,} bytes" for name, size in profile.figures))
+            if profile.payload:
+                saved = sum(full - lite for _, full, lite in profile.payload)
+                st.markdown(f"**Lite mode saved:** {saved:,} bytes")
+                st.table({
+                    "element": [element for element, _, _ in profile.payload],
+                    "full bytes": [full for _, full, _ in profile.payload],
+                    "lite bytes": [lite for _, _, lite in profile.payload],
+                })
+            st.json(extra)
+            st.caption(f"Prometheus metrics written to {metrics_path}")
+            st.code(profiling.render_prometheus(extra), language="text")
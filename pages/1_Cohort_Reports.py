@@ -0,0 +1,37 @@
+import streamlit as st
+
+from bmi_calculator.cli import score_to_bytes
+from bmi_calculator.exports import FORMATS, parquet_available
+from bmi_calculator.units import BULK_UNIT_FACTORS
+
+st.title("Cohort Reports")
+st.write(
+    "Upload a CSV or Parquet roster with weight, height, age, gender and activity "
+    "columns to download a scored report for the whole cohort. Rows with missing "
+    "or implausible values are left out; `python -m bmi_calculator --errors` lists them."
+)
+
+roster = st.file_uploader("Roster", type=["csv", "parquet"])
+units = st.selectbox("Units", sorted(BULK_UNIT_FACTORS), help="metric: kg and cm, imperial: lbs and inches")
+formats = [fmt for fmt in FORMATS if fmt != "parquet" or parquet_available()]
+fmt = st.selectbox("Format", formats, format_func=str.upper)
+
+
+def build_report():
+    # Runs only when the button is clicked. The report is streamed chunk by
+    # chunk, but Streamlit needs the finished file as bytes to serve it; very
+    # large cohorts are better scored with ``python -m bmi_calculator``,
+    # which writes straight to disk.
+    roster.seek(0)
+    return score_to_bytes(roster, units, fmt)
+
+
+if roster is not None:
+    media_type, extension, _ = FORMATS[fmt]
+    stem = roster.name.rsplit(".", 1)[0]
+    st.download_button(
+        "📥 Download Cohort Report",
+        data=build_report,
+        file_name=f"{stem}_report{extension}",
+        mime=media_type,
+    )
@@ -0,0 +1,59 @@
+import streamlit as st
+
+from bmi_calculator.calculations import BMI_CATEGORIES, GENDERS
+from bmi_calculator.figures import create_category_shares_chart, create_population_histogram
+from bmi_calculator.history import HistoryStore
+from bmi_calculator.lite import lite_enabled
+from bmi_calculator.population import BMI_BIN_WIDTH
+
+st.title("Population")
+st.write(
+    "How every result calculated in the app is distributed. The charts are drawn "
+    "from counts kept up to date as results are saved, so they stay quick however "
+    "many results there are; new results show up within a second or so."
+)
+
+
+# Counts are read through this page's own store; the app's store writes them
+@st.cache_resource
+def get_history_store():
+    return HistoryStore()
+
+
+lite_mode = lite_enabled(st.query_params.get("lite"))
+population = get_history_store().population()
+
+if not population.total:
+    st.info("No results yet. Calculate a result on the main page to start the counts.")
+    st.stop()
+
+gender = st.selectbox("Gender", ["All", *GENDERS])
+selected = None if gender == "All" else gender
+
+edges, counts, below, above = population.bmi_histogram(selected)
+st.subheader("BMI distribution")
+if lite_mode:
+    st.bar_chart({"BMI": (edges + BMI_BIN_WIDTH / 2).tolist(), "Results": counts.tolist()}, x="BMI", y="Results")
+else:
+    st.plotly_chart(create_population_histogram(edges, counts, BMI_BIN_WIDTH), use_container_width=True)
+if below or above:
+    st.caption(f"Not shown: {below:,} results below BMI {edges[0]:g} and {above:,} above {edges[-1] + BMI_BIN_WIDTH:g}.")
+
+st.subheader("Daily calorie needs")
+percentiles = population.calorie_percentiles(gender=selected)
+for column, (p, calories) in zip(st.columns(len(percentiles)), percentiles.items()):
+    column.metric(f"{p}th percentile", "-" if calories is None else f"{calories:,} kcal")
+
+st.subheader("Categories")
+groups = {"Age band": "age", "Gender": "gender", "Activity level": "activity"}
+label = st.radio("By", list(groups), horizontal=True)
+keys, shares = population.category_shares(groups[label])
+if lite_mode:
+    data = {label: keys}
+    data.update((name, shares[:, code].tolist()) for code, (name, _, _) in enumerate(BMI_CATEGORIES))
+    st.bar_chart(
+        data, x=label, y=[name for name, _, _ in BMI_CATEGORIES], color=[color for _, color, _ in BMI_CATEGORIES]
+    )
+else:
+    st.plotly_chart(create_category_shares_chart(keys, shares, f"BMI Categories by {label}"), use_container_width=True)
+st.caption(f"{population.total:,} results in total.")
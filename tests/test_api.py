@@ -0,0 +1,95 @@
+import asyncio
+import json
+
+import pytest
+
+from bmi_calculator import api
+from bmi_calculator.calculations import compute_health_metrics
+
+PERSON = {"weight": 70, "height": 175, "age": 30, "gender": "Male", "activity": "Sedentary"}
+
+
+def post(path, payload):
+    body = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+    return asyncio.run(api.ScoringService()._dispatch("POST", path, body))
+
+
+def test_score_one_matches_the_app():
+    status, result = post("/v1/score", PERSON)
+    assert status == 200
+    expected = compute_health_metrics(70.0, 1.75, 30, "Male", "Sedentary")
+    assert result["bmi"] == expected.bmi and result["category"] == expected.category
+    assert result["daily_calories"] == expected.daily_calories
+
+
+def test_maintain_projection_does_not_drift():
+    status, result = post("/v1/score", PERSON)
+    assert status == 200 and result["goal"] == "maintain"
+    assert result["projection"]["weight_kg"] == [70.0] * (api.PROJECTION_WEEKS + 1)
+
+
+def test_imperial_units():
+    status, result = post("/v1/score", dict(PERSON, weight=154.324, height=68.898, units="imperial"))
+    assert status == 200 and result["bmi"] == 22.86
+
+
+@pytest.mark.parametrize("change, message", [
+    ({"age": 30.5}, "age must be a whole number of years"),
+    ({"weight": ""}, "weight is missing or not a number"),
+    ({"gender": "unknown"}, "gender must be one of"),
+    ({"weight": [70]}, "weight must be a number or a string"),
+    ({"units": ["metric"]}, "units must be one of"),
+    ({"bmr_formula": ["x"]}, "bmr_formula must be a string"),
+    ({"bmr_formula": "nope"}, "bmr formula must be one of"),
+    ({"categories": {"who": 1}}, "categories must be a string"),
+])
+def test_bad_input_is_a_400(change, message):
+    status, result = post("/v1/score", dict(PERSON, **change))
+    assert status == 400
+    assert message.lower() in result["error"].lower()
+
+
+def test_missing_field_and_bad_body_are_400s():
+    person = dict(PERSON)
+    del person["age"]
+    assert post("/v1/score", person)[0] == 400
+    assert post("/v1/score", b"[1, 2]")[0] == 400
+    assert post("/v1/score", b"{not json")[0] == 400
+
+
+def test_batch_names_the_bad_records():
+    status, result = post("/v1/score/batch", {"records": [PERSON, dict(PERSON, age=30.5), dict(PERSON, weight="")]})
+    assert status == 400
+    assert result["error"].startswith("record 1: age must be a whole number")
+    assert "record 2: weight is missing" in result["error"]
+
+
+def test_batch_scores_every_record():
+    records = [PERSON, dict(PERSON, weight=95, gender="Female", activity="Very Active")]
+    status, result = post("/v1/score/batch", {"records": records, "projection": True})
+    assert status == 200 and result["count"] == 2
+    assert [row["category"] for row in result["results"]] == ["Normal Weight", "Obese (Class I)"]
+    assert len(result["results"][1]["projection"]) == api.PROJECTION_WEEKS + 1
+
+
+def test_internal_errors_are_not_leaked(monkeypatch):
+    def broken(payload):
+        raise RuntimeError("secret detail")
+
+    monkeypatch.setattr(api, "score_one", broken)
+    status, result = post("/v1/score", PERSON)
+    assert status == 500
+    assert result == {"error": "internal server error"}
+
+
+@pytest.mark.parametrize("length", ["-5", "ten"])
+def test_bad_content_length_is_a_400(length):
+    async def read():
+        reader = asyncio.StreamReader()
+        reader.feed_data(f"POST /v1/score HTTP/1.1\r\nContent-Length: {length}\r\n\r\n{{}}".encode())
+        reader.feed_eof()
+        return await api.ScoringService()._read_request(reader)
+
+    with pytest.raises(api.BadRequest) as excinfo:
+        asyncio.run(read())
+    assert excinfo.value.status == 400
@@ -0,0 +1,51 @@
+import random
+
+import numpy as np
+import pytest
+
+from bmi_calculator import batch
+from bmi_calculator.calculations import ACTIVITY_LEVELS, BMI_CUTOFFS, GENDERS, compute_health_metrics
+
+
+def roster(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    return (
+        np.round(rng.uniform(20, 250, rows), 1),
+        rng.integers(500, 2501, rows) / 10 / 100,
+        rng.integers(2, 121, rows),
+        rng.choice(GENDERS, rows),
+        rng.choice(ACTIVITY_LEVELS, rows),
+    )
+
+
+def assert_rows_match(weight, height, age, gender, activity, **options):
+    metrics = batch.compute_batch(weight, height, age, gender, activity, **options)
+    for i in range(len(metrics)):
+        expected = compute_health_metrics(
+            float(weight[i]), float(height[i]), int(age[i]), str(gender[i]), str(activity[i]), **options
+        )
+        assert metrics[i] == expected, i
+
+
+def test_batch_equals_scalar():
+    assert_rows_match(*roster(5000))
+
+
+def test_batch_equals_scalar_at_category_cutoffs():
+    # Weights whose BMI lands on, or rounds onto, each cutoff
+    height = np.repeat(np.arange(1500, 2001, 7) / 10 / 100, len(BMI_CUTOFFS) * 3)
+    bmi = np.tile(np.repeat(BMI_CUTOFFS, 3) + np.tile([-0.004, 0.0, 0.004], len(BMI_CUTOFFS)), height.size // 15)
+    weight = bmi * height ** 2
+    rows = weight.size
+    assert_rows_match(weight, height, np.full(rows, 40), np.full(rows, "Female"), np.full(rows, "Sedentary"))
+
+
+@pytest.mark.parametrize("ndigits", [0, 1, 2])
+def test_round_like_python(ndigits):
+    rng = random.Random(ndigits)
+    # Many exact and near ties, where np.round and round() can disagree
+    values = [rng.randint(0, 10 ** 6) / 10 ** (ndigits + 1) + 0.5 / 10 ** ndigits for _ in range(20000)]
+    values += [rng.uniform(-1000, 1000) for _ in range(20000)]
+    rounded = batch.round_like_python(np.array(values), ndigits)
+    assert rounded.tolist() == [round(value, ndigits) for value in values]
+
@@ -0,0 +1,44 @@
+import csv
+import io
+
+from bmi_calculator import cli
+
+HEADER = b"weight,height,age,gender,activity,note\n"
+
+
+def run(tmp_path, data, *args):
+    source = tmp_path / "roster.csv"
+    source.write_bytes(data)
+    output, errors = tmp_path / "scored.csv", tmp_path / "errors.csv"
+    status = cli.main([str(source), str(output), "--errors", str(errors), "--workers", "1", *args])
+    read = lambda path: list(csv.DictReader(io.StringIO(path.read_text(encoding="utf-8"))))
+    return status, read(output), read(errors)
+
+
+def test_ragged_rows_are_rejected_not_fatal(tmp_path, capsys):
+    data = HEADER + b"70,175,30,Male,Sedentary,ok\n80,180,40\n65,170,50,Female,Very Active,x,extra\n"
+    status, scored, rejected = run(tmp_path, data)
+    assert not status
+    assert [row["weight"] for row in scored] == ["70", "65"]
+    assert [row["row"] for row in rejected] == ["2"]
+    assert "gender must be one of" in rejected[0]["errors"]
+    assert "rejected 1 of 3 rows" in capsys.readouterr().err
+
+
+def test_excel_byte_order_mark(tmp_path):
+    status, scored, _ = run(tmp_path, b"\xef\xbb\xbf" + HEADER + b"70,175,30,Male,Sedentary,ok\n")
+    assert not status and scored[0]["bmi"] == "22.86"
+
+
+def test_quoted_line_breaks_stay_in_one_chunk(tmp_path):
+    data = HEADER + b'70,175,30,Male,Sedentary,"two\nlines"\n80,180,40,Female,Sedentary,ok\n' * 3
+    status, scored, rejected = run(tmp_path, data, "--chunk-size", "1")
+    assert not status and not rejected
+    assert [row["weight"] for row in scored] == ["70", "80"] * 3
+
+
+def test_missing_columns_are_an_error(tmp_path, capsys):
+    source = tmp_path / "roster.csv"
+    source.write_bytes(b"weight,height\n70,175\n")
+    assert cli.main([str(source), str(tmp_path / "out.csv")])
+    assert "missing columns" in capsys.readouterr().err
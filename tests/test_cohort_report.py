@@ -0,0 +1,39 @@
+import csv
+import io
+import json
+
+import pytest
+
+from bmi_calculator.cli import score_to_bytes
+from bmi_calculator.exports import FORMATS, parquet_available
+from bmi_calculator.validation import ErrorReport
+
+ROSTER = (
+    b"weight,height,age,gender,activity\n"
+    b"70,175,30,Male,Sedentary\n"
+    b"58.5,162,45,Female,Very Active\n"
+    b",180,30,Male,Sedentary\n"
+    b"70,1.75,30,Male,Sedentary\n"
+)
+
+
+@pytest.mark.parametrize("fmt", [fmt for fmt in FORMATS if fmt != "parquet" or parquet_available()])
+def test_report_is_bytes(fmt):
+    data = score_to_bytes(io.BytesIO(ROSTER), "metric", fmt)
+    assert isinstance(data, bytes) and data
+
+
+def test_csv_report_leaves_out_bad_rows():
+    report = ErrorReport()
+    data = score_to_bytes(io.BytesIO(ROSTER), "metric", "csv", report=report)
+    rows = list(csv.DictReader(io.StringIO(data.decode())))
+    assert [row["weight"] for row in rows] == ["70", "58.5"]
+    assert rows[0]["bmi"] == "22.86" and rows[0]["category"] == "Normal Weight"
+    assert (report.rows, report.rejected) == (4, 2)
+
+
+def test_jsonl_report_parses():
+    lines = score_to_bytes(io.BytesIO(ROSTER), "metric", "jsonl").decode().splitlines()
+    records = [json.loads(line) for line in lines]
+    assert [record["gender"] for record in records] == ["Male", "Female"]
+
@@ -0,0 +1,65 @@
+import csv
+import io
+import json
+
+import numpy as np
+
+from bmi_calculator import batch, exports
+from bmi_calculator.exports import LabelColumn, batch_export_columns, batch_to_csv, batch_to_jsonl
+
+
+def roster(rows=300, seed=0):
+    rng = np.random.default_rng(seed)
+    return batch.compute_batch(
+        np.round(rng.uniform(35, 180, rows), 1),
+        rng.integers(1400, 2101, rows) / 10 / 100,
+        rng.integers(2, 96, rows),
+        rng.choice(["Male", "Female", "Other"], rows),
+        rng.choice(batch.ACTIVITY_LEVELS, rows),
+    )
+
+
+def test_batch_csv_matches_the_single_record_export():
+    metrics = roster()
+    data = batch_to_csv(batch_export_columns(metrics)).decode()
+    expected = exports.metrics_to_csv(metrics[0]) + "".join(
+        exports.metrics_to_csv(metrics[i]).split("\n", 1)[1] for i in range(1, len(metrics))
+    )
+    assert data == expected
+
+
+def test_batch_csv_round_trips_through_csv_reader():
+    metrics = roster()
+    rows = list(csv.DictReader(io.StringIO(batch_to_csv(batch_export_columns(metrics)).decode())))
+    assert len(rows) == len(metrics)
+    for i in (0, 17, len(metrics) - 1):
+        record = metrics[i]
+        assert float(rows[i]["bmi"]) == record.bmi
+        assert float(rows[i]["height"]) == record.height
+        assert rows[i]["category"] == record.category
+        assert int(rows[i]["daily_calories"]) == record.daily_calories
+
+
+def test_batch_jsonl_matches_the_single_record_export():
+    metrics = roster()
+    lines = batch_to_jsonl(batch_export_columns(metrics)).decode().splitlines()
+    assert len(lines) == len(metrics)
+    for i, line in enumerate(lines):
+        assert json.loads(line) == json.loads(exports.metrics_to_json(metrics[i]))
+
+
+def test_labels_that_need_quoting():
+    labels = np.array(['plain', 'a,b', 'say "hi"', 'line\nbreak'])
+    columns = {"name": LabelColumn(np.array([0, 1, 2, 3]), labels), "value": np.array([1.5, -0.25, 1e-7, 3.0])}
+    rows = list(csv.reader(io.StringIO(batch_to_csv(columns).decode())))
+    assert rows[1:] == [[label, str(value)] for label, value in zip(labels.tolist(), columns["value"].tolist())]
+    decoded = [json.loads(line) for line in batch_to_jsonl(columns).decode().splitlines()]
+    assert [record["name"] for record in decoded] == labels.tolist()
+
+
+def test_floats_are_written_like_str():
+    values = np.array([0.0, -0.0, 12.5, 1 / 3, 123456789.125, 1e12, -7.0, 0.1 + 0.2])
+    rows = list(csv.reader(io.StringIO(batch_to_csv({"x": values}, header=False).decode())))
+    assert [row[0] for row in rows] == [str(value) for value in values.tolist()]
+    assert [float(row[0]) for row in rows] == values.tolist()
+
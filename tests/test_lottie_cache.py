@@ -0,0 +1,57 @@
+import json
+import os
+
+import pytest
+
+from bmi_calculator import lottie_cache
+
+HEALTH_ANIMATION_URL = "https://assets4.lottiefiles.com/packages/lf20_5njp3vgg.json"
+WEIGHT_ANIMATION_URL = "https://assets1.lottiefiles.com/packages/lf20_Xf9mNu.json"
+
+
+@pytest.fixture
+def offline(tmp_path, monkeypatch):
+    """An empty disk cache, fresh module state and a network that always fails."""
+    monkeypatch.setattr(lottie_cache, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(lottie_cache, "_memo", {})
+    monkeypatch.setattr(lottie_cache, "_inflight", {})
+    monkeypatch.setattr(lottie_cache, "_failed", {})
+    calls = []
+
+    def fetch(url, timeout=None):
+        calls.append(url)
+
+    monkeypatch.setattr(lottie_cache, "fetch_animation", fetch)
+    return calls
+
+
+def test_app_animations_are_bundled():
+    for url in (HEALTH_ANIMATION_URL, WEIGHT_ANIMATION_URL):
+        with open(lottie_cache._bundled_path(url), encoding="utf-8") as fh:
+            entry = json.load(fh)
+        assert entry["url"] == url
+        assert entry["data"]["layers"]
+
+
+def test_offline_lookup_returns_the_bundled_animation(offline):
+    data = lottie_cache.get_animation(HEALTH_ANIMATION_URL)
+    assert data is not None and data["nm"] == "health"
+
+
+def test_failed_fetch_is_not_retried_during_the_cooldown(offline, monkeypatch):
+    url = "https://example.invalid/missing.json"
+    assert lottie_cache._schedule_refresh(url).result() is None
+    assert lottie_cache.get_animation(url) is None
+    assert lottie_cache._schedule_refresh(url) is None
+    assert offline == [url]
+
+    monkeypatch.setattr(lottie_cache, "FAILURE_COOLDOWN", 0)
+    assert lottie_cache._schedule_refresh(url) is not None
+
+
+def test_successful_fetch_is_written_to_disk(offline, monkeypatch):
+    url = "https://example.invalid/ok.json"
+    monkeypatch.setattr(lottie_cache, "fetch_animation", lambda url, timeout=None: {"nm": "ok"})
+    lottie_cache._schedule_refresh(url).result()
+    assert os.path.exists(lottie_cache._disk_path(url))
+    assert lottie_cache.get_animation(url) == {"nm": "ok"}
@@ -0,0 +1,102 @@
+import random
+import sqlite3
+
+import numpy as np
+import pytest
+
+from bmi_calculator import population
+from bmi_calculator.calculations import ACTIVITY_LEVELS, GENDERS, compute_health_metrics
+from bmi_calculator.history import COLUMNS, HistoryStore
+
+
+def make_results(count, seed=0):
+    rng = random.Random(seed)
+    return [
+        compute_health_metrics(rng.uniform(35, 180), rng.randint(140, 210) / 100, rng.randint(2, 95),
+                               rng.choice(GENDERS), rng.choice(ACTIVITY_LEVELS))
+        for _ in range(count)
+    ]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = HistoryStore(str(tmp_path / "history.sqlite3"), pool_size=1, flush_interval=60)
+    yield store
+    store.close()
+
+
+def column(results, name):
+    return np.array([getattr(metrics, name) for metrics in results])
+
+
+def assert_matches(pop, results):
+    bmi = column(results, "bmi")
+    assert pop.total == len(results)
+    for gender in (None, *GENDERS):
+        picked = bmi if gender is None else bmi[column(results, "gender") == gender]
+        edges, counts, below, above = pop.bmi_histogram(gender)
+        expected, _ = np.histogram(picked, bins=np.append(edges, edges[-1] + population.BMI_BIN_WIDTH))
+        np.testing.assert_array_equal(counts, expected)
+        assert below == (picked < edges[0]).sum()
+        assert above == (picked >= edges[-1] + population.BMI_BIN_WIDTH).sum()
+
+
+def test_saved_and_tallied_results_are_counted(store):
+    results = make_results(500)
+    for i, metrics in enumerate(results):
+        if i % 3:
+            store.tally(metrics)
+        else:
+            store.record(f"user{i}", metrics)
+    assert_matches(store.population(), results)
+    # Tallies are counted but not saved to any history
+    assert store.count() == len(results[::3])
+
+
+def test_category_shares_and_percentiles(store):
+    results = make_results(2000, seed=1)
+    for metrics in results:
+        store.tally(metrics)
+    pop = store.population()
+
+    keys, shares = pop.category_shares("activity")
+    assert keys == list(ACTIVITY_LEVELS)
+    np.testing.assert_allclose(shares.sum(axis=1), 1)
+    activity, category = column(results, "activity"), column(results, "category")
+    sedentary = category[activity == "Sedentary"]
+    assert shares[0, population.CATEGORY_NAMES.index("Overweight")] == pytest.approx(
+        (sedentary == "Overweight").mean()
+    )
+
+    calories = column(results, "daily_calories")
+    for p, value in pop.calorie_percentiles().items():
+        assert abs(value - np.percentile(calories, p)) <= population.CALORIE_BIN_WIDTH
+
+
+def test_results_stored_before_the_counts_are_folded_in(tmp_path):
+    path = str(tmp_path / "history.sqlite3")
+    results = make_results(300, seed=2)
+    store = HistoryStore(path)
+    store.write_many([(f"user{i}", float(i)) + tuple(
+        getattr(metrics, name) for name in ("weight", "height_in_meters") + COLUMNS[4:]
+    ) for i, metrics in enumerate(results)])
+    store.close()
+    # As if the database predated the counts
+    conn = sqlite3.connect(path)
+    conn.executescript("DROP TABLE population_bins; DROP TABLE population_state;")
+    conn.close()
+
+    store = HistoryStore(path)
+    assert_matches(store.population(), results)
+    store.close()
+    # Only once: reopening does not count them again
+    store = HistoryStore(path)
+    assert store.population().total == len(results)
+    store.close()
+
+
+def test_empty_store(store):
+    pop = store.population()
+    assert pop.total == 0
+    assert all(value is None for value in pop.calorie_percentiles().values())
+    assert pop.category_shares("age")[0] == []
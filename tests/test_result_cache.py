@@ -0,0 +1,29 @@
+from bmi_calculator import tables
+from bmi_calculator.result_cache import ResultCache
+from bmi_calculator.units import IMPERIAL, METRIC, to_si
+
+
+def test_same_person_in_two_unit_systems_shares_a_bundle():
+    cache = ResultCache()
+    first = cache.get(*to_si(METRIC, 70, 175), 30, "Male", "Sedentary")
+    second = cache.get(70 + 1e-9, 1.75 + 1e-9, 30, "Male", "Sedentary")
+    assert first is second
+    assert cache.stats()["hits"] == 1
+
+
+def test_bundle_is_computed_from_the_exact_height():
+    cache = ResultCache()
+    for unit, height in ((METRIC, 150.2), (IMPERIAL, 61.0)):
+        weight, height_in_meters = to_si(unit, 70, height)
+        metrics = cache.get(weight, height_in_meters, 30, "Male", "Sedentary")["metrics"]
+        assert metrics.height_in_meters == height_in_meters
+        # On the grid, so the ideal range comes from the precomputed table
+        assert tables._find(metrics.height_in_meters)[0] is not None
+
+
+def test_projection_is_built_from_the_exact_weight():
+    from bmi_calculator.figures import create_projection_chart
+
+    # 70.04 kg rounds to the 70.0 kg key but starts the line at 70.04
+    fig = create_projection_chart(70.04, 1.7512, 30, "Male", "Sedentary", "lose", -500, "#ff0000")
+    assert fig.data[0].y[0] == 70.04
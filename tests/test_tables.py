@@ -0,0 +1,20 @@
+import numpy as np
+
+from bmi_calculator import batch, calculations, tables
+
+
+def grid_heights():
+    return [height for table in tables.get_tables() for height in table.height]
+
+
+def test_lookups_match_the_formula_on_every_grid():
+    for height in grid_heights():
+        assert tables.ideal_weight_range(height) == calculations.calculate_ideal_weight(height)
+
+
+def test_arrays_match_the_formula_on_and_off_the_grids():
+    heights = np.array(grid_heights() + [1.7512345, 0.3, 3.1, np.nan])
+    lower, upper = tables.ideal_weight_arrays(heights)
+    expected_lower, expected_upper = batch.calculate_ideal_weight(heights)
+    np.testing.assert_array_equal(lower, expected_lower)
+    np.testing.assert_array_equal(upper, expected_upper)
@@ -0,0 +1,59 @@
+import csv
+import io
+
+import numpy as np
+
+from bmi_calculator import validation
+from bmi_calculator.validation import ErrorReport, reject, validate
+
+
+def check(weight, height, age, gender="Male", activity="Sedentary", **options):
+    return validate([weight], [height], [age], [gender], [activity], **options).errors[0]
+
+
+def test_valid_row_passes_and_is_converted():
+    checked = validate(["70"], ["175"], ["30"], ["Male"], ["Sedentary"])
+    assert checked.errors.tolist() == [0]
+    assert checked.weight.tolist() == [70.0] and checked.height.tolist() == [1.75]
+
+
+def test_missing_and_out_of_range_values():
+    assert check("", 175, 30) & validation.WEIGHT_MISSING
+    assert check(70, "n/a", 30) & validation.HEIGHT_MISSING
+    assert check(70, 175, 150) & validation.AGE_OUT_OF_RANGE
+    assert check(70, 175, 30, gender="unknown") == validation.GENDER_UNKNOWN
+    assert check(70, 175, 30, activity="Lazy") == validation.ACTIVITY_UNKNOWN
+
+
+def test_fractional_ages_are_rejected():
+    assert check(70, 175, 30.5) == validation.AGE_NOT_INTEGER
+    assert check(70, 175, "30.0") == 0
+
+
+def test_swapped_units_are_hinted():
+    errors = check(154, 69, 30)  # lbs and inches entered as metric
+    assert errors & validation.UNITS_SWAPPED
+    assert check(154, 69, 30, units="imperial") == 0
+
+
+def test_body_fat_is_only_required_when_asked():
+    assert check(70, 175, 30) == 0
+    assert check(70, 175, 30, needs_body_fat=True) == validation.BODY_FAT_MISSING
+
+
+def test_error_report_lists_rejected_rows():
+    chunk = {"weight": ["70", "", "80"], "height": ["175", "180", "1.8"], "age": ["30", "40", "50"],
+             "gender": ["Male"] * 3, "activity": ["Sedentary"] * 3}
+    checked = validate(chunk["weight"], chunk["height"], chunk["age"], chunk["gender"], chunk["activity"])
+    out = io.BytesIO()
+    report = ErrorReport(out)
+    report.add(reject(chunk, checked.errors))
+    rows = list(csv.DictReader(io.StringIO(out.getvalue().decode())))
+    assert [row["row"] for row in rows] == ["2", "3"]
+    assert rows[0]["errors"] == "weight is missing or not a number"
+    assert report.summary().startswith("rejected 2 of 3 rows")
+
+
+def test_describe_errors_joins_messages():
+    codes, labels = validation.describe_errors(np.array([0, validation.WEIGHT_MISSING | validation.AGE_MISSING]))
+    assert labels[codes[1]] == "weight is missing or not a number; age is missing or not a number"